@@ -50,11 +50,38 @@ def initialize_cache(**kwargs):
     cache.configure(redis_cache_backend)
 
 
+@signals.worker_init.connect
+def warm_up_main_process(**kwargs) -> None:
+    # Imported here as task names are imported from this module before Django is set up
+    from helpers.warmup import warm_up_main_process
+
+    warm_up_main_process()
+
+
+@signals.worker_process_init.connect
+def warm_up_child_process(**kwargs) -> None:
+    from helpers.warmup import warm_up_child_process
+
+    warm_up_child_process()
+
+
+@signals.worker_process_shutdown.connect
+def flush_telemetry(**kwargs) -> None:
+    # Imported here as task names are imported from this module before Django is set up
+    from helpers.telemetry import telemetry_sink
+
+    telemetry_sink.flush(commit=True)
+
+
 hourly_check_task_name = "app.cron.hourly_check.HourlyCheckTask"
 daily_plan_manager_task_name = "app.cron.daily.PlanManagerTask"
 
 notify_error_task_name = "app.tasks.notify.NotifyErrorTask"
 
+shadow_changes_comparison_task_name = (
+    "app.tasks.shadow_changes_comparison.ShadowChangesComparisonTask"
+)
+
 # Backfill GH Apps
 backfill_existing_gh_app_installations_name = "app.tasks.backfill_existing_gh_app_installations.BackfillExistingGHAppInstallationsTask"
 backfill_existing_individual_gh_app_installation_name = "app.tasks.backfill_existing_individual_gh_app_installation.BackfillExistingIndividualGHAppInstallationTask"
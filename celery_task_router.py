@@ -1,12 +1,124 @@
+import logging
+import time
+
 import shared.celery_config as shared_celery_config
+from redis.exceptions import RedisError
 from shared.billing import BillingPlan
 from shared.celery_router import route_tasks_based_on_user_plan
+from shared.config import get_config
+from shared.metrics import Counter, Histogram
 
 from database.engine import get_db_session
 from database.models.core import Commit, CompareCommit, Owner, Repository
 from database.models.labelanalysis import LabelAnalysisRequest
 from database.models.profiling import ProfilingCommit, ProfilingUpload
 from database.models.staticanalysis import StaticAnalysisSuite
+from helpers.lru_cache import BoundedLRUCache
+from services.redis import get_redis_connection
+
+log = logging.getLogger(__name__)
+
+PLAN_LOOKUP_RUNTIME = Histogram(
+    "worker_task_router_plan_lookup_seconds",
+    "Time spent looking up the plan of the owner of a task to route it",
+)
+PLAN_CACHE_REQUESTS = Counter(
+    "worker_task_router_plan_cache_requests",
+    "Number of routing plan cache lookups. The `result` can be `local_hit`, `redis_hit` or `miss`.",
+    ["result"],
+)
+
+
+class OwnerPlanCache:
+    """
+    A TTL'd cache of the lookups needed to route tasks, in two layers:
+    a per-process dict in front of redis.
+
+    It holds `repo_owner/<repoid>` -> ownerid and `owner_plan/<ownerid>` -> plan
+    entries, so that a plan change only needs to invalidate a single key.
+
+    Redis entries live for `setup.task_router.plan_cache.ttl` seconds, and the cache
+    is disabled when that is `0` (the default). Per-process entries live for
+    `setup.task_router.plan_cache.local_ttl` seconds, which bounds how long other
+    processes keep routing with a plan after it has been invalidated.
+    """
+
+    MAX_LOCAL_ENTRIES = 10_000
+
+    def __init__(self) -> None:
+        # value and expiration time of the per-process entries
+        self._local: BoundedLRUCache[str, tuple[str, float]] = BoundedLRUCache(
+            max_entries=self.MAX_LOCAL_ENTRIES
+        )
+
+    @property
+    def ttl(self) -> int:
+        return get_config("setup", "task_router", "plan_cache", "ttl", default=0)
+
+    @property
+    def local_ttl(self) -> int:
+        return get_config(
+            "setup", "task_router", "plan_cache", "local_ttl", default=10
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get(self, key: str) -> str | None:
+        entry = self._local.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            PLAN_CACHE_REQUESTS.labels(result="local_hit").inc()
+            return entry[0]
+
+        try:
+            value = get_redis_connection().get(self._redis_key(key))
+        except RedisError:
+            log.warning("Failed to read routing plan cache", exc_info=True)
+            value = None
+        if value is None:
+            PLAN_CACHE_REQUESTS.labels(result="miss").inc()
+            return None
+
+        PLAN_CACHE_REQUESTS.labels(result="redis_hit").inc()
+        value = value.decode()
+        self._set_local(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._set_local(key, value)
+        try:
+            get_redis_connection().set(self._redis_key(key), value, ex=self.ttl)
+        except RedisError:
+            log.warning("Failed to write routing plan cache", exc_info=True)
+
+    def invalidate(self, key: str) -> None:
+        self._local.pop(key)
+        try:
+            get_redis_connection().delete(self._redis_key(key))
+        except RedisError:
+            log.warning("Failed to invalidate routing plan cache", exc_info=True)
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def _set_local(self, key: str, value: str) -> None:
+        self._local.put(key, (value, time.monotonic() + self.local_ttl))
+
+    def _redis_key(self, key: str) -> str:
+        return f"task_router/{key}"
+
+
+owner_plan_cache = OwnerPlanCache()
+
+
+def invalidate_owner_plan(ownerid: int) -> None:
+    """
+    Makes sure tasks of `ownerid` are routed using its current plan.
+
+    This should be called by anything changing `Owner.plan`.
+    """
+    owner_plan_cache.invalidate(f"owner_plan/{ownerid}")
 
 
 def _get_user_plan_from_ownerid(db_session, ownerid, *args, **kwargs) -> str:
@@ -105,6 +217,42 @@ def _get_user_plan_from_suite_id(dbsession, suite_id, *args, **kwargs) -> str:
     return BillingPlan.users_basic.db_name
 
 
+def _get_cached_user_plan_from_ownerid(dbsession, ownerid, *args, **kwargs) -> str:
+    key = f"owner_plan/{ownerid}"
+    plan = owner_plan_cache.get(key)
+    if plan is None:
+        plan = _get_user_plan_from_ownerid(dbsession, ownerid)
+        if plan is not None:
+            owner_plan_cache.set(key, plan)
+    return plan
+
+
+def _get_cached_user_plan_from_org_ownerid(
+    dbsession, org_ownerid, *args, **kwargs
+) -> str:
+    return _get_cached_user_plan_from_ownerid(dbsession, ownerid=org_ownerid)
+
+
+def _get_cached_user_plan_from_repoid(dbsession, repoid, *args, **kwargs) -> str:
+    repo_key = f"repo_owner/{repoid}"
+    ownerid = owner_plan_cache.get(repo_key)
+    if ownerid is not None:
+        return _get_cached_user_plan_from_ownerid(dbsession, int(ownerid))
+
+    result = (
+        dbsession.query(Owner.ownerid, Owner.plan)
+        .join(Repository.owner)
+        .filter(Repository.repoid == repoid)
+        .first()
+    )
+    if not result:
+        return BillingPlan.users_basic.db_name
+    owner_plan_cache.set(repo_key, str(result.ownerid))
+    if result.plan is not None:
+        owner_plan_cache.set(f"owner_plan/{result.ownerid}", result.plan)
+    return result.plan
+
+
 def _get_user_plan_from_task(dbsession, task_name: str, task_kwargs: dict) -> str:
     owner_plan_lookup_funcs = {
         # from ownerid
@@ -141,7 +289,16 @@ def _get_user_plan_from_task(dbsession, task_name: str, task_kwargs: dict) -> st
     func_to_use = owner_plan_lookup_funcs.get(
         task_name, lambda *args, **kwargs: BillingPlan.users_basic.db_name
     )
-    return func_to_use(dbsession, **task_kwargs)
+    if owner_plan_cache.enabled:
+        # the lookups of the tasks that are scheduled the most often are cached
+        cached_lookup_funcs = {
+            _get_user_plan_from_ownerid: _get_cached_user_plan_from_ownerid,
+            _get_user_plan_from_org_ownerid: _get_cached_user_plan_from_org_ownerid,
+            _get_user_plan_from_repoid: _get_cached_user_plan_from_repoid,
+        }
+        func_to_use = cached_lookup_funcs.get(func_to_use, func_to_use)
+    with PLAN_LOOKUP_RUNTIME.time():
+        return func_to_use(dbsession, **task_kwargs)
 
 
 def route_task(name, args, kwargs, options, task=None, **kw):
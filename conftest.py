@@ -401,3 +401,11 @@ def mock_feature(mocker, request):
         return default
 
     return mocker.patch.object(Feature, "check_value", check_value)
+
+
+# The log context is a contextvar, which would otherwise leak between tests
+@pytest.fixture(autouse=True)
+def reset_log_context():
+    from helpers.log_context import LogContext, set_log_context
+
+    set_log_context(LogContext())
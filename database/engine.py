@@ -1,10 +1,11 @@
 import dataclasses
 import json
+import os
 from decimal import Decimal
 
 from shared.config import get_config
 from shared.utils.ReportEncoder import ReportEncoder
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
 import database.events  # noqa: F401
@@ -31,6 +32,31 @@ def json_dumps(d):
     return json.dumps(d, cls=DatabaseEncoder)
 
 
+def protect_engine_from_fork(engine) -> None:
+    """
+    Makes sure pooled connections are never shared between processes.
+
+    A connection checked out in a process other than the one that opened it
+    (like a forked worker process) is dropped from the pool without being closed,
+    as closing it would close it for its original process too, and the pool
+    opens a new one in its place.
+    """
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        connection_record.info["pid"] = os.getpid()
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        pid = os.getpid()
+        if connection_record.info["pid"] != pid:
+            connection_record.connection = connection_proxy.connection = None
+            raise exc.DisconnectionError(
+                f"Connection record belongs to pid {connection_record.info['pid']}, "
+                f"attempting to check out in pid {pid}"
+            )
+
+
 class SessionFactory:
     def __init__(self, database_url, timeseries_database_url=None):
         self.database_url = database_url
@@ -43,12 +69,14 @@ class SessionFactory:
             self.database_url,
             json_serializer=json_dumps,
         )
+        protect_engine_from_fork(self.main_engine)
 
         if timeseries_enabled():
             self.timeseries_engine = create_engine(
                 self.timeseries_database_url,
                 json_serializer=json_dumps,
             )
+            protect_engine_from_fork(self.timeseries_engine)
 
             main_engine = self.main_engine
             timeseries_engine = self.timeseries_engine
@@ -195,22 +195,34 @@ class AbstractTotals(MixinBaseClass):
     partials = Column(types.Integer)
     files = Column(types.Integer)
 
-    def update_from_totals(self, totals, precision=2, rounding="down"):
-        self.branches = totals.branches
+    @staticmethod
+    def values_from_totals(totals, precision=2, rounding="down") -> dict:
+        """
+        Returns the column values for `totals`, for `update_from_totals` as well
+        as for rows that are inserted in bulk.
+        """
         if totals.coverage is not None:
-            coverage: Decimal = Decimal(totals.coverage)
-            self.coverage = precise_round(
-                coverage, precision=precision, rounding=rounding
+            coverage = precise_round(
+                Decimal(totals.coverage), precision=precision, rounding=rounding
             )
         # Temporary until the table starts accepting NULLs
         else:
-            self.coverage = 0
-        self.hits = totals.hits
-        self.lines = totals.lines
-        self.methods = totals.methods
-        self.misses = totals.misses
-        self.partials = totals.partials
-        self.files = totals.files
+            coverage = Decimal(0)
+        return dict(
+            branches=totals.branches,
+            coverage=coverage,
+            hits=totals.hits,
+            lines=totals.lines,
+            methods=totals.methods,
+            misses=totals.misses,
+            partials=totals.partials,
+            files=totals.files,
+        )
+
+    def update_from_totals(self, totals, precision=2, rounding="down"):
+        values = self.values_from_totals(totals, precision, rounding)
+        for column, value in values.items():
+            setattr(self, column, value)
 
     class Meta:
         abstract = True
@@ -1,4 +1,5 @@
 import json
+from decimal import Decimal
 from unittest.mock import PropertyMock, call
 
 from mock import MagicMock, patch
@@ -12,7 +13,7 @@ from database.models.core import (
     GITHUB_APP_INSTALLATION_DEFAULT_NAME,
     GithubAppInstallation,
 )
-from database.models.reports import ReportDetails
+from database.models.reports import ReportDetails, UploadLevelTotals
 from database.tests.factories import (
     BranchFactory,
     CommitFactory,
@@ -439,6 +440,31 @@ class TestReportDetailsModel(object):
         assert mock_archive_service.return_value.read_file.call_count == 0
 
 
+class TestTotalsModel(object):
+    def test_values_from_totals(self):
+        totals = ReportTotals(
+            files=2, lines=3, hits=2, misses=1, coverage="66.66667", branches=1
+        )
+        values = UploadLevelTotals.values_from_totals(totals, precision=2)
+        assert values == {
+            "branches": 1,
+            "coverage": Decimal("66.66"),
+            "hits": 2,
+            "lines": 3,
+            "methods": 0,
+            "misses": 1,
+            "partials": 0,
+            "files": 2,
+        }
+
+        upload_totals = UploadLevelTotals()
+        upload_totals.update_from_totals(totals, precision=2)
+        assert {column: getattr(upload_totals, column) for column in values} == values
+
+        totals.coverage = None
+        assert UploadLevelTotals.values_from_totals(totals)["coverage"] == 0
+
+
 class TestCommitModel(object):
     sample_report = {
         "files": {
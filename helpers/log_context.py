@@ -42,6 +42,60 @@ class LogContext:
         d["sentry_trace_id"] = self.sentry_trace_id
         return d
 
+    def as_task_header(self) -> dict | None:
+        """
+        Returns the resolved owner/repo/commit fields, to be passed to child tasks
+        in their headers so they don't need to look them up again.
+        """
+        header = {
+            key: value
+            for key, value in (
+                ("owner_id", self.owner_id),
+                ("owner_username", self.owner_username),
+                ("owner_service", self.owner_service),
+                ("repo_id", self.repo_id),
+                ("repo_name", self.repo_name),
+                ("commit_id", self.commit_id),
+                ("commit_sha", self.commit_sha),
+            )
+            if value is not None
+        }
+        return header or None
+
+    def populate_from_task_header(self, header: dict | None):
+        """
+        Fill in the fields resolved by a parent task, see `as_task_header`.
+
+        A parent task can schedule tasks for other repos or commits, so the fields
+        are only used when they belong to the repo/owner/commit this context
+        already identifies.
+        """
+        if not header:
+            return
+
+        if self.repo_id is not None:
+            same_repo = header.get("repo_id") == self.repo_id
+            same_owner = same_repo and self.owner_id in (None, header.get("owner_id"))
+        else:
+            same_repo = False
+            same_owner = (
+                self.owner_id is not None and header.get("owner_id") == self.owner_id
+            )
+        same_commit = (
+            same_repo
+            and self.commit_sha is not None
+            and header.get("commit_sha") == self.commit_sha
+        )
+
+        if same_owner:
+            self.owner_id = header.get("owner_id")
+            self.owner_username = self.owner_username or header.get("owner_username")
+            self.owner_service = self.owner_service or header.get("owner_service")
+        if same_repo:
+            self.repo_name = self.repo_name or header.get("repo_name")
+        if same_commit:
+            self.commit_id = self.commit_id or header.get("commit_id")
+
     def populate_from_sqlalchemy(self, dbsession):
         """
         Attempt to use the information we have to fill in other context fields. For
@@ -0,0 +1,117 @@
+"""
+A thread-safe LRU cache living in the memory of a single process.
+
+It is bounded by a number of entries, by the sum of the sizes of its entries,
+or by both, and evicts the least recently used entries once either limit is
+exceeded. The limits are read on every `put`, so subclasses can read them from
+the configuration.
+
+The entries of a parent process are of no use to a forked worker, and the lock
+might have been held by another thread at the time of the fork, so the cache
+resets itself in forked children.
+"""
+
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BoundedLRUCache(Generic[K, V]):
+    def __init__(
+        self, max_entries: int | None = None, max_size: int | None = None
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._current_size = 0
+
+        cache_ref = weakref.ref(self)
+
+        def reinit_after_fork() -> None:
+            if (cache := cache_ref()) is not None:
+                cache._reinit_after_fork()
+
+        os.register_at_fork(after_in_child=reinit_after_fork)
+
+    @property
+    def max_entries(self) -> int | None:
+        """The maximum number of entries, or `None` for no limit."""
+        return self._max_entries
+
+    @property
+    def max_size(self) -> int | None:
+        """The maximum sum of the sizes of the entries, or `None` for no limit."""
+        return self._max_size
+
+    @property
+    def current_size(self) -> int:
+        return self._current_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: K, value: V, size: int = 0) -> None:
+        """
+        Stores `value`, evicting the least recently used entries until the cache
+        fits into its limits again.
+
+        Values larger than `max_size` are never stored.
+        """
+        max_entries, max_size = self.max_entries, self.max_size
+        if max_size is not None and size > max_size:
+            return
+
+        evicted: list[tuple[K, V, int]] = []
+        with self._lock:
+            if (previous := self._entries.pop(key, None)) is not None:
+                self._current_size -= previous[1]
+            self._entries[key] = (value, size)
+            self._current_size += size
+
+            while self._entries and (
+                (max_size is not None and self._current_size > max_size)
+                or (max_entries is not None and len(self._entries) > max_entries)
+            ):
+                evicted_key, (evicted_value, evicted_size) = self._entries.popitem(
+                    last=False
+                )
+                self._current_size -= evicted_size
+                evicted.append((evicted_key, evicted_value, evicted_size))
+
+        for evicted_key, evicted_value, evicted_size in evicted:
+            self._on_evict(evicted_key, evicted_value, evicted_size)
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._current_size -= entry[1]
+        return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._current_size = 0
+
+    def _on_evict(self, key: K, value: V, size: int) -> None:
+        """Called (outside of the lock) for every entry evicted by a `put`."""
+
+    def _reinit_after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._current_size = 0
@@ -28,3 +28,26 @@ def match(patterns: Optional[List[str]], string: str) -> bool:
     else:
         # no positives: everyting else is ok
         return True
+
+
+class Matcher:
+    """
+    Same as `match`, with the patterns compiled once so that many strings
+    can be matched against them.
+    """
+
+    def __init__(self, patterns: Optional[List[str]]):
+        self.exact = None if patterns is None else set(patterns)
+        patterns = set(filter(None, patterns or []))
+        negatives = set(filter(lambda a: a.startswith(("^!", "!")), patterns))
+        self.negatives = [re.compile(p.replace("!", "")) for p in negatives]
+        self.positives = [re.compile(p) for p in patterns - negatives]
+
+    def match(self, string: str) -> bool:
+        if self.exact is None or string in self.exact:
+            return True
+        if any(pattern.match(string) for pattern in self.negatives):
+            return False
+        if self.positives:
+            return any(pattern.match(string) for pattern in self.positives)
+        return True
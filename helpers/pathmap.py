@@ -27,18 +27,54 @@ def _check_ancestors(path, match, ancestors):
     return ml.endswith("/".join(pl.split("/")[(ancestors + 1) * -1 :]))
 
 
+def _common_suffix_length(a: str, b: str) -> int:
+    length = 0
+    for char_a, char_b in zip(reversed(a), reversed(b)):
+        if char_a != char_b:
+            break
+        length += 1
+    return length
+
+
 def _get_best_match(path: str, possibilities: list[str]) -> str:
     """
     Given a `path`, return the most similar one out of `possibilities`.
+
+    The similarity is the `SequenceMatcher.ratio`, and ties go to the possibility
+    that comes first. Computing that ratio is quadratic in the length of the
+    paths, so possibilities are tried in order of their common suffix with `path`
+    (which tends to find the best match first), and skipped without computing
+    the ratio when its cheap upper bounds show they can't beat the best so far.
     """
+    best_ratio, best_index = -1.0, len(possibilities)
 
-    best_match = (-1.0, "")
-    for possibility in possibilities:
-        match = SequenceMatcher(None, path, possibility).ratio()
-        if match > best_match[0]:
-            best_match = (match, possibility)
+    def beats_best(ratio: float, index: int) -> bool:
+        return ratio > best_ratio or (ratio == best_ratio and index < best_index)
 
-    return best_match[1]
+    matcher = SequenceMatcher(None, path)
+    order = sorted(
+        range(len(possibilities)),
+        key=lambda index: -_common_suffix_length(path, possibilities[index]),
+    )
+    for index in order:
+        possibility = possibilities[index]
+        # same as `matcher.real_quick_ratio()`, without indexing the possibility
+        total_length = len(path) + len(possibility)
+        upper_bound = (
+            2.0 * min(len(path), len(possibility)) / total_length
+            if total_length
+            else 1.0
+        )
+        if not beats_best(upper_bound, index):
+            continue
+        matcher.set_seq2(possibility)
+        if not beats_best(matcher.quick_ratio(), index):
+            continue
+        ratio = matcher.ratio()
+        if beats_best(ratio, index):
+            best_ratio, best_index = ratio, index
+
+    return possibilities[best_index] if possibilities else ""
 
 
 class Node:
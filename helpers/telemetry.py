@@ -1,15 +1,117 @@
 import asyncio
 import logging
+import os
+import threading
+import time
 from datetime import datetime
 
 import django
 from asgiref.sync import sync_to_async
+from django.db import transaction as django_transaction
+from shared.config import get_config
 from shared.django_apps.pg_telemetry.models import SimpleMetric as PgSimpleMetric
+from shared.metrics import Counter
 
 from helpers.log_context import get_log_context
 
 log = logging.getLogger(__name__)
 
+TELEMETRY_METRICS_FLUSHED = Counter(
+    "worker_telemetry_simple_metrics_flushed",
+    "Number of buffered `SimpleMetric` rows written to the database",
+)
+TELEMETRY_METRICS_DROPPED = Counter(
+    "worker_telemetry_simple_metrics_dropped",
+    "Number of `SimpleMetric` rows dropped, either because the buffer was full or because flushing them failed",
+)
+
+
+class TelemetrySink:
+    """
+    A per-process buffer of `SimpleMetric` rows.
+
+    Metrics are only appended to the buffer when they are logged, and are written
+    to the database in batches by `flush_if_due`, once the buffer holds
+    `setup.telemetry.flush_size` rows or `setup.telemetry.flush_interval_seconds`
+    have passed since the last flush.
+
+    `BaseCodecovTask` calls `flush_if_due` right before committing the Django
+    transaction of every task, so buffered rows are committed along with it.
+    Rows logged once the buffer holds `setup.telemetry.max_buffer_size` rows are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buffer: list[PgSimpleMetric] = []
+        self._last_flush = time.monotonic()
+
+    @property
+    def flush_size(self) -> int:
+        return get_config("setup", "telemetry", "flush_size", default=100)
+
+    @property
+    def flush_interval_seconds(self) -> float:
+        return get_config("setup", "telemetry", "flush_interval_seconds", default=10)
+
+    @property
+    def max_buffer_size(self) -> int:
+        return get_config("setup", "telemetry", "max_buffer_size", default=10_000)
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def add(self, metric: PgSimpleMetric) -> None:
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer_size:
+                TELEMETRY_METRICS_DROPPED.inc()
+                return
+            self._buffer.append(metric)
+
+    def flush_if_due(self) -> None:
+        if not self._buffer:
+            return
+        if (
+            len(self._buffer) >= self.flush_size
+            or time.monotonic() - self._last_flush >= self.flush_interval_seconds
+        ):
+            self.flush()
+
+    def flush(self, commit: bool = False) -> None:
+        """
+        Writes all the buffered rows to the database.
+
+        The worker's Django connections don't autocommit, so the rows are only
+        persisted once the current transaction is committed. Pass `commit=True`
+        when flushing outside of a task, e.g. at shutdown.
+        """
+        with self._lock:
+            metrics, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if not metrics:
+            return
+
+        try:
+            PgSimpleMetric.objects.bulk_create(metrics)
+            if commit:
+                django_transaction.commit()
+            TELEMETRY_METRICS_FLUSHED.inc(len(metrics))
+        except Exception:
+            TELEMETRY_METRICS_DROPPED.inc(len(metrics))
+            log.exception(
+                "Failed to create telemetry_simple records",
+                extra=dict(number_metrics=len(metrics)),
+            )
+
+    def _reinit_after_fork(self) -> None:
+        # The rows buffered by the parent would otherwise be written once per child
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+
+telemetry_sink = TelemetrySink()
+os.register_at_fork(after_in_child=telemetry_sink._reinit_after_fork)
+
 
 def fire_and_forget(fn):
     """
@@ -38,8 +140,9 @@ def log_simple_metric_async(name: str, value: float):
 def log_simple_metric(name: str, value: float):
     """
     `log_simple_metric()` will get metadata values from the log context
-    and then log a simple metric with the pass-in name/value to Postgres.
-    This function is synchronous/blocking.
+    and then buffer a simple metric with the pass-in name/value in the
+    `telemetry_sink`, which writes it to Postgres in a later batch.
+    This function does not hit the database.
     """
 
     # Timezone-aware timestamp in UTC
@@ -47,8 +150,8 @@ def log_simple_metric(name: str, value: float):
 
     log_context = get_log_context()
 
-    try:
-        PgSimpleMetric.objects.create(
+    telemetry_sink.add(
+        PgSimpleMetric(
             timestamp=timestamp,
             name=name,
             value=value,
@@ -56,8 +159,7 @@ def log_simple_metric(name: str, value: float):
             owner_id=log_context.owner_id,
             commit_id=log_context.commit_id,
         )
-    except Exception:
-        log.exception("Failed to create telemetry_simple record")
+    )
 
 
 @fire_and_forget
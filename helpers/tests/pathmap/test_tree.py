@@ -1,3 +1,6 @@
+import random
+from difflib import SequenceMatcher
+
 from helpers.pathmap import Tree, _get_best_match
 
 
@@ -8,6 +11,33 @@ def test_get_best_match():
     assert _get_best_match(path, possibilities) == "c/bB.py"
 
 
+def _reference_get_best_match(path, possibilities):
+    best_match = (-1.0, "")
+    for possibility in possibilities:
+        match = SequenceMatcher(None, path, possibility).ratio()
+        if match > best_match[0]:
+            best_match = (match, possibility)
+    return best_match[1]
+
+
+def test_get_best_match_same_as_sequence_matcher_ranking():
+    rng = random.Random(1234)
+    components = ["src", "lib", "app", "a", "B", "index.ts", "__init__.py", "Tests"]
+
+    def random_path(max_components):
+        return "/".join(
+            rng.choice(components) for _ in range(rng.randint(1, max_components))
+        )
+
+    assert _get_best_match("a/b.py", []) == ""
+    for _ in range(2000):
+        path = random_path(7)
+        possibilities = [random_path(6) for _ in range(rng.randint(1, 12))]
+        assert _get_best_match(path, possibilities) == _reference_get_best_match(
+            path, possibilities
+        )
+
+
 def test_drill():
     tree = Tree(["a/b/c"])
     assert tree._drill(tree.root) == ["a/b/c"]
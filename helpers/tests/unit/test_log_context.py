@@ -110,6 +110,100 @@ def test_populate_ignores_db_exceptions(dbsession, mocker):
     log_context.populate_from_sqlalchemy(dbsession)
 
 
+def test_as_task_header(dbsession):
+    assert LogContext().as_task_header() is None
+
+    owner, repo, commit = create_db_records(dbsession)
+    log_context = LogContext(repo_id=repo.repoid, commit_sha=commit.commitid)
+    log_context.populate_from_sqlalchemy(dbsession)
+    assert log_context.as_task_header() == {
+        "owner_id": owner.ownerid,
+        "owner_username": "codecove2e",
+        "owner_service": "github",
+        "repo_id": repo.repoid,
+        "repo_name": "example-python",
+        "commit_id": commit.id_,
+        "commit_sha": commit.commitid,
+    }
+
+
+def test_populate_from_task_header_same_commit(dbsession, mocker):
+    header = {
+        "owner_id": 1,
+        "owner_username": "codecove2e",
+        "owner_service": "github",
+        "repo_id": 2,
+        "repo_name": "example-python",
+        "commit_id": 3,
+        "commit_sha": "abc",
+    }
+    log_context = LogContext(repo_id=2, commit_sha="abc")
+    log_context.populate_from_task_header(header)
+    query = mocker.spy(dbsession, "query")
+    log_context.populate_from_sqlalchemy(dbsession)
+
+    assert query.call_count == 0
+    assert log_context == LogContext(
+        owner_id=1,
+        owner_username="codecove2e",
+        owner_service="github",
+        repo_id=2,
+        repo_name="example-python",
+        commit_id=3,
+        commit_sha="abc",
+    )
+
+
+def test_populate_from_task_header_other_commit():
+    header = {
+        "owner_id": 1,
+        "owner_username": "codecove2e",
+        "owner_service": "github",
+        "repo_id": 2,
+        "repo_name": "example-python",
+        "commit_id": 3,
+        "commit_sha": "abc",
+    }
+    log_context = LogContext(repo_id=2, commit_sha="def")
+    log_context.populate_from_task_header(header)
+
+    assert log_context == LogContext(
+        owner_id=1,
+        owner_username="codecove2e",
+        owner_service="github",
+        repo_id=2,
+        repo_name="example-python",
+        commit_sha="def",
+    )
+
+
+def test_populate_from_task_header_other_repo_or_owner():
+    header = {
+        "owner_id": 1,
+        "owner_username": "codecove2e",
+        "owner_service": "github",
+        "repo_id": 2,
+        "repo_name": "example-python",
+    }
+    log_context = LogContext(repo_id=5)
+    log_context.populate_from_task_header(header)
+    assert log_context == LogContext(repo_id=5)
+
+    log_context = LogContext(owner_id=7)
+    log_context.populate_from_task_header(header)
+    assert log_context == LogContext(owner_id=7)
+
+    log_context = LogContext(owner_id=1)
+    log_context.populate_from_task_header(header)
+    assert log_context == LogContext(
+        owner_id=1, owner_username="codecove2e", owner_service="github"
+    )
+
+    log_context = LogContext()
+    log_context.populate_from_task_header(header)
+    assert log_context == LogContext()
+
+
 def test_set_and_get_log_context(dbsession):
     log_context = LogContext(repo_id=1, commit_sha="abcde", commit_id=2, owner_id=3)
     set_log_context(log_context)
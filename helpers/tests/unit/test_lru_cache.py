@@ -0,0 +1,63 @@
+from helpers.lru_cache import BoundedLRUCache
+
+
+class RecordingCache(BoundedLRUCache[str, int]):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.evicted = []
+
+    def _on_evict(self, key: str, value: int, size: int) -> None:
+        self.evicted.append((key, size))
+
+
+def test_evicts_least_recently_used_entries():
+    cache = RecordingCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evicted == [("b", 0)]
+
+
+def test_evicts_by_size():
+    cache = RecordingCache(max_size=10)
+    cache.put("a", 1, size=4)
+    cache.put("b", 2, size=4)
+    cache.put("a", 3, size=5)
+    assert cache.current_size == 9
+
+    cache.put("c", 4, size=4)
+    assert cache.get("b") is None
+    assert cache.get("a") == 3
+    assert cache.current_size == 9
+    assert cache.evicted == [("b", 4)]
+
+    # larger than the whole cache
+    cache.put("d", 5, size=11)
+    assert cache.get("d") is None
+    assert len(cache) == 2
+
+
+def test_pop_and_clear():
+    cache = BoundedLRUCache(max_entries=10, max_size=10)
+    cache.put("a", 1, size=3)
+    cache.put("b", 2, size=3)
+    assert cache.pop("a") == 1
+    assert cache.pop("a") is None
+    assert cache.current_size == 3
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.current_size == 0
+
+
+def test_reinit_after_fork():
+    cache = BoundedLRUCache(max_entries=10)
+    cache.put("a", 1, size=3)
+    cache._reinit_after_fork()
+    assert cache.get("a") is None
+    assert cache.current_size == 0
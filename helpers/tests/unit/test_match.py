@@ -1,4 +1,6 @@
-from helpers.match import match
+import pytest
+
+from helpers.match import Matcher, match
 
 
 def test_match():
@@ -8,3 +10,12 @@ def test_match():
     # Negative matches return False
     assert match(["!new.*"], "new_branch") is False
     assert match(["!new_branch"], "new_branch") is False
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [None, [], ["old.*"], ["new.*"], ["!new.*"], ["!new_branch"], ["^!old", "new"]],
+)
+@pytest.mark.parametrize("string", ["new_branch", "old_branch", "!new_branch"])
+def test_matcher_same_as_match(patterns, string):
+    assert Matcher(patterns).match(string) is match(patterns, string)
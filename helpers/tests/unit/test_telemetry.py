@@ -3,14 +3,17 @@ import threading
 from datetime import datetime, timezone
 
 import pytest
+from shared.django_apps.pg_telemetry.models import SimpleMetric as PgSimpleMetric
 
 from database.tests.factories.core import CommitFactory, OwnerFactory, RepositoryFactory
 from helpers.log_context import LogContext, set_log_context
 from helpers.telemetry import (
+    TelemetrySink,
     TimeseriesTimer,
     attempt_log_simple_metric,
     fire_and_forget,
     log_simple_metric,
+    telemetry_sink,
 )
 
 
@@ -97,19 +100,22 @@ class TestLoggingMetrics:
         mock_datetime = mocker.patch("django.utils.timezone")
         mock_datetime.now.return_value = desired_time
 
-        mock_model_create = mocker.patch(
-            "helpers.telemetry.PgSimpleMetric.objects.create"
+        mock_bulk_create = mocker.patch(
+            "helpers.telemetry.PgSimpleMetric.objects.bulk_create"
         )
+        telemetry_sink.flush()
         log_simple_metric("test", 5.0)
-
-        mock_model_create.assert_called_with(
-            name="test",
-            value=5.0,
-            timestamp=desired_time,
-            repo_id=log_context.repo_id,
-            owner_id=log_context.owner_id,
-            commit_id=log_context.commit_id,
-        )
+        assert not mock_bulk_create.called
+
+        telemetry_sink.flush()
+        assert mock_bulk_create.call_count == 1
+        (metric,) = mock_bulk_create.call_args[0][0]
+        assert metric.name == "test"
+        assert metric.value == 5.0
+        assert metric.timestamp == desired_time
+        assert metric.repo_id == log_context.repo_id
+        assert metric.owner_id == log_context.owner_id
+        assert metric.commit_id == log_context.commit_id
 
     @pytest.mark.asyncio
     async def test_attempt_log_simple_metric(self, dbsession, mocker):
@@ -123,6 +129,83 @@ class TestLoggingMetrics:
         assert ("test", 5.0) in mock_fn.call_args
 
 
+class TestTelemetrySink:
+    @pytest.fixture
+    def sink_config(self, mock_configuration):
+        mock_configuration.params["setup"]["telemetry"] = {
+            "flush_size": 2,
+            "flush_interval_seconds": 60,
+            "max_buffer_size": 3,
+        }
+        return mock_configuration
+
+    def test_flush_if_due_on_size(self, sink_config, mocker):
+        mock_bulk_create = mocker.patch(
+            "helpers.telemetry.PgSimpleMetric.objects.bulk_create"
+        )
+        sink = TelemetrySink()
+        sink.add(PgSimpleMetric(name="a", value=1.0))
+        sink.flush_if_due()
+        assert not mock_bulk_create.called
+        assert len(sink) == 1
+
+        sink.add(PgSimpleMetric(name="b", value=2.0))
+        sink.flush_if_due()
+        assert mock_bulk_create.call_count == 1
+        assert [m.name for m in mock_bulk_create.call_args[0][0]] == ["a", "b"]
+        assert len(sink) == 0
+
+    def test_flush_if_due_on_interval(self, sink_config, mocker):
+        mock_bulk_create = mocker.patch(
+            "helpers.telemetry.PgSimpleMetric.objects.bulk_create"
+        )
+        mock_monotonic = mocker.patch("helpers.telemetry.time.monotonic")
+        mock_monotonic.return_value = 100
+        sink = TelemetrySink()
+        sink.add(PgSimpleMetric(name="a", value=1.0))
+
+        mock_monotonic.return_value = 159
+        sink.flush_if_due()
+        assert not mock_bulk_create.called
+
+        mock_monotonic.return_value = 160
+        sink.flush_if_due()
+        assert mock_bulk_create.call_count == 1
+
+    def test_drops_when_full(self, sink_config, mocker):
+        sink = TelemetrySink()
+        for i in range(5):
+            sink.add(PgSimpleMetric(name=str(i), value=1.0))
+        assert len(sink) == 3
+
+    def test_flush_failure_drops_metrics(self, sink_config, mocker):
+        mocker.patch(
+            "helpers.telemetry.PgSimpleMetric.objects.bulk_create",
+            side_effect=Exception("db is down"),
+        )
+        sink = TelemetrySink()
+        sink.add(PgSimpleMetric(name="a", value=1.0))
+        sink.flush()
+        assert len(sink) == 0
+
+    def test_flush_with_commit(self, sink_config, mocker):
+        mocker.patch("helpers.telemetry.PgSimpleMetric.objects.bulk_create")
+        mock_commit = mocker.patch("helpers.telemetry.django_transaction.commit")
+        sink = TelemetrySink()
+        sink.flush(commit=True)
+        assert not mock_commit.called
+
+        sink.add(PgSimpleMetric(name="a", value=1.0))
+        sink.flush(commit=True)
+        mock_commit.assert_called_once()
+
+    def test_reinit_after_fork(self, sink_config):
+        sink = TelemetrySink()
+        sink.add(PgSimpleMetric(name="a", value=1.0))
+        sink._reinit_after_fork()
+        assert len(sink) == 0
+
+
 class TestTimeseriesTimer:
     def test_sync(self, dbsession, mocker):
         mock_fn = mocker.patch("helpers.telemetry.log_simple_metric")
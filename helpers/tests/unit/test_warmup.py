@@ -0,0 +1,47 @@
+from helpers import warmup
+from services.storage import _reset_storage_client_after_fork, get_storage_client
+
+
+def test_warm_up_disabled_by_default(mock_configuration, mocker):
+    step = mocker.MagicMock()
+    mocker.patch.object(warmup, "CHILD_PROCESS_STEPS", [("step", step)])
+
+    warmup.warm_up_child_process()
+
+    assert not step.called
+
+
+def test_warm_up_runs_all_steps(mock_configuration, mocker):
+    mock_configuration._params["setup"]["warm_start"] = {"enabled": True}
+    failing_step = mocker.MagicMock(side_effect=Exception("connection refused"))
+    step = mocker.MagicMock()
+    mocker.patch.object(
+        warmup, "MAIN_PROCESS_STEPS", [("failing", failing_step), ("step", step)]
+    )
+
+    warmup.warm_up_main_process()
+
+    failing_step.assert_called_once()
+    step.assert_called_once()
+
+
+def test_import_modules(mock_configuration, mocker):
+    mock_configuration._params["setup"]["warm_start"] = {
+        "enabled": True,
+        "modules": ["helpers.match"],
+    }
+    import_module = mocker.patch("helpers.warmup.importlib.import_module")
+
+    warmup._import_modules()
+
+    import_module.assert_called_once_with("helpers.match")
+
+
+def test_storage_client_reset_after_fork(mock_configuration):
+    _reset_storage_client_after_fork()
+    client = get_storage_client()
+    assert get_storage_client() is client
+
+    _reset_storage_client_after_fork()
+    assert get_storage_client() is not client
+    _reset_storage_client_after_fork()
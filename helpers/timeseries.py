@@ -7,3 +7,7 @@ def timeseries_enabled() -> bool:
 
 def backfill_max_batch_size() -> int:
     return get_config("setup", "timeseries", "backfill_max_batch_size", default=500)
+
+
+def backfill_report_concurrency() -> int:
+    return get_config("setup", "timeseries", "backfill_report_concurrency", default=4)
@@ -0,0 +1,126 @@
+"""
+Warm start of the worker processes.
+
+`warm_up_main_process` runs in the main worker process before the pool forks.
+Whatever it loads is inherited by every child, and shared with them
+copy-on-write once `gc.freeze` ran.
+
+`warm_up_child_process` runs in every child right after it was forked. The
+clients inherited from the main process are dropped after fork by their own
+modules, so this opens fresh ones before the first task needs them.
+
+Both are disabled unless `setup.warm_start.enabled` is set.
+"""
+
+import importlib
+import logging
+import time
+from typing import Callable
+
+from shared.config import get_config
+from shared.metrics import Histogram
+
+log = logging.getLogger(__name__)
+
+WARM_UP_RUNTIME = Histogram(
+    "worker_warm_up_runtime_seconds",
+    "Time spent warming up a worker process. The `process` can be `main` or `child`.",
+    ["process"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 30],
+)
+
+# The task modules import everything tasks use at module level
+DEFAULT_MODULES = ["tasks"]
+
+
+def warm_start_enabled() -> bool:
+    return get_config("setup", "warm_start", "enabled", default=False)
+
+
+def _import_modules() -> None:
+    modules = get_config("setup", "warm_start", "modules", default=DEFAULT_MODULES)
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _configure_mappers() -> None:
+    # Otherwise SQLAlchemy configures every mapper on the first query of each process
+    from sqlalchemy.orm import configure_mappers
+
+    configure_mappers()
+
+
+def _connect_database() -> None:
+    from database.engine import session_factory
+
+    for engine in (session_factory.main_engine, session_factory.timeseries_engine):
+        if engine is not None:
+            # checks a connection out and back into the pool
+            engine.connect().close()
+
+
+def _connect_django() -> None:
+    from django.db import connections
+
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def _connect_redis() -> None:
+    from services.redis import get_redis_connection
+
+    get_redis_connection().ping()
+
+
+def _create_storage_client() -> None:
+    from services.storage import get_storage_client
+
+    get_storage_client()
+
+
+MAIN_PROCESS_STEPS: list[tuple[str, Callable[[], None]]] = [
+    ("import_modules", _import_modules),
+    ("configure_mappers", _configure_mappers),
+]
+
+CHILD_PROCESS_STEPS: list[tuple[str, Callable[[], None]]] = [
+    ("database", _connect_database),
+    ("django", _connect_django),
+    ("redis", _connect_redis),
+    ("storage", _create_storage_client),
+]
+
+
+def _run_steps(process: str, steps: list[tuple[str, Callable[[], None]]]) -> None:
+    if not warm_start_enabled():
+        return
+
+    start = time.monotonic()
+    durations = {}
+    for name, step in steps:
+        step_start = time.monotonic()
+        try:
+            step()
+        except Exception:
+            # the step will just happen lazily on first use
+            log.warning(
+                "Failed to warm up worker process",
+                extra=dict(process=process, step=name),
+                exc_info=True,
+            )
+        durations[name] = round(time.monotonic() - step_start, 3)
+
+    elapsed = time.monotonic() - start
+    WARM_UP_RUNTIME.labels(process=process).observe(elapsed)
+    log.info(
+        "Warmed up worker process",
+        extra=dict(process=process, seconds=round(elapsed, 3), steps=durations),
+    )
+
+
+def warm_up_main_process() -> None:
+    _run_steps("main", MAIN_PROCESS_STEPS)
+
+
+def warm_up_child_process() -> None:
+    _run_steps("child", CHILD_PROCESS_STEPS)
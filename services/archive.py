@@ -1,23 +1,30 @@
-import json
 import logging
+import zlib
 from base64 import b16encode
 from datetime import datetime
 from enum import Enum
 from hashlib import md5
+from typing import Iterator
 from uuid import uuid4
 
+import orjson
 import sentry_sdk
 from shared.config import get_config
 from shared.utils.ReportEncoder import ReportEncoder
 
 from helpers.metrics import metrics
-from services.storage import get_storage_client
+from services.storage import files_exist, get_storage_client
 
 log = logging.getLogger(__name__)
 
 
 class MinioEndpoints(Enum):
     chunks = "{version}/repos/{repo_hash}/commits/{commitid}/{chunks_file_name}.txt"
+    chunks_index = (
+        "{version}/repos/{repo_hash}/commits/{commitid}/{chunks_file_name}/index.json"
+    )
+    chunks_shard = "{version}/repos/{repo_hash}/commits/{commitid}/{chunks_file_name}/shards/{shard}.txt"
+    labels_index = "{version}/repos/{repo_hash}/commits/{commitid}/{chunks_file_name}/labels_index.json"
     json_data = "{version}/repos/{repo_hash}/commits/{commitid}/json_data/{table}/{field}/{external_id}.json"
     json_data_no_commit = (
         "{version}/repos/{repo_hash}/json_data/{table}/{field}/{external_id}.json"
@@ -32,6 +39,59 @@ class MinioEndpoints(Enum):
         return self.value.format(**kwaargs)
 
 
+def gzip_text(*parts: str, slice_size: int = 4 * 1024 * 1024) -> bytes:
+    """
+    Encodes and gzips the concatenation of `parts` one slice at a time, so that
+    neither the concatenated text nor the whole encoded (uncompressed) text ever
+    has to be held in memory.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    compressed = [
+        compressor.compress(part[start : start + slice_size].encode())
+        for part in parts
+        for start in range(0, len(part), slice_size)
+    ]
+    compressed.append(compressor.flush())
+    return b"".join(compressed)
+
+
+def encoded_size(*parts: str, slice_size: int = 4 * 1024 * 1024) -> int:
+    """
+    Returns the size (in bytes) of the concatenation of `parts` encoded as UTF-8.
+
+    Python flags strings as ASCII when creating them, so for ASCII text (as
+    chunks files mostly are) this doesn't encode anything. Otherwise the text is
+    encoded one slice at a time, like `gzip_text` does.
+    """
+    size = 0
+    for part in parts:
+        if part.isascii():
+            size += len(part)
+        else:
+            size += sum(
+                len(part[start : start + slice_size].encode())
+                for start in range(0, len(part), slice_size)
+            )
+    return size
+
+
+def dump_json(data, encoder=ReportEncoder) -> bytes:
+    """
+    Serializes `data` with `orjson`, using the `default` of the `json.JSONEncoder`
+    class `encoder` for what `orjson` can't (or shouldn't) serialize natively.
+
+    Dataclasses and datetimes are passed to the encoder, so they are serialized
+    the same way as `json.dumps(data, cls=encoder)` would.
+    """
+    return orjson.dumps(
+        data,
+        default=encoder().default,
+        option=orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_DATETIME,
+    )
+
+
 # Service class for performing archive operations. Meant to work against the
 # underlying StorageService
 class ArchiveService(object):
@@ -124,7 +184,7 @@ class ArchiveService(object):
         path = MinioEndpoints.computed_comparison.get_path(
             version="v4", repo_hash=self.storage_hash, comparison_id=comparison.id
         )
-        self.write_file(path, json.dumps(data))
+        self.write_file(path, dump_json(data))
         return path
 
     def write_profiling_collection_result(self, version_identifier, data):
@@ -191,13 +251,18 @@ class ArchiveService(object):
                 field=field,
                 external_id=external_id,
             )
-        stringified_data = json.dumps(data, cls=encoder)
-        self.write_file(path, stringified_data)
+        self.write_file(path, dump_json(data, encoder=encoder))
         return path
 
-    def write_chunks(self, commit_sha, data, report_code=None) -> str:
+    def write_chunks(
+        self, commit_sha, data: str | bytes | list[str], report_code=None
+    ) -> str:
         """
         Convenience method to write a chunks.txt file to storage.
+
+        `data` is preferably passed as `str`, which is then compressed incrementally
+        instead of being encoded in full first. It can also be passed as a list of
+        `str` parts, which are written one after the other without being joined.
         """
         chunks_file_name = report_code if report_code is not None else "chunks"
         path = MinioEndpoints.chunks.get_path(
@@ -207,6 +272,55 @@ class ArchiveService(object):
             chunks_file_name=chunks_file_name,
         )
 
+        if isinstance(data, str):
+            data = [data]
+        if isinstance(data, list):
+            self.write_file(path, gzip_text(*data), is_already_gzipped=True)
+        else:
+            self.write_file(path, data)
+        return path
+
+    def write_chunks_shards(
+        self, commit_sha, index: bytes, shards: list[bytes], report_code=None
+    ) -> str:
+        """
+        Convenience method to write the shards of a chunks file, along with the
+        index describing them, to storage. Returns the path of the index.
+
+        The index is written last, so readers never see an index pointing to
+        shards that don't exist yet.
+        """
+        chunks_file_name = report_code if report_code is not None else "chunks"
+        for shard_number, shard in enumerate(shards):
+            path = MinioEndpoints.chunks_shard.get_path(
+                version="v4",
+                repo_hash=self.storage_hash,
+                commitid=commit_sha,
+                chunks_file_name=chunks_file_name,
+                shard=shard_number,
+            )
+            self.write_file(path, shard)
+
+        path = MinioEndpoints.chunks_index.get_path(
+            version="v4",
+            repo_hash=self.storage_hash,
+            commitid=commit_sha,
+            chunks_file_name=chunks_file_name,
+        )
+        self.write_file(path, index)
+        return path
+
+    def write_labels_index(self, commit_sha, data: bytes, report_code=None) -> str:
+        """
+        Convenience method to write the labels index of a report to storage.
+        """
+        chunks_file_name = report_code if report_code is not None else "chunks"
+        path = MinioEndpoints.labels_index.get_path(
+            version="v4",
+            repo_hash=self.storage_hash,
+            commitid=commit_sha,
+            chunks_file_name=chunks_file_name,
+        )
         self.write_file(path, data)
         return path
 
@@ -222,6 +336,14 @@ class ArchiveService(object):
         )
         return contents
 
+    @sentry_sdk.trace
+    def files_exist(self, paths: list[str]) -> list[bool]:
+        """
+        Checks whether each of `paths` exists in the archive, without
+        downloading them.
+        """
+        return files_exist(self.storage, self.root, paths)
+
     @sentry_sdk.trace
     def delete_file(self, path) -> None:
         """
@@ -236,13 +358,19 @@ class ArchiveService(object):
         """
         return self.storage.delete_files(self.root, paths)
 
+    def list_repo_files(self) -> Iterator[str]:
+        """
+        Lists the paths of an entire repository's contents
+        """
+        path = "v4/repos/{}".format(self.storage_hash)
+        for obj in self.storage.list_folder_contents(self.root, path):
+            yield obj["name"]
+
     def delete_repo_files(self) -> int:
         """
         Deletes an entire repository's contents
         """
-        path = "v4/repos/{}".format(self.storage_hash)
-        objects = self.storage.list_folder_contents(self.root, path)
-        results = self.storage.delete_files(self.root, [obj["name"] for obj in objects])
+        results = self.storage.delete_files(self.root, list(self.list_repo_files()))
         return len(results)
 
     def read_chunks(self, commit_sha, report_code=None) -> str:
@@ -258,3 +386,56 @@ class ArchiveService(object):
         )
 
         return self.read_file(path).decode(errors="replace")
+
+    def read_chunks_index(self, commit_sha, report_code=None) -> bytes:
+        """
+        Convenience method to read the index of a sharded chunks file.
+        """
+        chunks_file_name = report_code if report_code is not None else "chunks"
+        path = MinioEndpoints.chunks_index.get_path(
+            version="v4",
+            repo_hash=self.storage_hash,
+            commitid=commit_sha,
+            chunks_file_name=chunks_file_name,
+        )
+        return self.read_file(path)
+
+    def read_chunks_shard(self, commit_sha, shard: int, report_code=None) -> str:
+        """
+        Convenience method to read a single shard of a sharded chunks file.
+        """
+        chunks_file_name = report_code if report_code is not None else "chunks"
+        path = MinioEndpoints.chunks_shard.get_path(
+            version="v4",
+            repo_hash=self.storage_hash,
+            commitid=commit_sha,
+            chunks_file_name=chunks_file_name,
+            shard=shard,
+        )
+        return self.read_file(path).decode(errors="replace")
+
+    def read_labels_index(self, commit_sha, report_code=None) -> bytes:
+        """
+        Convenience method to read the labels index of a report.
+        """
+        chunks_file_name = report_code if report_code is not None else "chunks"
+        path = MinioEndpoints.labels_index.get_path(
+            version="v4",
+            repo_hash=self.storage_hash,
+            commitid=commit_sha,
+            chunks_file_name=chunks_file_name,
+        )
+        return self.read_file(path)
+
+    def delete_labels_index(self, commit_sha, report_code=None) -> None:
+        """
+        Convenience method to delete the labels index of a report.
+        """
+        chunks_file_name = report_code if report_code is not None else "chunks"
+        path = MinioEndpoints.labels_index.get_path(
+            version="v4",
+            repo_hash=self.storage_hash,
+            commitid=commit_sha,
+            chunks_file_name=chunks_file_name,
+        )
+        self.delete_file(path)
@@ -1,21 +1,33 @@
 import logging
+import random
 from dataclasses import dataclass
+from enum import Enum
 from typing import Any
 
 import sentry_sdk
 from asgiref.sync import async_to_sync
+from shared.config import get_config
 from shared.reports.changes import get_changes_using_rust, run_comparison_using_rust
 from shared.reports.types import Change, ReportTotals
 from shared.torngit.base import TorngitBaseAdapter
 from shared.torngit.exceptions import TorngitClientGeneralError
 from shared.utils.sessions import SessionType
 
+from app import celery_app
+from celery_config import shadow_changes_comparison_task_name
 from database.enums import CompareCommitState, TestResultsProcessingError
-from database.models import CompareCommit
+from database.models import Commit, CompareCommit, CompareComponent, CompareFlag
+from database.models.reports import RepositoryFlag
 from services.archive import ArchiveService
-from services.comparison.changes import get_changes
+from services.comparison.changes import DiffIndex, get_changes
+from services.comparison.metrics import (
+    COMPARISON_CHANGES_RUNTIME,
+    COMPARISON_STORED_TOTALS_REQUESTS,
+)
 from services.comparison.overlays import get_overlay
 from services.comparison.types import Comparison, FullCommit, ReportUploadedCount
+from services.redis import get_redis_connection
+from services.report.report_cache import get_report_version
 from services.repository import get_repo_provider_service
 
 log = logging.getLogger(__name__)
@@ -40,6 +52,100 @@ class ComparisonContext(object):
 NOT_RESOLVED: Any = object()
 
 
+class ChangesEngine(Enum):
+    python = "python"
+    rust = "rust"
+    shadow = "shadow"
+    """
+    Computes the changes with python, and compares them against the rust engine
+    in a background task for a sample of the comparisons.
+    """
+
+
+def get_changes_engine() -> ChangesEngine:
+    engine = get_config("setup", "comparison", "changes_engine", default="python")
+    try:
+        return ChangesEngine(engine)
+    except ValueError:
+        log.warning(
+            "Unknown changes engine configured, falling back to python",
+            extra=dict(changes_engine=engine),
+        )
+        return ChangesEngine.python
+
+
+def should_run_shadow_changes() -> bool:
+    """
+    Samples the comparisons for which the `shadow` engine runs the rust engine
+    in the background, given a percentage in `setup.comparison.shadow_sample_rate`.
+    """
+    sample_rate = get_config("setup", "comparison", "shadow_sample_rate", default=0)
+    return random.random() * 100 < sample_rate
+
+
+def should_reuse_stored_totals() -> bool:
+    return get_config("setup", "comparison", "reuse_stored_totals", default=False)
+
+
+# How long the report versions of stored comparison totals are kept around
+STORED_TOTALS_VERSIONS_TTL = 7 * 24 * 60 * 60
+
+
+def stored_totals_versions_key(comparison_id: int) -> str:
+    return f"compare-totals-versions/{comparison_id}"
+
+
+def get_compared_report_versions(base_commit: Commit, head_commit: Commit) -> str:
+    return f"{get_report_version(base_commit)}/{get_report_version(head_commit)}"
+
+
+def record_stored_totals_versions(comparison_id: int, versions: str) -> None:
+    """
+    Records the versions (as of `get_compared_report_versions`) of the reports
+    that the flag and component totals of a `CompareCommit` were computed from.
+    """
+    redis = get_redis_connection()
+    redis.set(
+        stored_totals_versions_key(comparison_id),
+        versions,
+        ex=STORED_TOTALS_VERSIONS_TTL,
+    )
+
+
+def totals_from_dict(totals: dict | None) -> ReportTotals | None:
+    return ReportTotals(**totals) if totals is not None else None
+
+
+@dataclass
+class StoredComparisonTotals(object):
+    """
+    The flag and component totals that `ComputeComparisonTask` stored for the same
+    base and head commits as a comparison.
+
+    These are only used when they were computed from the current reports of both
+    commits. Their patch totals were computed against the diff from the project
+    coverage base.
+    """
+
+    flags: dict[str, CompareFlag]
+    components: dict[str, CompareComponent]
+    patch_base_is_project_base: bool
+
+    def get_flag(self, flag_name: str) -> CompareFlag | None:
+        flag = self.flags.get(flag_name)
+        COMPARISON_STORED_TOTALS_REQUESTS.labels(
+            kind="flag", result="miss" if flag is None else "hit"
+        ).inc()
+        return flag
+
+    def get_component(self, component_id: str) -> CompareComponent | None:
+        component = self.components.get(component_id)
+        COMPARISON_STORED_TOTALS_REQUESTS.labels(
+            kind="component", result="miss" if component is None else "hit"
+        ).inc()
+        return component
+
+
 class ComparisonProxy(object):
     """The idea of this class is to produce a wrapper around Comparison with functionalities that
         are useful to the notifications context.
@@ -66,6 +172,7 @@ class ComparisonProxy(object):
         self._repository_service = None
         self._adjusted_base_diff = NOT_RESOLVED
         self._original_base_diff = NOT_RESOLVED
+        self._diff_indexes: dict[bool, DiffIndex] = {}
         self._patch_totals = NOT_RESOLVED
         self._changes = NOT_RESOLVED
         self._existing_statuses = None
@@ -75,6 +182,7 @@ class ComparisonProxy(object):
         self._overlays = {}
         self.context = context or ComparisonContext()
         self._cached_reports_uploaded_per_flag: list[ReportUploadedCount] | None = None
+        self._stored_totals = NOT_RESOLVED
 
     def get_archive_service(self):
         if self._archive_service is None:
@@ -163,42 +271,72 @@ class ComparisonProxy(object):
         else:
             return self._adjusted_base_diff
 
+    def get_diff_index(self, use_original_base=False) -> DiffIndex:
+        """
+        Returns the parsed form of `get_diff`, which is shared between all
+        the consumers of the same diff.
+        """
+        if use_original_base not in self._diff_indexes:
+            self._diff_indexes[use_original_base] = DiffIndex(
+                self.get_diff(use_original_base=use_original_base)
+            )
+        return self._diff_indexes[use_original_base]
+
+    def has_rust_reports(self) -> bool:
+        base_report = self.comparison.project_coverage_base.report
+        head_report = self.comparison.head.report
+        return (
+            base_report is not None
+            and head_report is not None
+            and base_report.rust_report is not None
+            and head_report.rust_report is not None
+        )
+
     def get_changes(self) -> list[Change] | None:
         if self._changes is NOT_RESOLVED:
             diff = self.get_diff()
-            self._changes = get_changes(
-                self.comparison.project_coverage_base.report,
-                self.comparison.head.report,
-                diff,
-            )
-            if (
-                self._changes
-                and self.comparison.project_coverage_base.report is not None
-                and self.comparison.head.report is not None
-                and self.comparison.project_coverage_base.report.rust_report is not None
-                and self.comparison.head.report.rust_report is not None
-            ):
-                rust_changes = get_changes_using_rust(
-                    self.comparison.project_coverage_base.report,
-                    self.comparison.head.report,
-                    diff,
-                )
-                original_paths = set([c.path for c in self._changes])
-                new_paths = set([c.path for c in rust_changes])
-                if original_paths != new_paths:
-                    only_on_new = sorted(new_paths - original_paths)
-                    only_on_original = sorted(original_paths - new_paths)
-                    log.info(
-                        "There are differences between python changes and rust changes",
-                        extra=dict(
-                            only_on_new=only_on_new[:100],
-                            only_on_original=only_on_original[:100],
-                            repoid=self.head.commit.repoid,
-                        ),
+            engine = get_changes_engine()
+            if engine == ChangesEngine.rust and self.has_rust_reports():
+                with COMPARISON_CHANGES_RUNTIME.labels(engine="rust").time():
+                    self._changes = get_changes_using_rust(
+                        self.comparison.project_coverage_base.report,
+                        self.comparison.head.report,
+                        diff,
+                    )
+            else:
+                with COMPARISON_CHANGES_RUNTIME.labels(engine="python").time():
+                    self._changes = get_changes(
+                        self.comparison.project_coverage_base.report,
+                        self.comparison.head.report,
+                        diff,
+                        diff_index=self.get_diff_index(),
                     )
+                if (
+                    engine == ChangesEngine.shadow
+                    and self._changes
+                    and self.has_rust_reports()
+                    and should_run_shadow_changes()
+                ):
+                    self.schedule_shadow_changes()
 
         return self._changes
 
+    def schedule_shadow_changes(self) -> None:
+        """
+        Schedules the comparison of the python changes against the rust engine,
+        which is done off the notification path.
+        """
+        celery_app.send_task(
+            shadow_changes_comparison_task_name,
+            args=None,
+            kwargs=dict(
+                repoid=self.head.commit.repoid,
+                base_commitid=self.project_coverage_base.commit.commitid,
+                head_commitid=self.head.commit.commitid,
+                python_paths=sorted(set(c.path for c in self._changes)),
+            ),
+        )
+
     @sentry_sdk.trace
     def get_patch_totals(self) -> ReportTotals | None:
         """Returns the patch coverage for the comparison.
@@ -211,6 +349,69 @@ class ComparisonProxy(object):
 
         return self._patch_totals
 
+    def get_stored_comparison_totals(self) -> StoredComparisonTotals | None:
+        """
+        Returns the totals stored by `ComputeComparisonTask` for this base/head pair,
+        so notifications don't need to compute them again.
+
+        This is `None` when there is no processed comparison for the pair.
+        """
+        if self._stored_totals is NOT_RESOLVED:
+            self._stored_totals = None
+            if should_reuse_stored_totals():
+                self._stored_totals = self._load_stored_comparison_totals()
+        return self._stored_totals
+
+    def _load_stored_comparison_totals(self) -> StoredComparisonTotals | None:
+        base_commit = self.comparison.project_coverage_base.commit
+        head_commit = self.comparison.head.commit
+        if base_commit is None or head_commit is None:
+            return None
+        db_session = head_commit.get_db_session()
+        if db_session is None:
+            return None
+
+        compare_commit = (
+            db_session.query(CompareCommit)
+            .filter_by(
+                base_commit_id=base_commit.id_,
+                compare_commit_id=head_commit.id_,
+                state=CompareCommitState.processed.value,
+            )
+            .one_or_none()
+        )
+        if compare_commit is None:
+            return None
+
+        # the totals are stale when a report of either commit was saved since
+        redis = get_redis_connection()
+        stored_versions = redis.get(stored_totals_versions_key(compare_commit.id_))
+        current_versions = get_compared_report_versions(base_commit, head_commit)
+        if stored_versions is None or stored_versions.decode() != current_versions:
+            return None
+
+        flags = {
+            flag_name: flag_comparison
+            for flag_comparison, flag_name in db_session.query(
+                CompareFlag, RepositoryFlag.flag_name
+            )
+            .join(RepositoryFlag, CompareFlag.repositoryflag_id == RepositoryFlag.id_)
+            .filter(CompareFlag.commit_comparison_id == compare_commit.id_)
+        }
+        components = {
+            component_comparison.component_id: component_comparison
+            for component_comparison in db_session.query(CompareComponent).filter(
+                CompareComponent.commit_comparison_id == compare_commit.id_
+            )
+        }
+        return StoredComparisonTotals(
+            flags=flags,
+            components=components,
+            patch_base_is_project_base=(
+                self.comparison.patch_coverage_base_commitid == base_commit.commitid
+            ),
+        )
+
     def get_behind_by(self):
         if self._behind_by is None:
             if not getattr(
@@ -389,6 +590,9 @@ class FilteredComparison(object):
     def get_diff(self, use_original_base=False):
         return self.real_comparison.get_diff(use_original_base=use_original_base)
 
+    def get_diff_index(self, use_original_base=False) -> DiffIndex:
+        return self.real_comparison.get_diff_index(use_original_base=use_original_base)
+
     @sentry_sdk.trace
     def get_patch_totals(self) -> ReportTotals | None:
         """Returns the patch coverage for the comparison.
@@ -404,6 +608,10 @@ class FilteredComparison(object):
     def get_existing_statuses(self):
         return self.real_comparison.get_existing_statuses()
 
+    def get_stored_comparison_totals(self) -> StoredComparisonTotals | None:
+        # the stored totals are the ones of the unfiltered comparison
+        return None
+
     def has_project_coverage_base_report(self):
         return self.real_comparison.has_project_coverage_base_report()
 
@@ -415,7 +623,10 @@ class FilteredComparison(object):
         if self._changes is None:
             diff = self.get_diff()
             self._changes = get_changes(
-                self.project_coverage_base.report, self.head.report, diff
+                self.project_coverage_base.report,
+                self.head.report,
+                diff,
+                diff_index=self.get_diff_index(),
             )
         return self._changes
 
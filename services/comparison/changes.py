@@ -9,6 +9,8 @@ from shared.reports.resources import Report
 from shared.reports.types import Change, ReportTotals
 from shared.utils.merge import line_type
 
+from services.report.fingerprints import get_file_fingerprints
+
 log = logging.getLogger(__name__)
 
 
@@ -81,9 +83,58 @@ def get_segment_offsets(segments) -> tuple[dict[int, Any], list[int], list[int]]
     return dict([(k, v) for k, v in offsets.items() if v != 0]), additions, removals
 
 
+@dataclasses.dataclass
+class FileDiffIndex:
+    """
+    The parsed segments of a single file diff, as returned by `get_segment_offsets`,
+    with set-based membership for the added and removed lines.
+    """
+
+    offsets: dict[int, int]
+    additions: frozenset[int]
+    removals: frozenset[int]
+    additions_count: int
+    removals_count: int
+
+    @classmethod
+    def from_segments(cls, segments) -> "FileDiffIndex":
+        offsets, additions, removals = get_segment_offsets(segments)
+        return cls(
+            offsets=offsets,
+            additions=frozenset(additions),
+            removals=frozenset(removals),
+            additions_count=len(additions),
+            removals_count=len(removals),
+        )
+
+
+class DiffIndex:
+    """
+    Lazily parses and memoizes the per-file segments of a diff as returned by torngit,
+    so that all the consumers of the same diff only parse each file once.
+    """
+
+    def __init__(self, diff_json: dict[str, Any] | None):
+        self.files: dict[str, Any] = diff_json["files"] if diff_json else {}
+        self._file_indexes: dict[str, FileDiffIndex] = {}
+
+    def get_file_index(self, path: str) -> FileDiffIndex | None:
+        file_index = self._file_indexes.get(path)
+        if file_index is None:
+            file_diff = self.files.get(path)
+            if file_diff is None:
+                return None
+            file_index = FileDiffIndex.from_segments(file_diff["segments"])
+            self._file_indexes[path] = file_index
+        return file_index
+
+
 @sentry_sdk.trace
 def get_changes(
-    base_report: Report, head_report: Report, diff_json: dict[str, Any] | None
+    base_report: Report,
+    head_report: Report,
+    diff_json: dict[str, Any] | None,
+    diff_index: DiffIndex | None = None,
 ) -> list[Change] | None:
     """
 
@@ -111,12 +162,15 @@ def get_changes(
         base_report (Report): The report for the base commit
         head_report (Report): The report for the head commit
         diff_json (Mapping[str, Any]): The diff between the base and head commit as returned by torngit
+        diff_index (DiffIndex | None): The already parsed `diff_json`, if available
 
     Returns:
         List[Change]: A list of unexpected changes between base_report and head_report
     """
     if base_report is None or head_report is None:
         return None
+    if diff_index is None:
+        diff_index = DiffIndex(diff_json)
 
     changes = []
     base_files = set(base_report.files)
@@ -134,6 +188,9 @@ def get_changes(
     # added files
     new_files = head_files - base_files - diff_keys - moved_files
 
+    base_fingerprints = get_file_fingerprints(base_report)
+    head_fingerprints = get_file_fingerprints(head_report)
+
     # find modified !diff files
     for _file in head_report:
         filename = _file.name
@@ -142,6 +199,13 @@ def get_changes(
             continue
 
         diff = diff_json["files"].get(filename) if diff_json is not None else None
+        if diff is None:
+            fingerprint = head_fingerprints.get(filename)
+            if fingerprint is not None and fingerprint == base_fingerprints.get(
+                filename
+            ):
+                # file is outside the diff and its coverage is identical
+                continue
         base_report_file = base_report.get(
             (diff.get("before") or filename) if diff else filename
         )
@@ -164,8 +228,7 @@ def get_changes(
                 # Diff says it's because it's new
                 # This is expected
                 continue
-            r = get_segment_offsets(diff["segments"])
-            additions: set[int] = set(r[1])
+            additions = diff_index.get_file_index(filename).additions
             if any(ln not in additions for ln, _ in _file.lines):
                 # file has new coverage lines that are not accounted by the diff
                 new_files.add(filename)
@@ -177,6 +240,7 @@ def get_changes(
                 head_report_file=_file,
                 diff=diff,
                 yield_line_numbers=False,
+                file_index=diff_index.get_file_index(filename) if diff else None,
             )
         )
 
@@ -211,8 +275,8 @@ def get_changes(
             if diff.get("type") != "deleted":
                 base_report_file = base_report.get(possibly_deleted_filename)
                 present_lines_on_base = set(x[0] for x in base_report_file.lines)
-                _, _, line_removals = get_segment_offsets(diff["segments"])
-                lines_unnaccounted_for = present_lines_on_base - set(line_removals)
+                line_removals = diff_index.get_file_index(head_name).removals
+                lines_unnaccounted_for = present_lines_on_base - line_removals
                 if lines_unnaccounted_for:
                     changes.append(Change(path=head_name, deleted=True))
 
@@ -240,15 +304,26 @@ def get_totals_from_list(lst) -> ReportTotals:
 
 
 def iter_changed_lines(
-    base_report_file, head_report_file, diff=None, yield_line_numbers=True
+    base_report_file,
+    head_report_file,
+    diff=None,
+    yield_line_numbers=True,
+    file_index: FileDiffIndex | None = None,
 ) -> Iterator[Union[int, Tuple[Any, Any]]]:
     """
     streams line numbers that changed as integers > 0
+
+    `file_index` is the already parsed `diff`, if available
     """
     if not diff or diff["type"] == "modified":
-        offsets, skip_lines, removed_lines = (
-            get_segment_offsets(diff["segments"]) if diff else (None, None, None)
-        )
+        if diff and file_index is None:
+            file_index = FileDiffIndex.from_segments(diff["segments"])
+        if file_index is not None:
+            offsets = file_index.offsets
+            skip_lines = file_index.additions
+            lines_delta = file_index.additions_count - file_index.removals_count
+        else:
+            offsets, skip_lines, lines_delta = None, None, 0
         base_ln = 0
         base_report_file_eof = (
             base_report_file.eof if base_report_file is not None else 0
@@ -258,9 +333,7 @@ def iter_changed_lines(
             max(
                 (
                     base_report_file_eof,
-                    base_report_file_eof
-                    + len(skip_lines or [])
-                    - len(removed_lines or []),
+                    base_report_file_eof + lines_delta,
                     head_report_file.eof,
                 )
             )
@@ -0,0 +1,20 @@
+from shared.metrics import Counter, Histogram
+
+COMPARISON_CHANGES_RUNTIME = Histogram(
+    "worker_services_comparison_changes_runtime_seconds",
+    "Time it takes (in seconds) to compute the unexpected coverage changes of a comparison. The `engine` can be `python` or `rust`.",
+    ["engine"],
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120],
+)
+
+COMPARISON_CHANGES_SHADOW_RESULTS = Counter(
+    "worker_services_comparison_changes_shadow_results",
+    "Number of shadow comparisons between the python and rust changes engines. The `result` can be `match` or `mismatch`.",
+    ["result"],
+)
+
+COMPARISON_STORED_TOTALS_REQUESTS = Counter(
+    "worker_services_comparison_stored_totals_requests",
+    "Number of flag and component totals looked up in the stored comparison of a base/head pair. The `kind` can be `flag` or `component`, and the `result` can be `hit` or `miss`.",
+    ["kind", "result"],
+)
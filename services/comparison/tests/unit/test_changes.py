@@ -4,10 +4,16 @@ from shared.reports.types import ReportTotals
 
 from services.comparison.changes import (
     Change,
+    DiffIndex,
+    FileDiffIndex,
     diff_totals,
     get_changes,
     get_segment_offsets,
 )
+from services.report.fingerprints import (
+    FILE_FINGERPRINTS_HEADER_KEY,
+    compute_file_fingerprints,
+)
 
 
 class TestDiffTotals(object):
@@ -90,6 +96,44 @@ def test_get_segment_offsets(segments, result):
     )
 
 
+class TestDiffIndex(object):
+    def test_file_diff_index(self):
+        segments = [
+            {"header": ["1", "0", "1", "0"], "lines": list("-+ -+ -+ -----++++ ")}
+        ]
+        file_index = FileDiffIndex.from_segments(segments)
+        offsets, additions, removals = get_segment_offsets(segments)
+        assert file_index.offsets == offsets
+        assert file_index.additions == frozenset(additions)
+        assert file_index.removals == frozenset(removals)
+        assert file_index.additions_count == len(additions)
+        assert file_index.removals_count == len(removals)
+
+    def test_diff_index_memoizes_files(self):
+        diff_index = DiffIndex(
+            {
+                "files": {
+                    "a.py": {
+                        "type": "modified",
+                        "segments": [
+                            {"header": ["1", "1", "1", "1"], "lines": ["-a", "+b"]}
+                        ],
+                    }
+                }
+            }
+        )
+        file_index = diff_index.get_file_index("a.py")
+        assert file_index.additions == {1}
+        assert file_index.removals == {1}
+        assert diff_index.get_file_index("a.py") is file_index
+        assert diff_index.get_file_index("b.py") is None
+
+    def test_diff_index_no_diff(self):
+        diff_index = DiffIndex(None)
+        assert diff_index.files == {}
+        assert diff_index.get_file_index("a.py") is None
+
+
 class TestChanges(object):
     def test_get_changes_eof_case(self):
         json_diff = {
@@ -462,3 +506,46 @@ class TestChanges(object):
         for r in res:
             print(r)
         assert res == []
+
+    def test_get_changes_skips_files_with_same_fingerprint(self, mocker):
+        first_report = Report()
+        second_report = Report()
+        first_file = ReportFile("unchanged.py")
+        second_file = ReportFile("unchanged.py")
+        first_file.append(1, ReportLine.create(coverage=1))
+        second_file.append(1, ReportLine.create(coverage=1))
+        first_report.append(first_file)
+        second_report.append(second_file)
+        first_report.header = {
+            FILE_FINGERPRINTS_HEADER_KEY: compute_file_fingerprints(first_report)
+        }
+        second_report.header = {
+            FILE_FINGERPRINTS_HEADER_KEY: compute_file_fingerprints(second_report)
+        }
+        iter_changed_lines = mocker.patch(
+            "services.comparison.changes.iter_changed_lines"
+        )
+
+        assert get_changes(first_report, second_report, {"files": {}}) == []
+        assert not iter_changed_lines.called
+
+    def test_get_changes_walks_files_with_different_fingerprint(self):
+        first_report = Report()
+        second_report = Report()
+        first_file = ReportFile("changed.py")
+        second_file = ReportFile("changed.py")
+        first_file.append(1, ReportLine.create(coverage=1))
+        second_file.append(1, ReportLine.create(coverage=0))
+        first_report.append(first_file)
+        second_report.append(second_file)
+        first_report.header = {
+            FILE_FINGERPRINTS_HEADER_KEY: compute_file_fingerprints(first_report)
+        }
+        second_report.header = {
+            FILE_FINGERPRINTS_HEADER_KEY: compute_file_fingerprints(second_report)
+        }
+
+        res = get_changes(first_report, second_report, {"files": {}})
+        assert [change.path for change in res] == ["changed.py"]
+        assert res[0].totals.hits == -1
+        assert res[0].totals.misses == 1
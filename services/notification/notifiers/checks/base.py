@@ -1,8 +1,11 @@
 import logging
 from contextlib import nullcontext
+from itertools import islice
+from typing import Iterable, Iterator
 
 import sentry_sdk
 from asgiref.sync import async_to_sync
+from shared.config import get_config
 from shared.torngit.exceptions import TorngitClientError, TorngitError
 
 from services.comparison import ComparisonProxy, FilteredComparison
@@ -63,9 +66,12 @@ class ChecksNotifier(StatusNotifier):
             ]
         )
 
-    def paginate_annotations(self, annotations):
-        for i in range(0, len(annotations), self.ANNOTATIONS_PER_REQUEST):
-            yield annotations[i : i + self.ANNOTATIONS_PER_REQUEST]
+    def paginate_annotations(
+        self, annotations: Iterable[dict]
+    ) -> Iterator[list[dict]]:
+        annotations = iter(annotations)
+        while page := list(islice(annotations, self.ANNOTATIONS_PER_REQUEST)):
+            yield page
 
     def build_payload(self, comparison: ComparisonProxy | FilteredComparison) -> dict:
         raise NotImplementedError()
@@ -285,76 +291,97 @@ class ChecksNotifier(StatusNotifier):
 
         lines_diff = []
         for segment in segments:
-            header = segment["header"].copy()
-            lines = segment["lines"].copy()
-            base_ln = int(header[0])
-            head_ln = int(header[2])
-            while not len(lines) == 0:
-                line_value = lines.pop(0)
+            head_ln = int(segment["header"][2])
+            for line_value in segment["lines"]:
                 if line_value and line_value[0] == "+":
                     lines_diff.append({"head_line": head_ln})
                     head_ln += 1
-                elif line_value and line_value[0] == "-":
-                    base_ln += 1
-                else:
+                elif not line_value or line_value[0] != "-":
                     head_ln += 1
-                    base_ln += 1
-            file_diff["additions"] = lines_diff
+        file_diff["additions"] = lines_diff
         return file_diff
 
     def get_codecov_pr_link(self, comparison: ComparisonProxy | FilteredComparison):
         return f"[View this Pull Request on Codecov]({get_pull_url(comparison.pull)}?dropdown=coverage&src=pr&el=h1)"
 
     def get_lines_to_annotate(self, comparison: ComparisonProxy, files_with_change):
-        lines_diff = []
+        return list(self.iter_lines_to_annotate(comparison, files_with_change))
+
+    def iter_lines_to_annotate(
+        self, comparison: ComparisonProxy, files_with_change: Iterable[dict | None]
+    ) -> Iterator[dict]:
+        """
+        Lazily yields the ranges of consecutive added lines that are not covered,
+        one file at a time.
+        """
         for _file in files_with_change:
             if _file is None:
                 continue
             head_file_report = comparison.head.report.get(_file["path"])
-            for head_line in head_file_report.lines:
-                line_addition = next(
-                    (
-                        line
-                        for line in _file["additions"]
-                        if head_line[0] == line["head_line"]
-                    ),
-                    None,
-                )
-                if line_addition and head_line[1].coverage == 0:
-                    lines_diff.append(
-                        {
-                            "type": "new_line",
-                            "line": head_line[0],
-                            "coverage": head_line[1].coverage,
-                            "path": _file["path"],
-                        }
-                    )
-        line_headers = []
-        previous_line = {}
-        for index, line in enumerate(lines_diff):
-            if index == 0:
-                line_headers.append(line)
-            elif line["line"] != previous_line["line"] + 1:
-                line_headers[len(line_headers) - 1]["end_line"] = previous_line["line"]
-                line_headers.append(line)
-            if index == len(lines_diff) - 1:
-                line_headers[len(line_headers) - 1]["end_line"] = line["line"]
-            previous_line = line
-        return line_headers
+            if head_file_report is None:
+                continue
+            added_lines = {line["head_line"] for line in _file["additions"]}
+            current_range = None
+            for ln, line in head_file_report.lines:
+                if ln not in added_lines or line.coverage != 0:
+                    continue
+                if current_range is not None and ln == current_range["end_line"] + 1:
+                    current_range["end_line"] = ln
+                    continue
+                if current_range is not None:
+                    yield current_range
+                current_range = {
+                    "type": "new_line",
+                    "line": ln,
+                    "coverage": line.coverage,
+                    "path": _file["path"],
+                    "end_line": ln,
+                }
+            if current_range is not None:
+                yield current_range
+
+    def get_max_annotations(self) -> int | None:
+        """
+        Returns the maximum number of annotations of a check run, `None` (the
+        default) meaning that every uncovered line is annotated.
+        """
+        return get_config("setup", "checks", "max_annotations", default=None)
 
     def create_annotations(
         self, comparison: ComparisonProxy | FilteredComparison, diff
     ):
+        return list(self.iter_annotations(comparison, diff))
+
+    def iter_annotations(
+        self, comparison: ComparisonProxy | FilteredComparison, diff
+    ) -> Iterator[dict]:
+        """
+        Lazily yields the annotations for the uncovered added lines of `diff`.
+
+        Files with the most missed lines are annotated first. When
+        `get_max_annotations` is configured, no more annotations than that are
+        produced, so that huge diffs don't have to be walked in full.
+        """
+        diff_files = diff["files"] if diff else {}
         files_with_change = [
             {"type": _diff["type"], "path": path, "segments": _diff["segments"]}
-            for path, _diff in (diff["files"] if diff else {}).items()
+            for path, _diff in diff_files.items()
             if _diff.get("totals")
         ]
-        file_additions = [self.get_line_diff(_file) for _file in files_with_change]
-        lines_to_annotate = self.get_lines_to_annotate(comparison, file_additions)
-        annotations = []
+        # annotate the files with the most missed lines first
+        files_with_change.sort(
+            key=lambda _file: (
+                getattr(diff_files[_file["path"]]["totals"], "misses", 0) or 0
+            ),
+            reverse=True,
+        )
+        file_additions = (self.get_line_diff(_file) for _file in files_with_change)
+        lines_to_annotate = self.iter_lines_to_annotate(comparison, file_additions)
+        max_annotations = self.get_max_annotations()
+        if max_annotations is not None:
+            lines_to_annotate = islice(lines_to_annotate, max_annotations)
         for line in lines_to_annotate:
-            annotation = {
+            yield {
                 "path": line["path"],
                 "start_line": line["line"],
                 "end_line": line["end_line"],
@@ -367,8 +394,6 @@ class ChecksNotifier(StatusNotifier):
                     else "Added line #L{} was not covered by tests".format(line["line"])
                 ),
             }
-            annotations.append(annotation)
-        return annotations
 
     def send_notification(self, comparison: ComparisonProxy, payload):
         repository_service = self.repository_service
@@ -414,17 +439,10 @@ class ChecksNotifier(StatusNotifier):
         )
 
         if len(output.get("annotations", [])) > self.ANNOTATIONS_PER_REQUEST:
-            annotation_pages = list(
-                self.paginate_annotations(output.get("annotations"))
-            )
-            log.info(
-                "Paginating annotations",
-                extra=dict(
-                    number_pages=len(annotation_pages),
-                    number_annotations=len(output.get("annotations")),
-                ),
-            )
-            for annotation_page in annotation_pages:
+            number_pages = 0
+            for annotation_page in self.paginate_annotations(
+                output.get("annotations")
+            ):
                 async_to_sync(repository_service.update_check_run)(
                     check_id,
                     state,
@@ -435,6 +453,14 @@ class ChecksNotifier(StatusNotifier):
                     },
                     url=payload.get("url"),
                 )
+                number_pages += 1
+            log.info(
+                "Paginated annotations",
+                extra=dict(
+                    number_pages=number_pages,
+                    number_annotations=len(output.get("annotations")),
+                ),
+            )
 
         else:
             async_to_sync(repository_service.update_check_run)(
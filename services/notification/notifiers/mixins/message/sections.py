@@ -11,7 +11,7 @@ from shared.reports.resources import Report
 
 from helpers.environment import is_enterprise
 from helpers.reports import get_totals_from_file_in_reports
-from services.comparison import ComparisonProxy
+from services.comparison import ComparisonProxy, totals_from_dict
 from services.comparison.overlays import OverlayType
 from services.comparison.types import ReportUploadedCount
 from services.notification.notifiers.mixins.message.helpers import (
@@ -545,6 +545,7 @@ class FlagSectionWriter(BaseSectionWriter):
         missing_flags = set(base_flags.keys()) - set(head_flags.keys())
         flags = []
 
+        stored_totals = comparison.get_stored_comparison_totals()
         show_carriedforward_flags = self.settings.get("show_carryforward_flags", False)
         for name, flag in head_flags.items():
             if (show_carriedforward_flags is True) or (  # Include all flags
@@ -552,14 +553,29 @@ class FlagSectionWriter(BaseSectionWriter):
                 and flag.carriedforward
                 is False  # Only include flags without carriedforward coverage
             ):
+                stored_flag = stored_totals.get_flag(name) if stored_totals else None
+                if stored_flag is not None:
+                    before = totals_from_dict(stored_flag.base_totals)
+                    after = totals_from_dict(stored_flag.head_totals)
+                else:
+                    before = get_totals_from_file_in_reports(base_flags, name)
+                    after = flag.totals
+
+                if not walk(diff, ("files",)):
+                    flag_diff = None
+                elif (
+                    stored_flag is not None and stored_totals.patch_base_is_project_base
+                ):
+                    flag_diff = totals_from_dict(stored_flag.patch_totals)
+                else:
+                    flag_diff = flag.apply_diff(diff)
+
                 flags.append(
                     {
                         "name": name,
-                        "before": get_totals_from_file_in_reports(base_flags, name),
-                        "after": flag.totals,
-                        "diff": (
-                            flag.apply_diff(diff) if walk(diff, ("files",)) else None
-                        ),
+                        "before": before,
+                        "after": after,
+                        "diff": flag_diff,
                         "carriedforward": flag.carriedforward,
                         "carriedforward_from": flag.carriedforward_from,
                     }
@@ -668,7 +684,26 @@ class ComponentsSectionWriter(BaseSectionWriter):
         self, all_components, comparison: ComparisonProxy
     ) -> list[dict]:
         component_data = []
+        stored_totals = comparison.get_stored_comparison_totals()
+        component_ids = [component.component_id for component in all_components]
         for component in all_components:
+            # a stored entry is only unambiguous if its component id is unique
+            stored_component = (
+                stored_totals.get_component(component.component_id)
+                if stored_totals and component_ids.count(component.component_id) == 1
+                else None
+            )
+            if stored_component is not None:
+                component_data.append(
+                    {
+                        "name": component.get_display_name(),
+                        "before": totals_from_dict(stored_component.base_totals),
+                        "after": totals_from_dict(stored_component.head_totals),
+                        "diff": totals_from_dict(stored_component.patch_totals),
+                    }
+                )
+                continue
+
             flags = component.get_matching_flags(comparison.head.report.flags.keys())
             filtered_comparison = comparison.get_filtered_comparison(
                 flags, component.paths
@@ -5,6 +5,7 @@ from urllib.parse import quote_plus
 import pytest
 from shared.reports.readonly import ReadOnlyReport
 from shared.reports.resources import Report, ReportFile, ReportLine
+from shared.reports.types import ReportTotals
 from shared.torngit.exceptions import TorngitClientGeneralError, TorngitError
 from shared.torngit.status import Status
 from shared.yaml.user_yaml import UserYaml
@@ -667,6 +668,104 @@ class TestBaseChecksNotifier(object):
         result = notifier.get_lines_to_annotate(sample_comparison, files_with_change)
         assert expected_result == result
 
+    def test_get_lines_to_annotate_does_not_merge_across_files(
+        self, sample_comparison
+    ):
+        notifier = ChecksNotifier(
+            repository=sample_comparison.head.commit.repository,
+            title="title",
+            notifier_yaml_settings={},
+            notifier_site_settings=True,
+            current_yaml=UserYaml({}),
+            repository_service=None,
+        )
+        report = Report()
+        for filename in ["file_1.go", "file_2.go"]:
+            report_file = ReportFile(filename)
+            report_file.append(1, ReportLine.create(coverage=0))
+            report_file.append(2, ReportLine.create(coverage=0))
+            report.append(report_file)
+        sample_comparison.head.report = report
+        files_with_change = [
+            {"type": "modified", "path": "file_1.go", "additions": [{"head_line": 1}]},
+            None,
+            {"type": "modified", "path": "file_2.go", "additions": [{"head_line": 2}]},
+            {"type": "new", "path": "missing.go", "additions": [{"head_line": 1}]},
+        ]
+        expected_result = [
+            {
+                "type": "new_line",
+                "line": 1,
+                "coverage": 0,
+                "path": "file_1.go",
+                "end_line": 1,
+            },
+            {
+                "type": "new_line",
+                "line": 2,
+                "coverage": 0,
+                "path": "file_2.go",
+                "end_line": 2,
+            },
+        ]
+        result = notifier.get_lines_to_annotate(sample_comparison, files_with_change)
+        assert expected_result == result
+
+    def test_create_annotations_prioritizes_and_caps(
+        self, sample_comparison, mock_configuration
+    ):
+        mock_configuration.params["setup"]["checks"] = {"max_annotations": 2}
+        notifier = ChecksNotifier(
+            repository=sample_comparison.head.commit.repository,
+            title="title",
+            notifier_yaml_settings={},
+            notifier_site_settings=True,
+            current_yaml=UserYaml({}),
+            repository_service=None,
+        )
+        report = Report()
+        for filename in ["few_misses.go", "many_misses.go"]:
+            report_file = ReportFile(filename)
+            report_file.append(1, ReportLine.create(coverage=0))
+            report_file.append(3, ReportLine.create(coverage=0))
+            report_file.append(5, ReportLine.create(coverage=0))
+            report.append(report_file)
+        sample_comparison.head.report = report
+        segments = [{"header": ["1", "0", "1", "5"], "lines": ["+a"] * 5}]
+        diff = {
+            "files": {
+                "few_misses.go": {
+                    "type": "modified",
+                    "segments": deepcopy(segments),
+                    "totals": ReportTotals(misses=1),
+                },
+                "many_misses.go": {
+                    "type": "modified",
+                    "segments": deepcopy(segments),
+                    "totals": ReportTotals(misses=3),
+                },
+                "no_totals.go": {"type": "modified", "segments": deepcopy(segments)},
+            }
+        }
+        annotations = notifier.create_annotations(sample_comparison, diff)
+        assert [
+            (annotation["path"], annotation["start_line"]) for annotation in annotations
+        ] == [("many_misses.go", 1), ("many_misses.go", 3)]
+
+        # annotations are not capped unless configured
+        del mock_configuration.params["setup"]["checks"]
+        annotations = notifier.create_annotations(sample_comparison, diff)
+        assert [
+            (annotation["path"], annotation["start_line"]) for annotation in annotations
+        ] == [
+            ("many_misses.go", 1),
+            ("many_misses.go", 3),
+            ("many_misses.go", 5),
+            ("few_misses.go", 1),
+            ("few_misses.go", 3),
+            ("few_misses.go", 5),
+        ]
+
 
 class TestPatchChecksNotifier(object):
     def test_paginate_annotations(
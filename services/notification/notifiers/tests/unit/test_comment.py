@@ -17,12 +17,24 @@ from shared.utils.sessions import Session
 from shared.validation.types import CoverageCommentRequiredChanges
 from shared.yaml import UserYaml
 
-from database.enums import TestResultsProcessingError
+from database.enums import CompareCommitState, TestResultsProcessingError
 from database.models.core import Commit, GithubAppInstallation, Pull, Repository
+from database.models.reports import CompareComponent
 from database.tests.factories import RepositoryFactory
-from database.tests.factories.core import CommitFactory, OwnerFactory, PullFactory
+from database.tests.factories.core import (
+    CommitFactory,
+    CompareCommitFactory,
+    OwnerFactory,
+    PullFactory,
+)
 from services.billing import BillingPlan
-from services.comparison import ComparisonContext, ComparisonProxy
+from services.comparison import (
+    NOT_RESOLVED,
+    ComparisonContext,
+    ComparisonProxy,
+    get_compared_report_versions,
+    record_stored_totals_versions,
+)
 from services.comparison.overlays.critical_path import CriticalPathOverlay
 from services.comparison.types import Comparison, FullCommit, ReportUploadedCount
 from services.decoration import Decoration
@@ -4983,6 +4995,76 @@ class TestComponentWriterSection(object):
         ]
         assert component_data == expected_result
 
+    def test_get_component_data_for_table_uses_stored_totals(
+        self,
+        dbsession,
+        mock_configuration,
+        mock_repo_provider,
+        sample_comparison,
+    ):
+        mock_configuration.params["setup"]["comparison"] = {
+            "reuse_stored_totals": True
+        }
+        comparison = sample_comparison
+        compare_commit = CompareCommitFactory.create(
+            base_commit=comparison.project_coverage_base.commit,
+            compare_commit=comparison.head.commit,
+            state=CompareCommitState.processed.value,
+        )
+        stored_totals = ReportTotals(files=1, lines=10, hits=9, coverage="90.00000")
+        dbsession.add(compare_commit)
+        dbsession.add(
+            CompareComponent(
+                commit_comparison=compare_commit,
+                component_id="go_files",
+                head_totals=stored_totals.asdict(),
+                base_totals=stored_totals.asdict(),
+                patch_totals=None,
+            )
+        )
+        dbsession.flush()
+        record_stored_totals_versions(
+            compare_commit.id_,
+            get_compared_report_versions(
+                comparison.project_coverage_base.commit, comparison.head.commit
+            ),
+        )
+        section_writer = ComponentsSectionWriter(
+            repository=comparison.head.commit.repository,
+            layout="layout",
+            show_complexity=False,
+            settings={},
+            current_yaml={
+                "component_management": {
+                    "individual_components": [
+                        {"component_id": "go_files", "paths": [r".*\.go"]},
+                        {"component_id": "py_files", "paths": [r".*\.py"]},
+                    ]
+                }
+            },
+        )
+        all_components = get_components_from_yaml(section_writer.current_yaml)
+        component_data = section_writer._get_table_data_for_components(
+            all_components, comparison
+        )
+        assert component_data[0] == {
+            "name": "go_files",
+            "before": stored_totals,
+            "after": stored_totals,
+            "diff": None,
+        }
+        # components without a stored comparison are computed
+        assert component_data[1]["name"] == "py_files"
+        assert component_data[1]["after"].coverage == "50.00000"
+
+        # stored comparisons of other versions of the reports are ignored
+        record_stored_totals_versions(compare_commit.id_, "other/versions")
+        comparison._stored_totals = NOT_RESOLVED
+        component_data = section_writer._get_table_data_for_components(
+            all_components, comparison
+        )
+        assert component_data[0]["after"].coverage == "62.50000"
+
     def test_get_component_data_for_table_no_base(
         self,
         dbsession,
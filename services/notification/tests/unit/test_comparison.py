@@ -1,5 +1,6 @@
 from shared.reports.types import Change
 
+from celery_config import shadow_changes_comparison_task_name
 from services.comparison import ComparisonProxy, FilteredComparison
 
 
@@ -15,17 +16,71 @@ class TestFilteredComparison(object):
         res = filtered_comparison.get_existing_statuses()
         assert res == mocked_get_existing_statuses.return_value
 
-    def test_get_changes_rust_vs_python(self, mocker):
+    def test_get_changes_python_engine_by_default(self, mocker, mock_configuration):
         mocker.patch.object(ComparisonProxy, "get_diff")
         mocker.patch(
             "services.comparison.get_changes",
             return_value=[Change(path="apple"), Change(path="pear")],
         )
+        rust_changes = mocker.patch("services.comparison.get_changes_using_rust")
+        send_task = mocker.patch("services.comparison.celery_app.send_task")
+        comparison = ComparisonProxy(mocker.MagicMock())
+        res = comparison.get_changes()
+        expected_result = [Change(path="apple"), Change(path="pear")]
+        assert expected_result == res
+        assert not rust_changes.called
+        assert not send_task.called
+
+    def test_get_changes_rust_engine(self, mocker, mock_configuration):
+        mock_configuration._params["setup"]["comparison"] = {"changes_engine": "rust"}
+        mocker.patch.object(ComparisonProxy, "get_diff")
+        python_changes = mocker.patch("services.comparison.get_changes")
         mocker.patch(
             "services.comparison.get_changes_using_rust",
             return_value=[Change(path="banana"), Change(path="pear")],
         )
         comparison = ComparisonProxy(mocker.MagicMock())
         res = comparison.get_changes()
-        expected_result = [Change(path="apple"), Change(path="pear")]
-        assert expected_result == res
+        assert res == [Change(path="banana"), Change(path="pear")]
+        assert not python_changes.called
+
+    def test_get_changes_shadow_engine(self, mocker, mock_configuration):
+        mock_configuration._params["setup"]["comparison"] = {
+            "changes_engine": "shadow",
+            "shadow_sample_rate": 100,
+        }
+        mocker.patch.object(ComparisonProxy, "get_diff")
+        mocker.patch(
+            "services.comparison.get_changes",
+            return_value=[Change(path="pear"), Change(path="apple")],
+        )
+        rust_changes = mocker.patch("services.comparison.get_changes_using_rust")
+        send_task = mocker.patch("services.comparison.celery_app.send_task")
+        comparison = ComparisonProxy(mocker.MagicMock())
+        res = comparison.get_changes()
+        assert res == [Change(path="pear"), Change(path="apple")]
+        assert not rust_changes.called
+        send_task.assert_called_once_with(
+            shadow_changes_comparison_task_name,
+            args=None,
+            kwargs=dict(
+                repoid=comparison.head.commit.repoid,
+                base_commitid=comparison.project_coverage_base.commit.commitid,
+                head_commitid=comparison.head.commit.commitid,
+                python_paths=["apple", "pear"],
+            ),
+        )
+
+    def test_get_changes_shadow_engine_not_sampled(self, mocker, mock_configuration):
+        mock_configuration._params["setup"]["comparison"] = {
+            "changes_engine": "shadow",
+            "shadow_sample_rate": 0,
+        }
+        mocker.patch.object(ComparisonProxy, "get_diff")
+        mocker.patch(
+            "services.comparison.get_changes", return_value=[Change(path="apple")]
+        )
+        send_task = mocker.patch("services.comparison.celery_app.send_task")
+        comparison = ComparisonProxy(mocker.MagicMock())
+        assert comparison.get_changes() == [Change(path="apple")]
+        assert not send_task.called
@@ -7,6 +7,12 @@ import sentry_sdk
 from shared.yaml import UserYaml
 
 from helpers.pathmap import Tree
+from services.path_fixer.cache import (
+    get_max_resolved_paths,
+    get_path_fixer_key,
+    get_toc_digest,
+    path_fixer_cache,
+)
 from services.path_fixer.fixpaths import remove_known_bad_paths
 from services.path_fixer.user_path_fixes import UserPathFixes
 from services.path_fixer.user_path_includes import UserPathIncludes
@@ -38,11 +44,13 @@ class PathFixer(object):
         toc: list[str],
         flags: list[str] | None = None,
         extra_fixes: list[str] | None = None,
+        toc_digest: str | None = None,
     ):
         """
         :param commit_yaml: Codecov yaml file in effect for this commit.
         :param toc: List of files prepended to the uploaded report. Not all report formats provide this.
         :param flags: Coverage flags specified by the user, if any.
+        :param toc_digest: The `get_toc_digest` of the `toc`, if already known.
         """
         ignore = read_yaml_field(commit_yaml, ("ignore",)) or []
         path_patterns = [invert_pattern(p) for p in ignore]
@@ -62,12 +70,30 @@ class PathFixer(object):
         if extra_fixes:
             yaml_fixes.extend(extra_fixes)
 
-        return cls(
-            yaml_fixes=yaml_fixes,
-            path_patterns=path_patterns,
-            toc=toc,
-            should_disable_default_pathfixes=disable_default_path_fixes,
+        if not path_fixer_cache.enabled:
+            return cls(
+                yaml_fixes=yaml_fixes,
+                path_patterns=path_patterns,
+                toc=toc,
+                should_disable_default_pathfixes=disable_default_path_fixes,
+            )
+
+        # other uploads of the same commit most likely need the very same fixer
+        if toc_digest is None:
+            toc_digest = get_toc_digest(toc)
+        key = get_path_fixer_key(
+            yaml_fixes, path_patterns, toc_digest, disable_default_path_fixes
         )
+        path_fixer = path_fixer_cache.get(key)
+        if path_fixer is None:
+            path_fixer = cls(
+                yaml_fixes=yaml_fixes,
+                path_patterns=path_patterns,
+                toc=toc,
+                should_disable_default_pathfixes=disable_default_path_fixes,
+            )
+            path_fixer_cache.put(key, path_fixer)
+        return path_fixer
 
     def __init__(
         self,
@@ -90,9 +116,21 @@ class PathFixer(object):
         else:
             self.tree = None
 
+        self._resolved_paths: dict[str, str | None] = {}
+        # a cached `PathFixer` lives as long as its process, so this is bounded
+        self._max_resolved_paths = get_max_resolved_paths()
+
     def clean_path(self, path: str | None) -> str | None:
         if not path:
             return None
+        if path in self._resolved_paths:
+            return self._resolved_paths[path]
+        resolved_path = self._clean_path(path)
+        if len(self._resolved_paths) < self._max_resolved_paths:
+            self._resolved_paths[path] = resolved_path
+        return resolved_path
+
+    def _clean_path(self, path: str) -> str | None:
         path = os.path.relpath(path.replace("\\", "/").lstrip("./").lstrip("../"))
         if self.yaml_fixes:
             # applies pre
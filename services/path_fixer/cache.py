@@ -0,0 +1,87 @@
+"""
+A per-process LRU cache of `PathFixer`s.
+
+All the uploads of a commit are usually processed with the same yaml, flags and
+network (the `toc`) file list, so they need the exact same `PathFixer`. Building
+its `Tree` and resolving the paths of a report through it is then redone for
+every upload of a matrix build. Reusing one `PathFixer` across those uploads
+means its `Tree` is built once, and every raw path is resolved once per process,
+as the `PathFixer` remembers its resolved paths.
+
+`PathFixer`s are keyed by a hash of everything they are built from, where the
+`toc` is represented by a digest of it, computed once per upload. The cache
+holds at most `setup.path_fixer_cache.max_entries` of them, and is disabled when
+that value is `0` (the default). Each of them remembers at most
+`setup.path_fixer_cache.max_resolved_paths` resolved paths.
+"""
+
+from hashlib import blake2b, sha256
+from typing import TYPE_CHECKING
+
+import orjson
+from shared.config import get_config
+from shared.metrics import Counter
+
+from helpers.lru_cache import BoundedLRUCache
+
+if TYPE_CHECKING:
+    from services.path_fixer import PathFixer
+
+PATH_FIXER_CACHE_REQUESTS = Counter(
+    "worker_services_path_fixer_cache_requests",
+    "Number of `PathFixer` cache lookups. The `result` can be `hit` or `miss`.",
+    ["result"],
+)
+
+
+def get_toc_digest(toc: list[str] | bytes | None) -> str:
+    """
+    Returns a digest of a `toc`, either as a list of paths, or as the raw bytes
+    it was parsed from, which saves serializing it.
+    """
+    if isinstance(toc, bytes):
+        return blake2b(toc, digest_size=16).hexdigest()
+    return blake2b("\n".join(toc or []).encode(), digest_size=16).hexdigest()
+
+
+def get_path_fixer_key(
+    yaml_fixes: list[str],
+    path_patterns: list[str],
+    toc_digest: str,
+    should_disable_default_pathfixes: bool,
+) -> str:
+    payload = orjson.dumps(
+        [
+            yaml_fixes or [],
+            sorted(set(path_patterns or [])),
+            bool(should_disable_default_pathfixes),
+            toc_digest,
+        ]
+    )
+    return sha256(payload).hexdigest()
+
+
+def get_max_resolved_paths() -> int:
+    return get_config(
+        "setup", "path_fixer_cache", "max_resolved_paths", default=100_000
+    )
+
+
+class PathFixerCache(BoundedLRUCache[str, "PathFixer"]):
+    @property
+    def max_entries(self) -> int:
+        return get_config("setup", "path_fixer_cache", "max_entries", default=0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> "PathFixer | None":
+        path_fixer = super().get(key)
+        PATH_FIXER_CACHE_REQUESTS.labels(
+            result="miss" if path_fixer is None else "hit"
+        ).inc()
+        return path_fixer
+
+
+path_fixer_cache = PathFixerCache()
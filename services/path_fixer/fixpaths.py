@@ -4,7 +4,7 @@ import string
 
 log = logging.getLogger(__name__)
 
-remove_known_bad_paths = re.compile(
+_remove_known_bad_paths = re.compile(
     r"^(\.*\/)*(%s)?"
     % "|".join(
         (
@@ -52,6 +52,63 @@ remove_known_bad_paths = re.compile(
     re.I | re.M,
 ).sub
 
+# Every alternative above only matches paths containing (at least) one of these,
+# case-insensitively. Most paths contain none of them, and can skip the regex.
+_KNOWN_BAD_PATHS_LITERALS = (
+    "travis/build/",
+    "jenkins/",
+    "users/distiller/",
+    "home/",
+    "workspace/",
+    "github.com/",
+    ":/",
+    "projects/",
+    "build/lib.",
+    "vendor/src/",
+    "pipeline/source/",
+    "var/snap-ci/repo/",
+    "site-packages/",
+    "usr/",
+    "slather/spec/fixtures/",
+    "target/generated-sources/",
+    "reactivecocoa.build/",
+    "handlebars.js/dist/",
+    "node_modules/",
+    "bower_components/",
+    "lib/clang/",
+    "<",
+    ">",
+    "mac-coverage/build/src/",
+    "dist-packages/",
+    "iphonesimulator",
+    "applications/xcode.app/",
+    "env",
+)
+
+# The only non-ASCII characters matching ASCII letters with `re.I` that
+# `str.casefold` does not turn into those letters.
+_CASEFOLD_FIXES = str.maketrans({"\u0130": "i", "\u0131": "i"})
+
+_leading_dot_dirs = re.compile(r"^(\.*\/)*").sub
+
+
+def remove_known_bad_paths(repl: str, path: str) -> str:
+    """
+    Replaces the known bad prefix of `path` (CI build directories, virtualenvs,
+    vendored code, ...) with `repl`, as well as any leading `./`, `../` or `/`.
+    """
+    if "\n" not in path:
+        folded = (
+            path.lower()
+            if path.isascii()
+            else path.translate(_CASEFOLD_FIXES).casefold()
+        )
+        if not any(map(folded.__contains__, _KNOWN_BAD_PATHS_LITERALS)):
+            if not repl and not path.startswith(("/", ".")):
+                return path
+            return _leading_dot_dirs(repl, path, count=1)
+    return _remove_known_bad_paths(repl, path)
+
 
 def unquote_git_path(path: str) -> str:
     """
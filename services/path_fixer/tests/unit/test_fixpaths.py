@@ -1,4 +1,5 @@
 import os
+import random
 
 import pytest
 
@@ -24,7 +25,41 @@ unquoted_files = {
 }
 
 
+# Path components exercising each alternative of `remove_known_bad_paths`.
+path_components = (
+    "home Users HOME travis build owner repo src jenkins jobs workspace distiller "
+    "github.com C: Repos projects Projects Pods _build GitHub lib.linux circleci "
+    "code vendor pipeline source var snap-ci ubuntu site-packages x.egg usr local "
+    "lib dist-packages opt slather spec fixtures target generated-sources .phpenv "
+    "Debug-iphonesimulator ReactiveCocoa.build DerivedSources RAx include dist "
+    "handlebars.js node_modules bower_components clang a<b mac-coverage Developer "
+    "iPhoneSimulatorXplatform SDKs Applications Xcode.app Contents Toolchains "
+    ".venv virtualenv envs-3 ENV file.py index.ts \u0130nclude \u017fite-packages"
+).split() + ["..", ".", "", "a", "b"]
+
+
 class TestFixpaths(BaseTestCase):
+    def test_remove_known_bad_paths(self):
+        assert (
+            fixpaths.remove_known_bad_paths("", "/home/travis/build/o/r/src/a.py")
+            == "src/a.py"
+        )
+        assert fixpaths.remove_known_bad_paths("", "node_modules/x/y.js") == ""
+        assert fixpaths.remove_known_bad_paths("", "../../src/a.py") == "src/a.py"
+        assert fixpaths.remove_known_bad_paths("", "src/a.py") == "src/a.py"
+
+    def test_remove_known_bad_paths_same_as_regex(self):
+        rng = random.Random(42)
+        for _ in range(5000):
+            path = "/".join(
+                rng.choice(path_components) for _ in range(rng.randint(1, 8))
+            )
+            path = rng.choice(["", "", "/", "./", "../", ".../"]) + path
+            for repl in ("", "prefix/"):
+                assert fixpaths.remove_known_bad_paths(
+                    repl, path
+                ) == fixpaths._remove_known_bad_paths(repl, path), path
+
     @pytest.mark.parametrize("toc, result", paths)
     def test_clean_toc(self, toc, result):
         assert fixpaths.clean_toc(toc) == result
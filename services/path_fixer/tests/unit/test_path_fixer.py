@@ -1,6 +1,7 @@
 from shared.yaml import UserYaml
 
 from services.path_fixer import PathFixer, invert_pattern
+from services.path_fixer.cache import get_toc_digest, path_fixer_cache
 from test_utils.base import BaseTestCase
 
 
@@ -149,3 +150,58 @@ def test_ambiguous_paths():
 
     assert pf(file_name) is None
     assert base_aware_pf(file_name, bases_to_try=bases_to_try) is None
+
+
+def test_path_fixer_cache(mock_configuration, mocker):
+    toc = ["project/__init__.py", "tests/__init__.py", "tests/test_project.py"]
+    first = PathFixer.init_from_user_yaml({}, toc, [])
+    assert PathFixer.init_from_user_yaml({}, toc, []) is not first
+
+    mock_configuration._params["setup"]["path_fixer_cache"] = {"max_entries": 1}
+    path_fixer_cache.clear()
+    first = PathFixer.init_from_user_yaml({}, toc, [])
+    assert PathFixer.init_from_user_yaml({}, list(toc), []) is first
+    assert PathFixer.init_from_user_yaml(UserYaml({}), toc, ["flag"]) is first
+
+    other = PathFixer.init_from_user_yaml({"ignore": ["tests"]}, toc, [])
+    assert other is not first
+    assert other("tests/test_project.py") is None
+    assert PathFixer.init_from_user_yaml({}, toc, []) is not first
+
+    # the digest of the raw toc stands in for the toc
+    raw_toc = "\n".join(toc).encode()
+    assert get_toc_digest(raw_toc) == get_toc_digest(toc)
+    first = PathFixer.init_from_user_yaml(
+        {}, toc, [], toc_digest=get_toc_digest(raw_toc)
+    )
+    assert PathFixer.init_from_user_yaml({}, toc, []) is first
+    assert PathFixer.init_from_user_yaml({}, toc[:2], []) is not first
+    path_fixer_cache.clear()
+
+
+def test_path_fixer_resolves_paths_once(mocker):
+    toc = ["project/__init__.py", "tests/__init__.py", "tests/test_project.py"]
+    pf = PathFixer.init_from_user_yaml({}, toc, [])
+    resolve_path = mocker.spy(pf.tree, "resolve_path")
+
+    assert pf("/home/ci/project/__init__.py") == "project/__init__.py"
+    assert pf("/home/ci/project/__init__.py") == "project/__init__.py"
+    assert pf("unknown.py") is None
+    assert pf("unknown.py") is None
+    assert resolve_path.call_count == 2
+
+
+def test_path_fixer_resolved_paths_are_bounded(mock_configuration, mocker):
+    mock_configuration._params["setup"]["path_fixer_cache"] = {
+        "max_resolved_paths": 1
+    }
+    toc = ["project/__init__.py", "tests/__init__.py", "tests/test_project.py"]
+    pf = PathFixer.init_from_user_yaml({}, toc, [])
+    resolve_path = mocker.spy(pf.tree, "resolve_path")
+
+    assert pf("/home/ci/project/__init__.py") == "project/__init__.py"
+    assert pf("unknown.py") is None
+    assert pf("unknown.py") is None
+    assert pf("/home/ci/project/__init__.py") == "project/__init__.py"
+    assert resolve_path.call_count == 3
+    assert len(pf._resolved_paths) == 1
@@ -0,0 +1,94 @@
+"""
+Deduplication of byte-identical raw uploads of a commit.
+
+Flaky CI retries and matrix jobs often upload the exact same raw coverage file
+for the same commit. Processing an upload only depends on its raw content, its
+flags, its `format_version` and the commit yaml, so the intermediate report of
+an upload can be reused as is for any later upload that has all of those in
+common, skipping the parsing entirely. Only the `Session` of the report, which
+describes the upload itself (its build, job, name and so on), is swapped.
+
+The hashes of the uploads of a commit which have an intermediate report are
+kept in a redis hash, for as long as the intermediate reports themselves. A
+duplicate found in there whose intermediate report was already cleaned up is
+just processed again.
+
+This is enabled by `setup.upload_dedup.enabled`.
+"""
+
+from hashlib import sha256
+
+import orjson
+from shared.config import get_config
+from shared.reports.resources import Report
+from shared.utils.sessions import Session
+from shared.yaml import UserYaml
+
+from services.redis import get_redis_connection
+
+from .intermediate import REPORT_TTL, load_intermediate_reports
+from .metrics import UPLOAD_DEDUP_REQUESTS
+
+
+def upload_dedup_enabled() -> bool:
+    return get_config("setup", "upload_dedup", "enabled", default=False)
+
+
+def get_upload_content_hash(
+    content: bytes,
+    flags: list[str],
+    format_version: str | None,
+    commit_yaml: UserYaml,
+) -> str:
+    hasher = sha256(content)
+    hasher.update(
+        orjson.dumps(
+            [sorted(flags or []), format_version, commit_yaml.to_dict()],
+            option=orjson.OPT_SORT_KEYS,
+        )
+    )
+    return hasher.hexdigest()
+
+
+def find_duplicate_report(
+    repo_id: int, commit_sha: str, content_hash: str, session: Session
+) -> Report | None:
+    """
+    Returns the intermediate report of an already processed upload of the commit
+    with the same `content_hash`, with its `Session` replaced by `session`.
+    """
+    redis = get_redis_connection()
+    upload_id = redis.hget(upload_dedup_key(repo_id, commit_sha), content_hash)
+    report = None
+    if upload_id is not None:
+        [intermediate_report] = load_intermediate_reports([int(upload_id)])
+        report = intermediate_report.report
+
+    # a missing intermediate report is loaded as an empty one
+    if report is None or len(report.sessions) != 1:
+        UPLOAD_DEDUP_REQUESTS.labels(result="miss").inc()
+        return None
+
+    [(sessionid, original_session)] = report.sessions.items()
+    session.id = sessionid
+    session.env = original_session.env
+    session.totals = original_session.totals
+    report.sessions[sessionid] = session
+
+    UPLOAD_DEDUP_REQUESTS.labels(result="hit").inc()
+    return report
+
+
+def record_upload_content(
+    repo_id: int, commit_sha: str, content_hash: str, upload_id: int
+):
+    redis_key = upload_dedup_key(repo_id, commit_sha)
+    redis = get_redis_connection()
+    with redis.pipeline() as pipeline:
+        pipeline.hset(redis_key, content_hash, upload_id)
+        pipeline.expire(redis_key, REPORT_TTL)
+        pipeline.execute()
+
+
+def upload_dedup_key(repo_id: int, commit_sha: str) -> str:
+    return f"upload-content/{repo_id}/{commit_sha}"
@@ -18,9 +18,13 @@ def load_intermediate_reports(upload_ids: list[int]) -> list[IntermediateReport]
     dctx = zstandard.ZstdDecompressor()
     intermediate_reports: list[IntermediateReport] = []
 
-    for upload_id in upload_ids:
-        key = intermediate_report_key(upload_id)
-        report_dict = redis.hgetall(key)
+    # fetch all the reports in a single roundtrip
+    with redis.pipeline(transaction=False) as pipeline:
+        for upload_id in upload_ids:
+            pipeline.hgetall(intermediate_report_key(upload_id))
+        report_dicts = pipeline.execute()
+
+    for upload_id, report_dict in zip(upload_ids, report_dicts):
         if not report_dict:
             intermediate_reports.append(IntermediateReport(upload_id, EditableReport()))
             continue
@@ -1,6 +1,5 @@
 import functools
 import logging
-from decimal import Decimal
 
 import sentry_sdk
 from shared.reports.editable import EditableReport, EditableReportFile
@@ -11,7 +10,6 @@ from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session as DbSession
 
 from database.models.reports import Upload, UploadError, UploadLevelTotals
-from helpers.number import precise_round
 from services.report import delete_uploads_by_sessionid
 from services.report.raw_upload_processor import clear_carryforward_sessions
 from services.yaml.reader import read_yaml_field
@@ -150,21 +148,9 @@ def update_uploads(
 def make_upload_totals(
     precision: int, rounding: str, upload_id: int, totals: ReportTotals
 ) -> dict:
-    if totals.coverage is not None:
-        coverage = precise_round(Decimal(totals.coverage), precision, rounding)
-    else:
-        coverage = Decimal(0)
-
     return dict(
         upload_id=upload_id,
-        branches=totals.branches,
-        coverage=coverage,
-        hits=totals.hits,
-        lines=totals.lines,
-        methods=totals.methods,
-        misses=totals.misses,
-        partials=totals.partials,
-        files=totals.files,
+        **UploadLevelTotals.values_from_totals(totals, precision, rounding),
     )
 
 
@@ -28,3 +28,9 @@ INTERMEDIATE_REPORT_SIZE = Histogram(
     ["type", "compression"],
     buckets=BYTE_SIZE_BUCKETS,
 )
+
+UPLOAD_DEDUP_REQUESTS = Counter(
+    "worker_processing_upload_dedup_requests",
+    "Number of lookups of an identical, already processed raw upload of the same commit. The `result` can be `hit` or `miss`.",
+    ["result"],
+)
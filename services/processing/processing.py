@@ -13,6 +13,7 @@ from services.archive import ArchiveService
 from services.report import ProcessingError, RawReportInfo, ReportService
 from services.report.parser.types import VersionOneParsedRawReport
 
+from .dedup import record_upload_content
 from .intermediate import save_intermediate_report
 from .state import ProcessingState
 from .types import ProcessingResult, UploadArguments
@@ -67,6 +68,10 @@ def process_upload(
 
         if processing_result.report:
             save_intermediate_report(upload_id, processing_result.report)
+            if report_info.content_hash:
+                record_upload_content(
+                    repo_id, commit_sha, report_info.content_hash, upload_id
+                )
         state.mark_upload_as_processed(upload_id)
 
         rewrite_or_delete_upload(archive_service, commit_yaml, report_info)
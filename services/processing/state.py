@@ -77,8 +77,10 @@ class ProcessingState:
         self.commitsha = commitsha
 
     def get_upload_numbers(self):
-        processing = self._redis.scard(self._redis_key("processing"))
-        processed = self._redis.scard(self._redis_key("processed"))
+        with self._redis.pipeline() as pipeline:
+            pipeline.scard(self._redis_key("processing"))
+            pipeline.scard(self._redis_key("processed"))
+            processing, processed = pipeline.execute()
         return UploadNumbers(processing, processed)
 
     def mark_uploads_as_processing(self, upload_ids: list[int]):
@@ -94,15 +96,17 @@ class ProcessingState:
             CLEARED_UPLOADS.inc(removed_uploads)
 
     def mark_upload_as_processed(self, upload_id: int):
-        res = self._redis.smove(
-            self._redis_key("processing"), self._redis_key("processed"), upload_id
-        )
-        if not res:
-            # this can happen when `upload_id` was never in the source set,
+        with self._redis.pipeline() as pipeline:
+            pipeline.smove(
+                self._redis_key("processing"), self._redis_key("processed"), upload_id
+            )
+            # the `SMOVE` is a noop when `upload_id` was never in the source set,
             # which probably is the case during initial deployment as
-            # the code adding this to the initial set was not deployed yet
+            # the code adding this to the initial set was not deployed yet.
+            # the `SADD` is a noop otherwise, so both are sent in one roundtrip.
             # TODO: make sure to remove this code after a grace period
-            self._redis.sadd(self._redis_key("processed"), upload_id)
+            pipeline.sadd(self._redis_key("processed"), upload_id)
+            pipeline.execute()
 
     def mark_uploads_as_merged(self, upload_ids: list[int]):
         self._redis.srem(self._redis_key("processed"), *upload_ids)
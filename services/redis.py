@@ -1,12 +1,53 @@
 import logging
+import os
+import threading
 import zlib
 from typing import Optional
 
-from redis import Redis
+from redis import ConnectionPool, Redis
 from shared.config import get_config
+from shared.metrics import Counter
 
 log = logging.getLogger(__name__)
 
+REDIS_CLIENT_REQUESTS = Counter(
+    "worker_services_redis_client_requests",
+    "Number of requested redis clients. The `result` can be `created` or `reused`.",
+    ["result"],
+)
+REDIS_CONNECTIONS_CREATED = Counter(
+    "worker_services_redis_connections_created",
+    "Number of connections opened by the redis connection pools",
+)
+REDIS_CONNECTION_CHECKOUTS = Counter(
+    "worker_services_redis_connection_checkouts",
+    "Number of connections checked out of the redis connection pools",
+)
+
+
+class InstrumentedConnectionPool(ConnectionPool):
+    def make_connection(self):
+        REDIS_CONNECTIONS_CREATED.inc()
+        return super().make_connection()
+
+    def get_connection(self, *args, **kwargs):
+        REDIS_CONNECTION_CHECKOUTS.inc()
+        return super().get_connection(*args, **kwargs)
+
+
+_redis_clients: dict[str, Redis] = {}
+_redis_clients_lock = threading.Lock()
+
+
+def _reset_redis_clients_after_fork() -> None:
+    # Connections inherited from the parent process must never be shared
+    global _redis_clients_lock
+    _redis_clients_lock = threading.Lock()
+    _redis_clients.clear()
+
+
+os.register_at_fork(after_in_child=_reset_redis_clients_after_fork)
+
 
 def get_redis_url() -> str:
     url = get_config("services", "redis_url")
@@ -23,7 +64,33 @@ def get_redis_connection() -> Redis:
 
 
 def _get_redis_instance_from_url(url) -> Redis:
-    return Redis.from_url(url)
+    """
+    Returns the redis client for `url`, which is shared by the whole process.
+
+    Clients are backed by a connection pool, so connections are reused across
+    calls instead of being opened for every new client.
+    The pool size and health check interval are configured by
+    `services.redis.max_connections` and `services.redis.health_check_interval`.
+    """
+    with _redis_clients_lock:
+        client = _redis_clients.get(url)
+        if client is not None:
+            REDIS_CLIENT_REQUESTS.labels(result="reused").inc()
+            return client
+
+        connection_pool = InstrumentedConnectionPool.from_url(
+            url,
+            max_connections=get_config(
+                "services", "redis", "max_connections", default=None
+            ),
+            health_check_interval=get_config(
+                "services", "redis", "health_check_interval", default=30
+            ),
+        )
+        client = Redis(connection_pool=connection_pool)
+        _redis_clients[url] = client
+        REDIS_CLIENT_REQUESTS.labels(result="created").inc()
+        return client
 
 
 def download_archive_from_redis(
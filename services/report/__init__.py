@@ -4,7 +4,7 @@ import logging
 import uuid
 from dataclasses import dataclass
 from time import time
-from typing import Any
+from typing import Any, Collection
 
 import orjson
 import sentry_sdk
@@ -14,13 +14,15 @@ from shared.django_apps.reports.models import ReportType
 from shared.reports.carryforward import generate_carryforward_report
 from shared.reports.editable import EditableReport
 from shared.reports.enums import UploadState, UploadType
-from shared.reports.resources import Report
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report, ReportTotals
 from shared.storage.exceptions import FileNotInStorageError
 from shared.torngit.exceptions import TorngitError
 from shared.upload.constants import UploadErrorCode
 from shared.upload.utils import UploaderType, insert_coverage_measurement
 from shared.utils.sessions import Session, SessionType
 from shared.yaml import UserYaml
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session as DbSession
 
 from database.models import Commit, Repository, Upload, UploadError
@@ -39,20 +41,40 @@ from helpers.exceptions import (
 )
 from helpers.telemetry import log_simple_metric
 from rollouts import CARRYFORWARD_BASE_SEARCH_RANGE_BY_OWNER
-from services.archive import ArchiveService
+from services.archive import ArchiveService, encoded_size
+from services.processing.dedup import (
+    find_duplicate_report,
+    get_upload_content_hash,
+    upload_dedup_enabled,
+)
 from services.processing.metrics import (
     PYREPORT_CHUNKS_FILE_SIZE,
     PYREPORT_REPORT_JSON_SIZE,
+    UPLOAD_DEDUP_REQUESTS,
 )
 from services.processing.types import ProcessingErrorDict, UploadArguments
+from services.report.fingerprints import update_file_fingerprints
+from services.report.indexed_chunks import (
+    END_OF_HEADER,
+    indexed_chunks_enabled,
+    read_chunks_for_indexes,
+    write_indexed_chunks,
+)
+from services.report.labels_index import labels_index_enabled, write_labels_index
 from services.report.parser import get_proper_parser
 from services.report.parser.types import ParsedRawReport
 from services.report.parser.version_one import VersionOneReportParser
 from services.report.prometheus_metrics import (
+    CARRYFORWARD_REPORTS,
     RAW_UPLOAD_RAW_REPORT_COUNT,
     RAW_UPLOAD_SIZE,
 )
 from services.report.raw_upload_processor import process_raw_upload
+from services.report.report_cache import (
+    ReportCacheKey,
+    get_report_version,
+    readonly_report_cache,
+)
 from services.repository import get_repo_provider_service
 from services.yaml.reader import get_paths_from_flags, read_yaml_field
 
@@ -80,10 +102,15 @@ class RawReportInfo:
     archive_url: str = ""
     upload: str = ""
     error: ProcessingError | None = None
+    content_hash: str | None = None
 
 
 log = logging.getLogger(__name__)
 
+# Rows per multi-row `INSERT` in `save_full_report`, which keeps every statement
+# well below the limit of bind parameters of postgres.
+SAVE_FULL_REPORT_BATCH_SIZE = 1000
+
 
 class NotReadyToBuildReportYetError(Exception):
     pass
@@ -305,12 +332,35 @@ class ReportService(BaseReportService):
 
     @sentry_sdk.trace
     def get_existing_report_for_commit(
-        self, commit: Commit, report_class=None, report_code=None
+        self,
+        commit: Commit,
+        report_class=None,
+        report_code=None,
+        paths: Collection[str] | None = None,
     ) -> Report | None:
+        """
+        Loads the stored report of `commit`.
+
+        When `paths` is given, the report only contains those files, and only the
+        parts of the chunks holding them are downloaded if possible.
+        The totals of the report are still the ones of the whole report.
+        """
+        if paths is not None:
+            return self._get_existing_partial_report_for_commit(
+                commit, paths, report_class=report_class, report_code=report_code
+            )
+
         commitid = commit.commitid
         if not self.has_initialized_report(commit):
             return None
 
+        cache_key = None
+        if report_class is ReadOnlyReport and readonly_report_cache.enabled:
+            cache_key = ReportCacheKey.for_commit(commit, report_code)
+            cached_report = readonly_report_cache.get(cache_key)
+            if cached_report is not None:
+                return cached_report
+
         try:
             archive_service = self.get_archive_service(commit.repository)
             chunks = archive_service.read_chunks(commitid, report_code)
@@ -332,8 +382,56 @@ class ReportService(BaseReportService):
         res = self.build_report(
             chunks, files, sessions, totals, report_class=report_class
         )
+        if cache_key is not None:
+            readonly_report_cache.put(cache_key, res, size=len(chunks))
         return res
 
+    def _get_existing_partial_report_for_commit(
+        self,
+        commit: Commit,
+        paths: Collection[str],
+        report_class=None,
+        report_code=None,
+    ) -> Report | None:
+        if not self.has_initialized_report(commit):
+            return None
+
+        paths = set(paths)
+        files = {
+            path: file_summary
+            for path, file_summary in commit.report_json["files"].items()
+            if path in paths
+        }
+        archive_service = self.get_archive_service(commit.repository)
+        chunks = read_chunks_for_indexes(
+            archive_service,
+            commit.commitid,
+            {file_summary[0] for file_summary in files.values()},
+            get_report_version(commit),
+            report_code,
+        )
+        if chunks is None:
+            try:
+                chunks = archive_service.read_chunks(commit.commitid, report_code)
+            except FileNotInStorageError:
+                log.warning(
+                    "File for chunks not found in storage",
+                    extra=dict(
+                        commit=commit.commitid,
+                        repo=commit.repoid,
+                        report_code=report_code,
+                    ),
+                )
+                return None
+
+        return self.build_report(
+            chunks,
+            files,
+            commit.report_json["sessions"],
+            commit.totals,
+            report_class=report_class,
+        )
+
     def get_appropriate_commit_to_carryforward_from(
         self, commit: Commit, max_parenthood_deepness: int = 10
     ) -> Commit | None:
@@ -504,12 +602,23 @@ class ReportService(BaseReportService):
                 parent_sessions=parent_report.sessions,
             ),
         )
-        carryforward_report = generate_carryforward_report(
-            parent_report,
-            flags_to_carryforward,
-            paths_to_carryforward,
-            session_extras=dict(carriedforward_from=parent_commit.commitid),
-        )
+        session_extras = dict(carriedforward_from=parent_commit.commitid)
+        if not paths_to_carryforward and all(
+            set(session.flags or []) & set(flags_to_carryforward)
+            for session in parent_report.sessions.values()
+        ):
+            carryforward_report = carryforward_whole_report(
+                parent_report, session_extras
+            )
+            CARRYFORWARD_REPORTS.labels(mode="whole").inc()
+        else:
+            carryforward_report = generate_carryforward_report(
+                parent_report,
+                flags_to_carryforward,
+                paths_to_carryforward,
+                session_extras=session_extras,
+            )
+            CARRYFORWARD_REPORTS.labels(mode="filtered").inc()
         # If the parent report has labels we also need to carryforward the label index
         # Considerations:
         #   1. It's necessary for labels flags to be carryforward, so it's ok to carryforward the entire index
@@ -529,11 +638,13 @@ class ReportService(BaseReportService):
 
     @sentry_sdk.trace
     def parse_raw_report_from_storage(
-        self, repo: Repository, upload: Upload
+        self, repo: Repository, upload: Upload, archive_file: bytes | None = None
     ) -> ParsedRawReport:
         """Pulls the raw uploaded report from storage and parses it so it's
         easier to access different parts of the raw upload.
 
+        The raw upload is not pulled again if its `archive_file` is given.
+
         Raises:
             shared.storage.exceptions.FileNotInStorageError
         """
@@ -549,7 +660,8 @@ class ReportService(BaseReportService):
             ),
         )
 
-        archive_file = archive_service.read_file(archive_url)
+        if archive_file is None:
+            archive_file = archive_service.read_file(archive_url)
 
         parser = get_proper_parser(upload, archive_file)
         upload_version = (
@@ -611,7 +723,41 @@ class ReportService(BaseReportService):
         raw_report_info.upload = upload.external_id
 
         try:
-            raw_report = self.parse_raw_report_from_storage(commit.repository, upload)
+            archive_file = None
+            if upload_dedup_enabled():
+                archive_service = self.get_archive_service(commit.repository)
+                archive_file = archive_service.read_file(archive_url)
+                try:
+                    content_hash = get_upload_content_hash(
+                        archive_file,
+                        flags,
+                        (upload.upload_extras or {}).get("format_version"),
+                        self.current_yaml,
+                    )
+                    raw_report_info.content_hash = content_hash
+                    result.report = find_duplicate_report(
+                        commit.repoid, commit.commitid, content_hash, session
+                    )
+                except Exception:
+                    # the upload is just parsed (and not recorded for later uploads)
+                    # when it can't be deduplicated
+                    log.exception(
+                        "Failed to look up an identical upload",
+                        extra=dict(reportid=reportid, archive_url=archive_url),
+                    )
+                    UPLOAD_DEDUP_REQUESTS.labels(result="miss").inc()
+                    raw_report_info.content_hash = None
+                    result.report = None
+                if result.report is not None:
+                    log.info(
+                        "Reusing the report of an identical upload",
+                        extra=dict(reportid=reportid, archive_url=archive_url),
+                    )
+                    return result
+
+            raw_report = self.parse_raw_report_from_storage(
+                commit.repository, upload, archive_file
+            )
             raw_report_info.raw_report = raw_report
         except FileNotInStorageError:
             log.info(
@@ -694,10 +840,18 @@ class ReportService(BaseReportService):
         archive_service = self.get_archive_service(commit.repository)
 
         totals, report_json = report.to_database()
-        chunks = report.to_archive().encode()
+        # The fingerprints carried over in the header of a loaded report are stale
+        # for the files that were modified since, so they are updated from the
+        # serialized chunks, and the header is serialized again with them. It is
+        # written in front of the chunks as a separate part, so the (much larger)
+        # chunks are never copied to be joined with it.
+        _stale_header, _, body = report.to_archive().partition(END_OF_HEADER)
+        update_file_fingerprints(report, body)
+        header = orjson.dumps(report.header, option=orjson.OPT_NON_STR_KEYS).decode()
+        chunks = [header, END_OF_HEADER, body]
 
         PYREPORT_REPORT_JSON_SIZE.observe(len(report_json))
-        PYREPORT_CHUNKS_FILE_SIZE.observe(len(chunks))
+        PYREPORT_CHUNKS_FILE_SIZE.observe(encoded_size(*chunks))
 
         chunks_url = archive_service.write_chunks(commit.commitid, chunks, report_code)
 
@@ -724,6 +878,19 @@ class ReportService(BaseReportService):
         # FIXME: we do an unnecessary `loads` roundtrip because of this abstraction,
         # and we should just save the `report_json` to archive storage directly instead.
         commit.report_json = orjson.loads(report_json)
+        # the indexes are written after the `report_json`, as they are only valid
+        # for the version of the report it is part of
+        if labels_index_enabled():
+            write_labels_index(archive_service, commit, report, report_code)
+        if indexed_chunks_enabled():
+            write_indexed_chunks(
+                archive_service,
+                commit.commitid,
+                header,
+                body,
+                get_report_version(commit),
+                report_code,
+            )
 
         # `report` is an accessor which implicitly queries `CommitReport`
         if commit_report := commit.report:
@@ -771,41 +938,117 @@ class ReportService(BaseReportService):
             self.current_yaml, ("coverage", "precision"), 2
         )
         res = self.save_report(commit, report, report_code)
+        if not report.sessions:
+            return res
+
         db_session = commit.get_db_session()
+        report_row = commit.report
+        repoid = commit.repoid
+        flag_dict = self.fetch_repo_flags(db_session, repoid)
+
+        # create all the missing `RepositoryFlag`s up front, in a single flush
+        new_flags = []
+        for session in report.sessions.values():
+            for flag_name in session.flags or []:
+                if flag_name not in flag_dict:
+                    flag_obj = RepositoryFlag(repository_id=repoid, flag_name=flag_name)
+                    flag_dict[flag_name] = flag_obj
+                    new_flags.append(flag_obj)
+        if new_flags:
+            db_session.add_all(new_flags)
+            db_session.flush()
+
+        upload_rows = []
         for sess_id, session in report.sessions.items():
-            upload = Upload(
-                build_code=session.build,
-                build_url=session.url,
-                env=session.env,
-                external_id=uuid.uuid4(),
-                job_code=session.job,
-                name=session.name[:100] if session.name is not None else None,
-                order_number=sess_id,
-                provider=session.provider,
-                report_id=commit.report.id_,
-                state="complete",
-                storage_path=session.archive if session.archive is not None else "",
-                upload_extras=session.session_extras or {},
-                upload_type=(
-                    session.session_type.value
-                    if session.session_type is not None
-                    else "unknown"
-                ),
+            upload_rows.append(
+                dict(
+                    build_code=session.build,
+                    build_url=session.url,
+                    env=session.env,
+                    external_id=uuid.uuid4(),
+                    job_code=session.job,
+                    name=session.name[:100] if session.name is not None else None,
+                    order_number=sess_id,
+                    provider=session.provider,
+                    report_id=report_row.id_,
+                    state="complete",
+                    storage_path=(
+                        session.archive if session.archive is not None else ""
+                    ),
+                    upload_extras=session.session_extras or {},
+                    upload_type=(
+                        session.session_type.value
+                        if session.session_type is not None
+                        else "unknown"
+                    ),
+                )
             )
-            db_session.add(upload)
-            db_session.flush()
-            self._attach_flags_to_upload(upload, session.flags if session.flags else [])
+
+        upload_table = Upload.__table__
+        upload_ids: dict[int, int] = {}
+        for batch in _batched(upload_rows, SAVE_FULL_REPORT_BATCH_SIZE):
+            stmt = (
+                insert(upload_table)
+                .values(batch)
+                .returning(upload_table.c.id, upload_table.c.order_number)
+            )
+            upload_ids.update(
+                (order_number, upload_id)
+                for upload_id, order_number in db_session.execute(stmt)
+            )
+
+        flag_rows = []
+        totals_rows = []
+        for sess_id, session in report.sessions.items():
+            upload_id = upload_ids[sess_id]
+            for flag_name in session.flags or []:
+                flag_rows.append(
+                    dict(upload_id=upload_id, flag_id=flag_dict[flag_name].id_)
+                )
             if session.totals is not None:
-                upload_totals = UploadLevelTotals(upload_id=upload.id_)
-                db_session.add(upload_totals)
-                upload_totals.update_from_totals(
-                    session.totals, precision=precision, rounding=rounding
+                totals_rows.append(
+                    dict(
+                        upload_id=upload_id,
+                        **UploadLevelTotals.values_from_totals(
+                            session.totals, precision, rounding
+                        ),
+                    )
                 )
-                db_session.flush()
+
+        for batch in _batched(flag_rows, SAVE_FULL_REPORT_BATCH_SIZE):
+            db_session.execute(insert(uploadflagmembership).values(batch))
+        for batch in _batched(totals_rows, SAVE_FULL_REPORT_BATCH_SIZE):
+            db_session.execute(insert(UploadLevelTotals.__table__).values(batch))
+
+        # the `Upload`s were inserted behind the back of the ORM
+        db_session.expire(report_row, ["uploads"])
 
         return res
 
 
+def _batched(rows: list[dict], batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        yield rows[start : start + batch_size]
+
+
+def carryforward_whole_report(report: Report, session_extras: dict) -> Report:
+    """
+    Turns `report` into its own carriedforward report, for when all its sessions
+    are carried forward and no file is filtered out.
+
+    This is what `generate_carryforward_report` ends up with in that case, but
+    without walking every line to delete (no) sessions. The files of the report
+    are thus left as unparsed chunks, which are written back verbatim on save,
+    and only the files whose lines get shifted by the diff are parsed.
+    """
+    for session in report.sessions.values():
+        session.session_extras = session_extras
+        session.session_type = SessionType.carriedforward
+    # recomputed from the file summaries, as shifting lines can change them
+    report._totals = None
+    return report
+
+
 @sentry_sdk.trace
 def delete_uploads_by_sessionid(
     db_session: DbSession, report_id: int, session_ids: set[int]
@@ -0,0 +1,76 @@
+"""
+Totals of the components of a report.
+
+Computing the totals of a component with `report.filter(...).totals` walks the
+whole report once per component. For components whose totals only depend on
+paths, the files of the report are instead classified into the components with
+precompiled path patterns, and the file totals of each component are summed
+up, which takes a single pass over the file list for all of them.
+
+Components that match some flags of the report still need the lines of their
+files to be filtered by session, so those go through `report.filter`.
+"""
+
+from typing import Sequence
+
+from shared.components import Component
+from shared.helpers.numeric import ratio
+from shared.reports.types import ReportTotals
+
+from helpers.match import Matcher
+
+
+def get_components_totals(
+    report, components: Sequence[Component]
+) -> list[ReportTotals]:
+    """
+    Returns the totals of each of `components` in `report`, in the same order.
+
+    The totals are the ones of `report.filter(flags=..., paths=component.paths)`.
+    For components that only filter by path, only the files, lines, hits, misses,
+    partials and coverage fields are set.
+    """
+    report_flags = list(report.flags.keys())
+    components_totals: list[ReportTotals | None] = [None] * len(components)
+    path_matchers: list[tuple[int, Matcher]] = []
+    for index, component in enumerate(components):
+        flags = component.get_matching_flags(report_flags)
+        if flags:
+            components_totals[index] = report.filter(
+                flags=flags, paths=component.paths
+            ).totals
+        else:
+            # an empty list of paths matches every file, same as `report.filter`
+            path_matchers.append((index, Matcher(component.paths)))
+
+    if path_matchers:
+        # `ReadOnlyReport` does not expose the file totals of the report it wraps
+        inner_report = getattr(report, "inner_report", report)
+        summed = {index: [0, 0, 0, 0] for index, _ in path_matchers}
+        for path in inner_report.files:
+            file_totals = None
+            for index, matcher in path_matchers:
+                if not matcher.match(path):
+                    continue
+                if file_totals is None:
+                    file_totals = inner_report.get_file_totals(path)
+                    if file_totals is None:
+                        break
+                component_sum = summed[index]
+                component_sum[0] += 1
+                component_sum[1] += file_totals.hits
+                component_sum[2] += file_totals.misses
+                component_sum[3] += file_totals.partials
+
+        for index, (files, hits, misses, partials) in summed.items():
+            lines = hits + misses + partials
+            components_totals[index] = ReportTotals(
+                files=files,
+                lines=lines,
+                hits=hits,
+                misses=misses,
+                partials=partials,
+                coverage=ratio(hits, lines) if lines else None,
+            )
+
+    return components_totals
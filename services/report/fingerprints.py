@@ -0,0 +1,94 @@
+"""
+Per-file coverage fingerprints.
+
+A fingerprint is a short hash over the line numbers and the "line type"
+(hit, miss or partial) of every line of a file. Two files with the same
+fingerprint are indistinguishable as far as coverage changes are concerned.
+
+Fingerprints are stored in the report header next to the chunks, so that
+comparisons can tell that a file did not change between two reports without
+walking its lines. They are updated whenever a report is saved. Along with them,
+the header holds a digest of the chunk of each file, so that only the files whose
+chunk changed since the header was written have to be parsed to update them.
+"""
+
+from hashlib import blake2b
+
+from shared.reports.resources import Report, ReportFile
+from shared.utils.merge import line_type
+
+from services.report.indexed_chunks import iter_chunks
+
+FILE_FINGERPRINTS_HEADER_KEY = "file_fingerprints"
+FILE_CHUNK_DIGESTS_HEADER_KEY = "file_chunk_digests"
+
+
+def get_file_fingerprint(report_file: ReportFile) -> str:
+    digest = blake2b(digest_size=8)
+    for ln, line in report_file.lines:
+        digest.update(f"{ln}:{line_type(line.coverage)},".encode())
+    return digest.hexdigest()
+
+
+def compute_file_fingerprints(report: Report) -> dict[str, str]:
+    return {
+        report_file.name: get_file_fingerprint(report_file) for report_file in report
+    }
+
+
+def get_chunk_digests(report: Report, body: str) -> dict[str, str]:
+    """
+    Returns the digests of the chunk of every file of `report`, `body` being its
+    chunks file without the header. The chunks are hashed one at a time.
+    """
+    file_names = {
+        file_summary.file_index: name for name, file_summary in report._files.items()
+    }
+    digests = {}
+    for chunk_index, chunk in enumerate(iter_chunks(body)):
+        if (name := file_names.get(chunk_index)) is not None:
+            digests[name] = blake2b(chunk.encode(), digest_size=8).hexdigest()
+    return digests
+
+
+def update_file_fingerprints(report: Report, body: str) -> None:
+    """
+    Updates the fingerprints in the header of `report` to match its chunks `body`.
+
+    Files whose chunk has the same digest as when the header was written keep
+    their fingerprint, and only the other ones are parsed and walked.
+    """
+    header = report.header or {}
+    previous_fingerprints = header.get(FILE_FINGERPRINTS_HEADER_KEY) or {}
+    previous_digests = header.get(FILE_CHUNK_DIGESTS_HEADER_KEY) or {}
+
+    digests = get_chunk_digests(report, body)
+    fingerprints = {}
+    for name in report._files:
+        digest = digests.get(name)
+        if (
+            digest is not None
+            and previous_digests.get(name) == digest
+            and name in previous_fingerprints
+        ):
+            fingerprints[name] = previous_fingerprints[name]
+        else:
+            fingerprints[name] = get_file_fingerprint(report.get(name))
+
+    report.header = {
+        **header,
+        FILE_FINGERPRINTS_HEADER_KEY: fingerprints,
+        FILE_CHUNK_DIGESTS_HEADER_KEY: digests,
+    }
+
+
+def get_file_fingerprints(report) -> dict[str, str]:
+    """
+    Returns the fingerprints stored in the header of `report`.
+
+    This is empty for reports that were saved before fingerprints existed.
+    """
+    # `ReadOnlyReport` does not expose the header of the report it wraps
+    report = getattr(report, "inner_report", report)
+    header = getattr(report, "header", None) or {}
+    return header.get(FILE_FINGERPRINTS_HEADER_KEY) or {}
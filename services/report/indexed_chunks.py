@@ -0,0 +1,185 @@
+"""
+A sharded, indexed layout for chunks files.
+
+Next to the regular `chunks.txt`, the chunks of a report can also be stored as
+shards of `shard_size` consecutive chunks, along with an `index.json`:
+
+    {
+        "version": 2,
+        "report_version": "<the `get_report_version` of the commit>",
+        "shard_size": 50,
+        "number_chunks": 123,
+        "header": "<the raw header of the chunks file>"
+    }
+
+As the `report_json` already maps every file to the index of its chunk, readers
+that only need a handful of files can download just the shards holding those,
+instead of the whole chunks file.
+
+The shards are only valid for the report they were split from, so the index holds
+the version of that report. Readers check it against the version of the report
+currently stored for the commit, as a later save of the report (with this layout
+disabled, or failing halfway) leaves the shards of the previous one behind.
+
+Writing this layout is enabled by `setup.indexed_chunks.enabled`. It writes every
+chunks file twice, so it's only worth it for repositories that mostly need a few
+files out of their reports. Reports saved before that, or whose index is stale,
+fall back to the regular chunks file.
+"""
+
+import logging
+from itertools import islice
+from typing import Collection, Iterator
+
+import orjson
+from shared.config import get_config
+from shared.storage.exceptions import FileNotInStorageError
+
+from services.archive import ArchiveService
+
+log = logging.getLogger(__name__)
+
+INDEXED_CHUNKS_VERSION = 2
+
+# The separators of the chunks file format, as written by `Report.to_archive`
+END_OF_HEADER = "\n<<<<< end_of_header >>>>>\n"
+END_OF_CHUNK = "\n<<<<< end_of_chunk >>>>>\n"
+
+
+def indexed_chunks_enabled() -> bool:
+    return get_config("setup", "indexed_chunks", "enabled", default=False)
+
+
+def get_shard_size() -> int:
+    return get_config("setup", "indexed_chunks", "shard_size", default=50)
+
+
+def iter_chunks(body: str) -> Iterator[str]:
+    """
+    Yields the chunks of the `body` of a chunks file (without its header) one at
+    a time, instead of splitting all of them at once.
+    """
+    if not body:
+        return
+    start = 0
+    while (end := body.find(END_OF_CHUNK, start)) != -1:
+        yield body[start:end]
+        start = end + len(END_OF_CHUNK)
+    yield body[start:]
+
+
+def split_chunks(
+    chunks: str, shard_size: int, report_version: str
+) -> tuple[dict, list[str]]:
+    """
+    Splits a chunks file into its shards, and returns them with their index.
+    """
+    header, separator, body = chunks.partition(END_OF_HEADER)
+    if not separator:
+        header, body = "", chunks
+    return split_body(header, body, shard_size, report_version)
+
+
+def split_body(
+    header: str, body: str, shard_size: int, report_version: str
+) -> tuple[dict, list[str]]:
+    """
+    Same as `split_chunks`, for a chunks file given as its `header` and `body`.
+    """
+    all_chunks = iter_chunks(body)
+    shards = []
+    number_chunks = 0
+    while shard_chunks := list(islice(all_chunks, shard_size)):
+        shards.append(END_OF_CHUNK.join(shard_chunks))
+        number_chunks += len(shard_chunks)
+    index = {
+        "version": INDEXED_CHUNKS_VERSION,
+        "report_version": report_version,
+        "shard_size": shard_size,
+        "number_chunks": number_chunks,
+        "header": header,
+    }
+    return index, shards
+
+
+def join_chunks(index: dict, shards: dict[int, str]) -> str:
+    """
+    Rebuilds a chunks file out of some of its shards.
+
+    The chunks of the shards that are missing are left empty, so the chunk indexes
+    stay valid for the files that were loaded.
+    """
+    shard_size = index["shard_size"]
+    all_chunks = [""] * index["number_chunks"]
+    for shard_number, shard in shards.items():
+        start = shard_number * shard_size
+        shard_chunks = shard.split(END_OF_CHUNK)
+        all_chunks[start : start + len(shard_chunks)] = shard_chunks
+
+    body = END_OF_CHUNK.join(all_chunks)
+    if index["header"]:
+        return index["header"] + END_OF_HEADER + body
+    return body
+
+
+def write_indexed_chunks(
+    archive_service: ArchiveService,
+    commit_sha: str,
+    header: str,
+    body: str,
+    report_version: str,
+    report_code=None,
+) -> str:
+    index, shards = split_body(header, body, get_shard_size(), report_version)
+    return archive_service.write_chunks_shards(
+        commit_sha,
+        orjson.dumps(index),
+        [shard.encode() for shard in shards],
+        report_code,
+    )
+
+
+def read_chunks_for_indexes(
+    archive_service: ArchiveService,
+    commit_sha: str,
+    chunk_indexes: Collection[int],
+    report_version: str,
+    report_code=None,
+) -> str | None:
+    """
+    Returns a chunks file holding (at least) the given chunks, downloading
+    only the shards they live in.
+
+    Returns `None` when there is no usable index for the chunks of this commit,
+    or when it was written for another version of its report than `report_version`.
+    """
+    try:
+        index = orjson.loads(archive_service.read_chunks_index(commit_sha, report_code))
+        if index.get("version") != INDEXED_CHUNKS_VERSION:
+            log.warning(
+                "Unknown indexed chunks version",
+                extra=dict(commit=commit_sha, version=index.get("version")),
+            )
+            return None
+        if index["report_version"] != report_version:
+            log.info(
+                "Indexed chunks are stale",
+                extra=dict(commit=commit_sha, report_code=report_code),
+            )
+            return None
+
+        shard_size = index["shard_size"]
+        shard_numbers = {
+            chunk_index // shard_size
+            for chunk_index in chunk_indexes
+            if 0 <= chunk_index < index["number_chunks"]
+        }
+        shards = {
+            shard_number: archive_service.read_chunks_shard(
+                commit_sha, shard_number, report_code
+            )
+            for shard_number in sorted(shard_numbers)
+        }
+    except FileNotInStorageError:
+        return None
+    return join_chunks(index, shards)
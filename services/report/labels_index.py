@@ -0,0 +1,208 @@
+"""
+An inverted index of the labels of a report.
+
+Label analysis needs the labels covering a handful of lines, the labels of a
+few sessions and the set of all the labels of the report. Getting those out of
+a `Report` means downloading and parsing the whole chunks file and walking
+every datapoint of it. Next to the chunks, a report can also store a
+`labels_index.json` that has them precomputed:
+
+    {
+        "version": 2,
+        "report_version": "<the `get_report_version` of the commit>",
+        "labels_index": {"1": "test_label", ...} or None,
+        "sessions": {"<sessionid>": [<labels>, ...]},
+        "files": {
+            "<path>": {"<line>": [[<labels>, ...], [<sessionids>, ...]]}
+        }
+    }
+
+For each line, the first list holds the labels of its datapoints, and the
+second one the sessions of the datapoints carrying the "all labels" placeholder.
+Labels are the label ids for reports with encoded labels, and the label names
+otherwise. The placeholder itself is never part of the label lists.
+
+Writing the index is enabled by `setup.labels_index.enabled`. Reports saved
+before that don't have an index, and readers fall back to the full report. An
+index whose report version doesn't match the one of its commit was written for
+another version of the report, and is ignored as well. Reports without any labels
+don't have an index either, and saving one removes the index of the previous
+version of the report.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Collection
+
+import orjson
+from shared.config import get_config
+from shared.reports.exceptions import LabelNotFoundError
+from shared.reports.resources import Report
+from shared.storage.exceptions import FileNotInStorageError
+
+from database.models import Commit
+from helpers.labels import SpecialLabelsEnum
+from services.archive import ArchiveService
+from services.report.report_cache import get_report_version
+
+log = logging.getLogger(__name__)
+
+LABELS_INDEX_VERSION = 2
+
+GLOBAL_LEVEL_LABELS = {
+    SpecialLabelsEnum.CODECOV_ALL_LABELS_PLACEHOLDER.corresponding_label,
+    SpecialLabelsEnum.CODECOV_ALL_LABELS_PLACEHOLDER.corresponding_index,
+}
+
+
+def labels_index_enabled() -> bool:
+    return get_config("setup", "labels_index", "enabled", default=False)
+
+
+class LabelsIndex:
+    def __init__(self, data: dict):
+        self._files: dict[str, dict[str, list]] = data["files"]
+        self._sessions: dict[str, list] = data["sessions"]
+        self._labels_index: dict[str, str] | None = data.get("labels_index")
+
+    def get_all_labels(self) -> set[str | int]:
+        all_labels: set[str | int] = set()
+        for session_labels in self._sessions.values():
+            all_labels.update(session_labels)
+        return all_labels
+
+    def get_labels_per_session(self, sess_id: int) -> set[str | int]:
+        return set(self._sessions.get(str(sess_id), []))
+
+    def get_lines_labels(
+        self, path: str, lines: Collection[int] | None = None
+    ) -> tuple[set[str | int], set[int]]:
+        """
+        Returns the labels of the given `lines` of `path` (or of all its lines if
+        `lines` is `None`), and the sessions that covered any of those lines with
+        the "all labels" placeholder.
+        """
+        file_lines = self._files.get(path)
+        labels: set[str | int] = set()
+        global_sessions: set[int] = set()
+        if not file_lines:
+            return labels, global_sessions
+
+        if lines is None:
+            entries = file_lines.values()
+        else:
+            entries = filter(None, (file_lines.get(str(line)) for line in lines))
+        for line_labels, line_global_sessions in entries:
+            labels.update(line_labels)
+            global_sessions.update(line_global_sessions)
+        return labels, global_sessions
+
+    def lookup_label_by_id(self, label_id: int) -> str:
+        label = (self._labels_index or {}).get(str(label_id))
+        if label is None:
+            raise LabelNotFoundError()
+        return label
+
+
+def build_labels_index(report: Report, report_version: str | None) -> dict | None:
+    """
+    Builds the labels index of `report`, in a single pass over its datapoints.
+
+    Returns `None` if the report has no labels at all.
+    """
+    sessions: dict[int, set] = defaultdict(set)
+    files = {}
+    for report_file in report:
+        file_lines = {}
+        for line_number, line in report_file.lines:
+            if not line.datapoints:
+                continue
+            line_labels = set()
+            line_global_sessions = set()
+            for datapoint in line.datapoints:
+                if not datapoint.label_ids:
+                    continue
+                line_labels.update(datapoint.label_ids)
+                sessions[datapoint.sessionid].update(datapoint.label_ids)
+                if not GLOBAL_LEVEL_LABELS.isdisjoint(datapoint.label_ids):
+                    line_global_sessions.add(datapoint.sessionid)
+            if line_labels:
+                file_lines[str(line_number)] = [
+                    list(line_labels - GLOBAL_LEVEL_LABELS),
+                    list(line_global_sessions),
+                ]
+        if file_lines:
+            files[report_file.name] = file_lines
+
+    if not sessions:
+        return None
+
+    labels_index = report.labels_index
+    return {
+        "version": LABELS_INDEX_VERSION,
+        "report_version": report_version,
+        "labels_index": (
+            {str(label_id): label for label_id, label in labels_index.items()}
+            if labels_index
+            else None
+        ),
+        "sessions": {
+            str(sessionid): list(session_labels - GLOBAL_LEVEL_LABELS)
+            for sessionid, session_labels in sessions.items()
+        },
+        "files": files,
+    }
+
+
+def write_labels_index(
+    archive_service: ArchiveService,
+    commit: Commit,
+    report: Report,
+    report_code=None,
+) -> str | None:
+    """
+    Writes the labels index of `report`, the report currently stored for `commit`.
+
+    The index of a previous version of the report is deleted when `report` has no
+    labels at all.
+    """
+    index = build_labels_index(report, get_report_version(commit))
+    if index is None:
+        try:
+            archive_service.delete_labels_index(commit.commitid, report_code)
+        except FileNotInStorageError:
+            pass
+        return None
+    return archive_service.write_labels_index(
+        commit.commitid, orjson.dumps(index), report_code
+    )
+
+
+def read_labels_index(
+    archive_service: ArchiveService, commit: Commit, report_code=None
+) -> LabelsIndex | None:
+    """
+    Returns the labels index of the report of `commit`.
+
+    Returns `None` when there is no usable index for that report.
+    """
+    try:
+        index = orjson.loads(
+            archive_service.read_labels_index(commit.commitid, report_code)
+        )
+    except FileNotInStorageError:
+        return None
+
+    if index.get("version") != LABELS_INDEX_VERSION:
+        log.warning(
+            "Unknown labels index version",
+            extra=dict(commit=commit.commitid, version=index.get("version")),
+        )
+        return None
+    if index.get("report_version") != get_report_version(commit):
+        log.info(
+            "Ignoring outdated labels index",
+            extra=dict(commit=commit.commitid),
+        )
+        return None
+    return LabelsIndex(index)
@@ -1,6 +1,7 @@
 from io import BytesIO
 from typing import Any
 
+from services.path_fixer.cache import get_toc_digest
 from services.path_fixer.fixpaths import clean_toc
 from services.report.fixes import get_fixes_from_raw
 
@@ -93,6 +94,9 @@ class VersionOneParsedRawReport(ParsedRawReport):
     def get_toc(self) -> list[str]:
         return self.toc
 
+    def get_toc_digest(self) -> str:
+        return get_toc_digest(self.toc)
+
     def get_env(self):
         return self.env
 
@@ -112,6 +116,10 @@ class LegacyParsedRawReport(ParsedRawReport):
     def get_toc(self) -> list[str]:
         return clean_toc(self.toc.decode(errors="replace").strip())
 
+    def get_toc_digest(self) -> str:
+        # the raw `toc`, which is way cheaper to hash than the cleaned up one
+        return get_toc_digest(self.toc)
+
     def get_env(self):
         return self.env.decode(errors="replace")
 
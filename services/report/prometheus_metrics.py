@@ -1,4 +1,4 @@
-from shared.metrics import Histogram
+from shared.metrics import Counter, Histogram
 
 from helpers.metrics import KiB, MiB
 
@@ -28,3 +28,10 @@ RAW_UPLOAD_RAW_REPORT_COUNT = Histogram(
     # lower than 1 in its histogram_quantile function.
     buckets=[0.98, 1, 2, 3, 4, 5, 7, 10, 30, 50, 100],
 )
+
+CARRYFORWARD_REPORTS = Counter(
+    "worker_services_report_carryforward_reports",
+    "Number of carriedforward reports created. The `mode` is `whole` when all of "
+    "the parent report is carried forward as is, and `filtered` otherwise.",
+    ["mode"],
+)
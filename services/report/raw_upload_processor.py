@@ -42,7 +42,10 @@ def process_raw_upload(
         session.env = dict([e.split("=", 1) for e in env.split("\n") if "=" in e])
 
     path_fixer = PathFixer.init_from_user_yaml(
-        commit_yaml=commit_yaml, toc=toc, flags=session.flags
+        commit_yaml=commit_yaml,
+        toc=toc,
+        flags=session.flags,
+        toc_digest=raw_reports.get_toc_digest(),
     )
 
     # ------------------
@@ -0,0 +1,109 @@
+"""
+A per-process, memory-bounded LRU cache of parsed `ReadOnlyReport`s.
+
+Most notifications and comparisons of a repository are computed against the same
+handful of base commits (typically the tip of the default branch), so the worker
+would otherwise download and parse the same base chunks file over and over again.
+
+Cached reports are shared between every task running in the same process, which is
+why only `ReadOnlyReport`s are cached: callers must never mutate them.
+
+The cache is keyed by `(repoid, commitid, report_code, version)`, where the version
+is a hash of the totals and the `report_json` of the `Commit`, which are rewritten
+whenever a new report is saved for it. A report that gets updated thus naturally
+misses the cache, and the stale entry is eventually evicted.
+
+Eviction happens in LRU order once the sum of the cached chunks sizes exceeds the
+configured `setup.readonly_report_cache.max_bytes`. The cache is disabled when that
+value is `0` (the default).
+"""
+
+from hashlib import md5
+from typing import NamedTuple
+
+import orjson
+from shared.config import get_config
+from shared.metrics import Counter
+from shared.reports.readonly import ReadOnlyReport
+
+from database.models import Commit
+from helpers.lru_cache import BoundedLRUCache
+
+READONLY_REPORT_CACHE_REQUESTS = Counter(
+    "worker_services_report_readonly_cache_requests",
+    "Number of `ReadOnlyReport` cache lookups. The `result` can be `hit` or `miss`.",
+    ["result"],
+)
+READONLY_REPORT_CACHE_EVICTIONS = Counter(
+    "worker_services_report_readonly_cache_evictions",
+    "Number of `ReadOnlyReport`s evicted from the per-process cache",
+)
+READONLY_REPORT_CACHE_EVICTED_BYTES = Counter(
+    "worker_services_report_readonly_cache_evicted_bytes",
+    "Size (in bytes of their chunks file) of the evicted `ReadOnlyReport`s",
+)
+
+
+class ReportCacheKey(NamedTuple):
+    repoid: int
+    commitid: str
+    report_code: str | None
+    version: str
+
+    @classmethod
+    def for_commit(cls, commit: Commit, report_code: str | None) -> "ReportCacheKey":
+        return cls(
+            repoid=commit.repoid,
+            commitid=commit.commitid,
+            report_code=report_code,
+            version=get_report_version(commit),
+        )
+
+
+def get_report_version(commit: Commit) -> str:
+    """
+    Fingerprints the stored report of `commit` without downloading its chunks.
+
+    Every save of a report rewrites its `report_json`, whose sessions and file
+    summaries change along with the chunks, even when the totals don't (like when
+    a carriedforward session is replaced by an upload with the same coverage).
+    """
+    payload = orjson.dumps(
+        [commit.totals, commit.report_json], option=orjson.OPT_NON_STR_KEYS
+    )
+    return md5(payload).hexdigest()
+
+
+class ReadOnlyReportCache(BoundedLRUCache[ReportCacheKey, ReadOnlyReport]):
+    @property
+    def max_size(self) -> int:
+        return get_config("setup", "readonly_report_cache", "max_bytes", default=0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: ReportCacheKey) -> ReadOnlyReport | None:
+        report = super().get(key)
+        READONLY_REPORT_CACHE_REQUESTS.labels(
+            result="miss" if report is None else "hit"
+        ).inc()
+        return report
+
+    def put(self, key: ReportCacheKey, report: ReadOnlyReport, size: int) -> None:
+        """
+        Stores `report`, evicting the least recently used reports until the cache
+        fits into `max_size` again.
+
+        `size` should approximate the memory footprint of the report, the size of
+        its chunks file being a good proxy. Reports larger than the whole cache
+        are never stored.
+        """
+        super().put(key, report, size)
+
+    def _on_evict(self, key: ReportCacheKey, report: ReadOnlyReport, size: int) -> None:
+        READONLY_REPORT_CACHE_EVICTIONS.inc()
+        READONLY_REPORT_CACHE_EVICTED_BYTES.inc(size)
+
+
+readonly_report_cache = ReadOnlyReportCache()
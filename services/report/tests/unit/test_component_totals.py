@@ -0,0 +1,82 @@
+import pytest
+from shared.components import Component
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report, ReportFile, ReportLine
+from shared.utils.sessions import Session
+
+from services.report.component_totals import get_components_totals
+
+
+@pytest.fixture
+def sample_report():
+    report = Report()
+    first_file = ReportFile("poker.py")
+    first_file.append(1, ReportLine.create(coverage=1, sessions=[[0, 1]]))
+    first_file.append(2, ReportLine.create(coverage=1, sessions=[[0, 1]]))
+    second_file = ReportFile("folder/poker2.py")
+    second_file.append(3, ReportLine.create(coverage=0, sessions=[[0, 0]]))
+    second_file.append(4, ReportLine.create(coverage=1, sessions=[[1, 1]]))
+    third_file = ReportFile("random.go")
+    third_file.append(5, ReportLine.create(coverage=0, sessions=[[0, 0]]))
+    third_file.append(6, ReportLine.create(coverage="1/2", sessions=[[1, "1/2"]]))
+    report.append(first_file)
+    report.append(second_file)
+    report.append(third_file)
+    report.add_session(Session(flags=["unit"]))
+    report.add_session(Session(flags=["integration"]))
+    return report
+
+
+def _component(component_id, paths=None, flag_regexes=None):
+    return Component.from_dict(
+        {
+            "component_id": component_id,
+            "paths": paths or [],
+            "flag_regexes": flag_regexes or [],
+        }
+    )
+
+
+@pytest.mark.parametrize("readonly", [False, True])
+def test_get_components_totals_matches_filter(sample_report, readonly):
+    report = sample_report
+    if readonly:
+        report = ReadOnlyReport.create_from_report(sample_report)
+    components = [
+        _component("python", paths=[r".*\.py"]),
+        _component("not_go", paths=[r"!.*\.go"]),
+        _component("folder", paths=["^folder/.*"]),
+        _component("nothing", paths=["^missing/.*"]),
+        _component("no_matching_flags", paths=["^folder/.*"], flag_regexes=["e2e"]),
+        _component("unit", paths=[r".*\.py"], flag_regexes=["unit"]),
+    ]
+
+    components_totals = get_components_totals(report, components)
+
+    assert len(components_totals) == len(components)
+    for component, totals in zip(components, components_totals):
+        flags = component.get_matching_flags(report.flags.keys())
+        expected = report.filter(flags=flags, paths=component.paths).totals
+        assert totals.coverage == expected.coverage, component.component_id
+        assert totals.hits == expected.hits
+        assert totals.misses == expected.misses
+        assert totals.partials == expected.partials
+
+
+def test_get_components_totals_only_filters_flagged_components(
+    sample_report, mocker
+):
+    filter_spy = mocker.spy(Report, "filter")
+    components = [
+        _component("python", paths=[r".*\.py"]),
+        _component("go", paths=[r".*\.go"]),
+        _component("unit", flag_regexes=["unit"]),
+    ]
+
+    components_totals = get_components_totals(sample_report, components)
+
+    assert filter_spy.call_count == 1
+    python_totals, go_totals, _ = components_totals
+    assert python_totals.files == 2
+    assert python_totals.coverage == "75.00000"
+    assert (go_totals.hits, go_totals.misses, go_totals.partials) == (0, 1, 1)
@@ -0,0 +1,74 @@
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report, ReportFile, ReportLine
+
+from services.report import fingerprints
+from services.report.fingerprints import (
+    FILE_CHUNK_DIGESTS_HEADER_KEY,
+    FILE_FINGERPRINTS_HEADER_KEY,
+    compute_file_fingerprints,
+    get_file_fingerprint,
+    get_file_fingerprints,
+    update_file_fingerprints,
+)
+from services.report.indexed_chunks import END_OF_HEADER
+
+
+def _report_file(name: str, coverages: list) -> ReportFile:
+    report_file = ReportFile(name)
+    for ln, coverage in enumerate(coverages, start=1):
+        report_file.append(ln, ReportLine.create(coverage=coverage))
+    return report_file
+
+
+def test_fingerprint_only_depends_on_line_types():
+    assert get_file_fingerprint(
+        _report_file("a.py", [1, 0, "1/2"])
+    ) == get_file_fingerprint(_report_file("b.py", [5, 0, "2/3"]))
+    assert get_file_fingerprint(
+        _report_file("a.py", [1, 0, "1/2"])
+    ) != get_file_fingerprint(_report_file("a.py", [1, 1, "1/2"]))
+
+
+def test_fingerprint_depends_on_line_numbers():
+    first = ReportFile("a.py")
+    first.append(1, ReportLine.create(coverage=1))
+    second = ReportFile("a.py")
+    second.append(2, ReportLine.create(coverage=1))
+    assert get_file_fingerprint(first) != get_file_fingerprint(second)
+
+
+def test_get_file_fingerprints():
+    report = Report()
+    report.append(_report_file("a.py", [1, 0]))
+    assert get_file_fingerprints(report) == {}
+
+    fingerprints = compute_file_fingerprints(report)
+    assert list(fingerprints.keys()) == ["a.py"]
+    report.header = {FILE_FINGERPRINTS_HEADER_KEY: fingerprints}
+    assert get_file_fingerprints(report) == fingerprints
+    assert (
+        get_file_fingerprints(ReadOnlyReport.create_from_report(report))
+        == fingerprints
+    )
+
+
+def test_update_file_fingerprints_only_walks_changed_files(mocker):
+    report = Report()
+    report.append(_report_file("a.py", [1, 0]))
+    report.append(_report_file("b.py", [1, 1]))
+    _, _, body = report.to_archive().partition(END_OF_HEADER)
+    update_file_fingerprints(report, body)
+    assert report.header[FILE_FINGERPRINTS_HEADER_KEY] == compute_file_fingerprints(
+        report
+    )
+    assert set(report.header[FILE_CHUNK_DIGESTS_HEADER_KEY]) == {"a.py", "b.py"}
+
+    report.append(_report_file("b.py", [0, 0, 1]))
+    _, _, body = report.to_archive().partition(END_OF_HEADER)
+    get_fingerprint = mocker.spy(fingerprints, "get_file_fingerprint")
+    update_file_fingerprints(report, body)
+
+    assert [call.args[0].name for call in get_fingerprint.call_args_list] == ["b.py"]
+    assert report.header[FILE_FINGERPRINTS_HEADER_KEY] == compute_file_fingerprints(
+        report
+    )
@@ -0,0 +1,158 @@
+import pytest
+
+from database.tests.factories import CommitFactory
+from services.archive import ArchiveService
+from services.report import ReportService
+from services.report.indexed_chunks import (
+    END_OF_CHUNK,
+    END_OF_HEADER,
+    iter_chunks,
+    join_chunks,
+    read_chunks_for_indexes,
+    split_chunks,
+    write_indexed_chunks,
+)
+from services.report.report_cache import get_report_version
+
+
+@pytest.fixture
+def sample_chunks():
+    with open("tasks/tests/samples/sample_chunks_4_sessions.txt") as f:
+        return f.read()
+
+
+@pytest.fixture
+def indexed_chunks_config(mock_configuration):
+    mock_configuration._params["setup"]["indexed_chunks"] = {
+        "enabled": True,
+        "shard_size": 4,
+    }
+    return mock_configuration
+
+
+def test_split_and_join_chunks(sample_chunks):
+    chunks = '{"some":"header"}' + END_OF_HEADER + sample_chunks
+    index, shards = split_chunks(chunks, 4, "some_version")
+    assert index == {
+        "version": 2,
+        "report_version": "some_version",
+        "shard_size": 4,
+        "number_chunks": 15,
+        "header": '{"some":"header"}',
+    }
+    assert len(shards) == 4
+    assert join_chunks(index, dict(enumerate(shards))) == chunks
+
+    # only the chunks of the loaded shards are kept
+    partial = join_chunks(index, {1: shards[1]})
+    header, body = partial.split(END_OF_HEADER)
+    partial_chunks = body.split(END_OF_CHUNK)
+    all_chunks = sample_chunks.split(END_OF_CHUNK)
+    assert len(partial_chunks) == 15
+    assert partial_chunks[4:8] == all_chunks[4:8]
+    assert partial_chunks[:4] == [""] * 4
+    assert partial_chunks[8:] == [""] * 7
+
+
+def test_split_chunks_without_header(sample_chunks):
+    index, shards = split_chunks(sample_chunks, 10, "some_version")
+    assert index["header"] == ""
+    assert len(shards) == 2
+    assert join_chunks(index, dict(enumerate(shards))) == sample_chunks
+
+
+def test_iter_chunks(sample_chunks):
+    assert list(iter_chunks(sample_chunks)) == sample_chunks.split(END_OF_CHUNK)
+    assert list(iter_chunks("[1]")) == ["[1]"]
+    assert list(iter_chunks("")) == []
+
+
+def test_read_chunks_for_indexes(dbsession, mock_storage, sample_chunks, mocker):
+    commit = CommitFactory.create()
+    dbsession.add(commit)
+    dbsession.flush()
+    archive_service = ArchiveService(commit.repository)
+
+    assert (
+        read_chunks_for_indexes(archive_service, commit.commitid, {0}, "v1") is None
+    )
+
+    mocker.patch("services.report.indexed_chunks.get_shard_size", return_value=4)
+    write_indexed_chunks(archive_service, commit.commitid, "", sample_chunks, "v1")
+    read_shard = mocker.spy(archive_service, "read_chunks_shard")
+
+    # the shards of another version of the report are never used
+    assert (
+        read_chunks_for_indexes(archive_service, commit.commitid, {0}, "v2") is None
+    )
+    assert read_shard.call_count == 0
+
+    chunks = read_chunks_for_indexes(
+        archive_service, commit.commitid, {9, 10, 99}, "v1"
+    )
+    assert read_shard.call_count == 1
+    assert read_shard.call_args[0][1] == 2
+    assert (
+        chunks.split(END_OF_CHUNK)[9] == sample_chunks.split(END_OF_CHUNK)[9]
+    )
+
+
+def test_get_existing_partial_report_for_commit(
+    dbsession, mock_storage, sample_chunks, indexed_chunks_config, mocker
+):
+    totals = [0, 14, 12, 0, 2, "85.71429", 0, 0, 0, 0, 0, 0, 0]
+    commit = CommitFactory.create(
+        _report_json={
+            "sessions": {},
+            "files": {
+                "file_00.py": [0, totals, None],
+                "file_09.py": [9, totals, None],
+            },
+        }
+    )
+    dbsession.add(commit)
+    dbsession.flush()
+    archive_service = ArchiveService(commit.repository)
+    write_indexed_chunks(
+        archive_service,
+        commit.commitid,
+        "",
+        sample_chunks,
+        get_report_version(commit),
+    )
+    read_chunks = mocker.spy(ArchiveService, "read_chunks")
+    read_shard = mocker.spy(ArchiveService, "read_chunks_shard")
+
+    report = ReportService({}).get_existing_report_for_commit(
+        commit, paths=["file_09.py", "unknown.py"]
+    )
+    assert report.files == ["file_09.py"]
+    assert report.get("file_09.py") is not None
+    assert len(list(report.get("file_09.py").lines)) > 0
+    assert read_chunks.call_count == 0
+    assert read_shard.call_count == 1
+
+
+def test_get_existing_partial_report_for_commit_without_index(
+    dbsession, mock_storage, sample_chunks, mocker
+):
+    totals = [0, 14, 12, 0, 2, "85.71429", 0, 0, 0, 0, 0, 0, 0]
+    commit = CommitFactory.create(
+        _report_json={
+            "sessions": {},
+            "files": {
+                "file_00.py": [0, totals, None],
+                "file_09.py": [9, totals, None],
+            },
+        }
+    )
+    dbsession.add(commit)
+    dbsession.flush()
+    archive_service = ArchiveService(commit.repository)
+    archive_service.write_chunks(commit.commitid, sample_chunks)
+
+    report = ReportService({}).get_existing_report_for_commit(
+        commit, paths=["file_00.py"]
+    )
+    assert report.files == ["file_00.py"]
+    assert len(list(report.get("file_00.py").lines)) > 0
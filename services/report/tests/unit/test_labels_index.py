@@ -0,0 +1,141 @@
+import pytest
+from shared.reports.exceptions import LabelNotFoundError
+from shared.reports.resources import LineSession, Report, ReportFile, ReportLine
+from shared.reports.types import CoverageDatapoint
+
+from database.tests.factories import CommitFactory
+from helpers.labels import get_all_report_labels, get_labels_per_session
+from services.archive import ArchiveService
+from services.report.labels_index import (
+    LabelsIndex,
+    build_labels_index,
+    read_labels_index,
+    write_labels_index,
+)
+
+
+def _line(*datapoints):
+    return ReportLine.create(
+        coverage=1,
+        sessions=[LineSession(id=sessionid, coverage=1) for sessionid, _ in datapoints],
+        datapoints=[
+            CoverageDatapoint(
+                sessionid=sessionid, coverage=1, coverage_type=None, label_ids=labels
+            )
+            for sessionid, labels in datapoints
+        ],
+    )
+
+
+@pytest.fixture
+def encoded_report():
+    report = Report()
+    first_file = ReportFile("first.py")
+    first_file.append(1, _line((0, [1, 2])))
+    first_file.append(2, _line((0, [2]), (1, [0])))
+    first_file.append(3, ReportLine.create(coverage=1, sessions=[[0, 1]]))
+    second_file = ReportFile("second.py")
+    second_file.append(1, _line((1, [3, 4])))
+    third_file = ReportFile("no_labels.py")
+    third_file.append(1, ReportLine.create(coverage=0, sessions=[[0, 0]]))
+    report.append(first_file)
+    report.append(second_file)
+    report.append(third_file)
+    report.labels_index = {0: "Th2dMtk4M_codecov", 1: "a", 2: "b", 3: "c", 4: "d"}
+    return report
+
+
+def test_build_labels_index(encoded_report):
+    index = build_labels_index(encoded_report, "some_version")
+    assert index["version"] == 2
+    assert index["report_version"] == "some_version"
+    assert index["labels_index"]["3"] == "c"
+    assert {
+        sessionid: sorted(labels) for sessionid, labels in index["sessions"].items()
+    } == {"0": [1, 2], "1": [3, 4]}
+    assert set(index["files"]) == {"first.py", "second.py"}
+    assert set(index["files"]["first.py"]) == {"1", "2"}
+    assert index["files"]["first.py"]["2"] == [[2], [1]]
+
+
+def test_build_labels_index_without_labels():
+    report = Report()
+    report_file = ReportFile("file.py")
+    report_file.append(1, ReportLine.create(coverage=1, sessions=[[0, 1]]))
+    report.append(report_file)
+    assert build_labels_index(report, None) is None
+
+
+def test_labels_index_matches_report(encoded_report):
+    index = LabelsIndex(build_labels_index(encoded_report, None))
+
+    assert index.get_all_labels() == get_all_report_labels(encoded_report)
+    for sessionid in (0, 1, 2):
+        assert index.get_labels_per_session(sessionid) == get_labels_per_session(
+            encoded_report, sessionid
+        )
+    assert index.get_lines_labels("first.py", [2, 3, 99]) == ({2}, {1})
+    assert index.get_lines_labels("first.py") == ({1, 2}, {1})
+    assert index.get_lines_labels("no_labels.py") == (set(), set())
+    assert index.lookup_label_by_id(4) == "d"
+    with pytest.raises(LabelNotFoundError):
+        index.lookup_label_by_id(5)
+
+
+def test_write_and_read_labels_index(dbsession, mock_storage, encoded_report):
+    commit = CommitFactory.create()
+    dbsession.add(commit)
+    dbsession.flush()
+    archive_service = ArchiveService(commit.repository)
+
+    assert read_labels_index(archive_service, commit) is None
+
+    write_labels_index(archive_service, commit, encoded_report)
+    index = read_labels_index(archive_service, commit)
+    assert index is not None
+    assert index.get_lines_labels("second.py", [1]) == ({3, 4}, set())
+
+    # the report was saved again since the index was written
+    commit.totals = {**commit.totals, "n": commit.totals["n"] + 1}
+    assert read_labels_index(archive_service, commit) is None
+
+
+def test_read_labels_index_same_totals_different_sessions(
+    dbsession, mock_storage, encoded_report
+):
+    commit = CommitFactory.create(
+        _report_json={"sessions": {"0": {"t": None, "f": ["unit"]}}, "files": {}}
+    )
+    dbsession.add(commit)
+    dbsession.flush()
+    archive_service = ArchiveService(commit.repository)
+
+    write_labels_index(archive_service, commit, encoded_report)
+    assert read_labels_index(archive_service, commit) is not None
+
+    # e.g. a carriedforward session was replaced by an upload with the same coverage
+    commit.report_json = {
+        "sessions": {"1": {"t": None, "f": ["unit"]}},
+        "files": {},
+    }
+    assert read_labels_index(archive_service, commit) is None
+
+
+def test_write_labels_index_without_labels_deletes_index(
+    dbsession, mock_storage, encoded_report
+):
+    commit = CommitFactory.create()
+    dbsession.add(commit)
+    dbsession.flush()
+    archive_service = ArchiveService(commit.repository)
+
+    report = Report()
+    report_file = ReportFile("file.py")
+    report_file.append(1, ReportLine.create(coverage=1, sessions=[[0, 1]]))
+    report.append(report_file)
+    assert write_labels_index(archive_service, commit, report) is None
+
+    write_labels_index(archive_service, commit, encoded_report)
+    assert read_labels_index(archive_service, commit) is not None
+    assert write_labels_index(archive_service, commit, report) is None
+    assert read_labels_index(archive_service, commit) is None
@@ -0,0 +1,161 @@
+import pytest
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report
+
+from database.tests.factories import CommitFactory
+from services.archive import ArchiveService
+from services.report import ReportService
+from services.report.report_cache import (
+    ReadOnlyReportCache,
+    ReportCacheKey,
+    get_report_version,
+    readonly_report_cache,
+)
+
+
+@pytest.fixture
+def cache_config(mock_configuration):
+    mock_configuration._params["setup"]["readonly_report_cache"] = {"max_bytes": 100}
+    readonly_report_cache.clear()
+    yield mock_configuration
+    readonly_report_cache.clear()
+
+
+def _key(commitid: str) -> ReportCacheKey:
+    return ReportCacheKey(
+        repoid=1, commitid=commitid, report_code=None, version="abc"
+    )
+
+
+def test_cache_disabled_by_default(mock_configuration):
+    cache = ReadOnlyReportCache()
+    assert not cache.enabled
+
+    cache.put(_key("a"), Report(), size=1)
+    assert cache.get(_key("a")) is None
+    assert len(cache) == 0
+
+
+def test_cache_hit_and_miss(cache_config):
+    cache = ReadOnlyReportCache()
+    report = Report()
+
+    assert cache.get(_key("a")) is None
+    cache.put(_key("a"), report, size=10)
+    assert cache.get(_key("a")) is report
+    assert cache.current_size == 10
+
+
+def test_cache_evicts_least_recently_used_by_bytes(cache_config):
+    cache = ReadOnlyReportCache()
+    report_a, report_b, report_c = Report(), Report(), Report()
+
+    cache.put(_key("a"), report_a, size=40)
+    cache.put(_key("b"), report_b, size=40)
+    # touching `a` makes `b` the least recently used entry
+    assert cache.get(_key("a")) is report_a
+    cache.put(_key("c"), report_c, size=40)
+
+    assert cache.get(_key("b")) is None
+    assert cache.get(_key("a")) is report_a
+    assert cache.get(_key("c")) is report_c
+    assert cache.current_size == 80
+
+
+def test_cache_skips_oversized_reports(cache_config):
+    cache = ReadOnlyReportCache()
+    cache.put(_key("a"), Report(), size=101)
+    assert len(cache) == 0
+    assert cache.current_size == 0
+
+
+def test_cache_replaces_existing_entry(cache_config):
+    cache = ReadOnlyReportCache()
+    cache.put(_key("a"), Report(), size=40)
+    report = Report()
+    cache.put(_key("a"), report, size=30)
+    assert cache.get(_key("a")) is report
+    assert cache.current_size == 30
+
+
+def test_cache_reinit_after_fork(cache_config):
+    cache = ReadOnlyReportCache()
+    cache.put(_key("a"), Report(), size=40)
+    cache._reinit_after_fork()
+    assert len(cache) == 0
+    assert cache.current_size == 0
+
+
+def test_report_version_changes_with_totals(dbsession):
+    commit = CommitFactory.create(totals={"c": "80.00"})
+    dbsession.add(commit)
+    dbsession.flush()
+    version = get_report_version(commit)
+    assert get_report_version(commit) == version
+
+    commit.totals = {"c": "85.00"}
+    assert get_report_version(commit) != version
+
+
+def test_report_version_changes_with_sessions(dbsession, mock_storage):
+    commit = CommitFactory.create(
+        totals={"c": "80.00"},
+        _report_json={"files": {}, "sessions": {"0": {"t": None, "j": "first"}}},
+    )
+    dbsession.add(commit)
+    dbsession.flush()
+    version = get_report_version(commit)
+
+    # same totals, but a different session
+    commit.report_json = {"files": {}, "sessions": {"0": {"t": None, "j": "second"}}}
+    assert get_report_version(commit) != version
+
+
+def test_get_existing_report_for_commit_uses_cache(
+    dbsession, mock_storage, cache_config, mocker
+):
+    cache_config._params["setup"]["readonly_report_cache"]["max_bytes"] = 10_000_000
+    commit = CommitFactory.create(
+        _report_json={
+            "sessions": {},
+            "files": {
+                "file_00.py": [
+                    0,
+                    [0, 14, 12, 0, 2, "85.71429", 0, 0, 0, 0, 0, 0, 0],
+                    None,
+                ]
+            },
+        }
+    )
+    dbsession.add(commit)
+    dbsession.flush()
+    with open("tasks/tests/samples/sample_chunks_4_sessions.txt") as f:
+        content = f.read().encode()
+        archive_hash = ArchiveService.get_archive_hash(commit.repository)
+        chunks_url = f"v4/repos/{archive_hash}/commits/{commit.commitid}/chunks.txt"
+        mock_storage.write_file("archive", chunks_url, content)
+    read_chunks = mocker.spy(ArchiveService, "read_chunks")
+
+    report_service = ReportService({})
+    first = report_service.get_existing_report_for_commit(
+        commit, report_class=ReadOnlyReport
+    )
+    second = report_service.get_existing_report_for_commit(
+        commit, report_class=ReadOnlyReport
+    )
+    assert first is not None
+    assert second is first
+    assert read_chunks.call_count == 1
+
+    # mutable reports are never served from the cache
+    editable = report_service.get_existing_report_for_commit(commit)
+    assert editable is not first
+    assert read_chunks.call_count == 2
+
+    # a new report version for the commit misses the cache
+    commit.totals = {"c": "12.00"}
+    third = report_service.get_existing_report_for_commit(
+        commit, report_class=ReadOnlyReport
+    )
+    assert third is not first
+    assert read_chunks.call_count == 3
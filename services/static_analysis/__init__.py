@@ -1,8 +1,10 @@
 import json
 import logging
 import typing
+from concurrent.futures import ThreadPoolExecutor
 
 import sentry_sdk
+from shared.config import get_config
 from shared.storage.exceptions import FileNotInStorageError
 
 from database.models.staticanalysis import (
@@ -12,6 +14,7 @@ from database.models.staticanalysis import (
 )
 from services.archive import ArchiveService
 from services.static_analysis.git_diff_parser import DiffChange, DiffChangeType
+from services.static_analysis.snapshot_cache import snapshot_cache
 from services.static_analysis.single_file_analyzer import (
     AntecessorFindingResult,
     SingleFileSnapshotAnalyzer,
@@ -20,6 +23,12 @@ from services.static_analysis.single_file_analyzer import (
 log = logging.getLogger(__name__)
 
 
+def snapshot_fetch_concurrency() -> int:
+    return get_config(
+        "setup", "static_analysis", "snapshot_fetch_concurrency", default=8
+    )
+
+
 def _get_analysis_content_mapping(analysis: StaticAnalysisSuite, filepaths):
     db_session = analysis.get_db_session()
     return dict(
@@ -50,6 +59,8 @@ class StaticAnalysisComparisonService(object):
         self._head_static_analysis = head_static_analysis
         self._git_diff = git_diff
         self._archive_service = None
+        # content_location -> parsed snapshot (or `None` if it is missing)
+        self._snapshots: dict[str, typing.Optional[dict]] = {}
 
     @property
     def archive_service(self):
@@ -61,6 +72,9 @@ class StaticAnalysisComparisonService(object):
 
     @sentry_sdk.trace
     def get_base_lines_relevant_to_change(self) -> typing.List[typing.Dict]:
+        # This check should happen way earlier
+        if any(change.change_type == DiffChangeType.new for change in self._git_diff):
+            return {"all": True}
         final_result = {"all": False, "files": {}}
         db_session = self._base_static_analysis.get_db_session()
         head_analysis_content_locations_mapping = _get_analysis_content_mapping(
@@ -79,13 +93,22 @@ class StaticAnalysisComparisonService(object):
                 if change.before_filepath
             ],
         )
-        # @giovanni-guidini 2023-06-14
-        # NOTE: Maybe we can paralelize this bit.
-        # There's some level of IO involved.
+        modified_changes = [
+            change
+            for change in self._git_diff
+            if change.change_type == DiffChangeType.modified
+        ]
+        self._prefetch_snapshots(
+            [
+                head_analysis_content_locations_mapping.get(change.after_filepath)
+                for change in modified_changes
+            ]
+            + [
+                base_analysis_content_locations_mapping.get(change.before_filepath)
+                for change in modified_changes
+            ]
+        )
         for change in self._git_diff:
-            # This check should happen way earlier
-            if change.change_type == DiffChangeType.new:
-                return {"all": True}
             final_result["files"][change.before_filepath] = self._analyze_single_change(
                 db_session,
                 change,
@@ -94,22 +117,59 @@ class StaticAnalysisComparisonService(object):
             )
         return final_result
 
+    def _fetch_snapshot(self, content_location: str) -> typing.Optional[dict]:
+        if snapshot_cache.enabled:
+            snapshot = snapshot_cache.get(content_location)
+            if snapshot is not None:
+                return snapshot
+        try:
+            content = self.archive_service.read_file(content_location)
+        except FileNotInStorageError:
+            return None
+        snapshot = json.loads(content)
+        if snapshot_cache.enabled:
+            snapshot_cache.put(content_location, snapshot, len(content))
+        return snapshot
+
+    @sentry_sdk.trace
+    def _prefetch_snapshots(
+        self, content_locations: typing.Iterable[typing.Optional[str]]
+    ) -> None:
+        """
+        Downloads and parses the snapshots at `content_locations` concurrently,
+        so that `_load_snapshot_data` doesn't have to fetch them one by one.
+        """
+        locations = list(
+            {
+                location
+                for location in content_locations
+                if location and location not in self._snapshots
+            }
+        )
+        concurrency = min(snapshot_fetch_concurrency(), len(locations))
+        if concurrency <= 1:
+            snapshots = [self._fetch_snapshot(location) for location in locations]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                snapshots = list(pool.map(self._fetch_snapshot, locations))
+        self._snapshots.update(zip(locations, snapshots))
+
     def _load_snapshot_data(
         self, filepath, content_location
     ) -> typing.Optional[SingleFileSnapshotAnalyzer]:
         if not content_location:
             return None
-        try:
-            return SingleFileSnapshotAnalyzer(
-                filepath,
-                json.loads(self.archive_service.read_file(content_location)),
-            )
-        except FileNotInStorageError:
+        if content_location in self._snapshots:
+            snapshot = self._snapshots[content_location]
+        else:
+            snapshot = self._fetch_snapshot(content_location)
+        if snapshot is None:
             log.warning(
                 "Unable to load file for static analysis comparison",
                 extra=dict(filepath=filepath, content_location=content_location),
             )
             return None
+        return SingleFileSnapshotAnalyzer(filepath, snapshot)
 
     def _analyze_single_change(
         self,
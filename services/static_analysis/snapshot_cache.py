@@ -0,0 +1,49 @@
+"""
+A per-process, memory-bounded LRU cache of parsed static analysis snapshots.
+
+Snapshots are stored at a `content_location` derived from the hash of the file
+they describe, so the content at a given location never changes. Files that are
+not touched by a diff have the same snapshot in the base and head commits, and
+in all the following label analysis requests of the repository, so they only
+need to be downloaded and parsed once per process.
+
+Cached snapshots are shared between every task running in the same process, so
+callers must never mutate them.
+
+Eviction happens in LRU order once the sum of the sizes of the cached snapshot
+files exceeds the configured `setup.static_analysis.snapshot_cache_max_bytes`.
+The cache is disabled when that value is `0` (the default).
+"""
+
+from shared.config import get_config
+from shared.metrics import Counter
+
+from helpers.lru_cache import BoundedLRUCache
+
+SNAPSHOT_CACHE_REQUESTS = Counter(
+    "worker_services_static_analysis_snapshot_cache_requests",
+    "Number of snapshot cache lookups. The `result` can be `hit` or `miss`.",
+    ["result"],
+)
+
+
+class SnapshotCache(BoundedLRUCache[str, dict]):
+    @property
+    def max_size(self) -> int:
+        return get_config(
+            "setup", "static_analysis", "snapshot_cache_max_bytes", default=0
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, content_location: str) -> dict | None:
+        snapshot = super().get(content_location)
+        SNAPSHOT_CACHE_REQUESTS.labels(
+            result="miss" if snapshot is None else "hit"
+        ).inc()
+        return snapshot
+
+
+snapshot_cache = SnapshotCache()
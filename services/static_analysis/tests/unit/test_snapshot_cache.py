@@ -0,0 +1,36 @@
+import pytest
+
+from services.static_analysis.snapshot_cache import SnapshotCache
+
+
+@pytest.fixture
+def cache_config(mock_configuration):
+    mock_configuration._params["setup"]["static_analysis"] = {
+        "snapshot_cache_max_bytes": 10
+    }
+    return mock_configuration
+
+
+def test_cache_disabled_by_default(mock_configuration):
+    cache = SnapshotCache()
+    assert not cache.enabled
+
+    cache.put("location", {"statements": []}, size=1)
+    assert cache.get("location") is None
+
+
+def test_cache_evicts_least_recently_used(cache_config):
+    cache = SnapshotCache()
+    cache.put("a", {"a": 1}, size=4)
+    cache.put("b", {"b": 1}, size=4)
+    assert cache.get("a") == {"a": 1}
+
+    cache.put("c", {"c": 1}, size=4)
+    assert cache.get("b") is None
+    assert cache.get("a") == {"a": 1}
+    assert cache.get("c") == {"c": 1}
+
+    # larger than the whole cache
+    cache.put("d", {"d": 1}, size=11)
+    assert cache.get("d") is None
+    assert len(cache) == 2
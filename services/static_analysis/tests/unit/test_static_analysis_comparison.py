@@ -14,6 +14,7 @@ from services.static_analysis import (
     _get_analysis_content_mapping,
 )
 from services.static_analysis.git_diff_parser import DiffChange, DiffChangeType
+from services.static_analysis.snapshot_cache import snapshot_cache
 
 
 def test_get_analysis_content_mapping(dbsession):
@@ -112,6 +113,32 @@ class TestStaticAnalysisComparisonService(object):
         assert sample_service._load_snapshot_data("filepath", None) is None
         assert sample_service._load_snapshot_data("filepath", "fake_location") is None
 
+    def test_prefetch_snapshots(
+        self, sample_service, mock_storage, mock_configuration, mocker
+    ):
+        mock_configuration._params["setup"]["static_analysis"] = {
+            "snapshot_cache_max_bytes": 10000
+        }
+        snapshot_cache.clear()
+        for location in ("first", "second"):
+            mock_storage.write_file(
+                "archive", location, json.dumps({"statements": [[1, {}]]})
+            )
+        read_file = mocker.spy(sample_service.archive_service, "read_file")
+
+        sample_service._prefetch_snapshots(["first", "second", None, "first", "gone"])
+        assert read_file.call_count == 3
+        assert sample_service._load_snapshot_data("filepath", "gone") is None
+        res = sample_service._load_snapshot_data("filepath", "second")
+        assert res._statement_mapping == {1: {}}
+        assert read_file.call_count == 3
+
+        # unchanged snapshots are shared across comparisons
+        sample_service._snapshots.clear()
+        sample_service._prefetch_snapshots(["first", "second"])
+        assert read_file.call_count == 3
+        snapshot_cache.clear()
+
     def test_load_snapshot_data_happy_cases(self, sample_service, mock_storage):
         mock_storage.write_file(
             "archive",
@@ -1,7 +1,12 @@
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Sequence
 
+from shared.config import get_config
 from shared.storage import get_appropriate_storage_service
 from shared.storage.base import BaseStorageService
+from shared.storage.exceptions import FileNotInStorageError
 
 log = logging.getLogger(__name__)
 
@@ -18,3 +23,56 @@ def _cached_get_storage_client() -> BaseStorageService:
         log.info("Initializing singleton storage service")
         _storage_client = get_appropriate_storage_service()
     return _storage_client
+
+
+def _reset_storage_client_after_fork() -> None:
+    # The HTTP connections pooled by the parent's client must not be shared
+    global _storage_client
+    _storage_client = None
+
+
+os.register_at_fork(after_in_child=_reset_storage_client_after_fork)
+
+
+def exists_check_concurrency() -> int:
+    return get_config("setup", "storage", "exists_check_concurrency", default=16)
+
+
+def file_exists(storage: BaseStorageService, bucket_name: str, path: str) -> bool:
+    """
+    Checks whether `path` exists, without downloading it where the storage client
+    allows for it.
+    """
+    minio_client = getattr(storage, "minio_client", None)
+    if minio_client is not None:
+        from minio.error import S3Error
+
+        try:
+            minio_client.stat_object(bucket_name, path)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchBucket"):
+                return False
+            raise
+        return True
+
+    # other backends don't expose a metadata-only call through shared
+    try:
+        storage.read_file(bucket_name, path)
+    except FileNotInStorageError:
+        return False
+    return True
+
+
+def files_exist(
+    storage: BaseStorageService, bucket_name: str, paths: Sequence[str]
+) -> list[bool]:
+    """
+    Checks whether each of `paths` exists, running the checks concurrently.
+    """
+    concurrency = min(exists_check_concurrency(), len(paths))
+    if concurrency <= 1:
+        return [file_exists(storage, bucket_name, path) for path in paths]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(
+            pool.map(lambda path: file_exists(storage, bucket_name, path), paths)
+        )
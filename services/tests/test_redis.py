@@ -1,8 +1,46 @@
-from services.redis import get_redis_connection
+import pytest
 
+from services.redis import (
+    InstrumentedConnectionPool,
+    _redis_clients,
+    _reset_redis_clients_after_fork,
+    get_redis_connection,
+)
 
-def test_get_redis_connection(mocker):
-    mocked = mocker.patch("services.redis.Redis.from_url")
+
+@pytest.fixture
+def clean_redis_clients():
+    _redis_clients.clear()
+    yield
+    _redis_clients.clear()
+
+
+def test_get_redis_connection(mocker, clean_redis_clients):
+    mocked = mocker.patch(
+        "services.redis.InstrumentedConnectionPool.from_url",
+        wraps=InstrumentedConnectionPool.from_url,
+    )
     res = get_redis_connection()
     assert res is not None
-    mocked.assert_called_with("redis://redis:6379")
+    mocked.assert_called_with(
+        "redis://redis:6379", max_connections=None, health_check_interval=30
+    )
+    assert isinstance(res.connection_pool, InstrumentedConnectionPool)
+
+
+def test_get_redis_connection_is_reused(mocker, clean_redis_clients):
+    first = get_redis_connection()
+    assert get_redis_connection() is first
+
+    _reset_redis_clients_after_fork()
+    assert get_redis_connection() is not first
+
+
+def test_get_redis_connection_pool_config(mock_configuration, clean_redis_clients):
+    mock_configuration.params["services"]["redis"] = {
+        "max_connections": 5,
+        "health_check_interval": 10,
+    }
+    res = get_redis_connection()
+    assert res.connection_pool.max_connections == 5
+    assert res.connection_pool.connection_kwargs["health_check_interval"] == 10
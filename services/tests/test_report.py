@@ -1,8 +1,10 @@
 from decimal import Decimal
 
 import mock
+import orjson
 import pytest
 from celery.exceptions import SoftTimeLimitExceeded
+from shared.reports.carryforward import generate_carryforward_report
 from shared.reports.resources import Report, ReportFile, Session, SessionType
 from shared.reports.types import ReportLine, ReportTotals
 from shared.torngit.exceptions import TorngitRateLimitError
@@ -12,8 +14,19 @@ from database.models import CommitReport, RepositoryFlag, Upload
 from database.tests.factories import CommitFactory
 from helpers.exceptions import RepositoryWithoutValidBotError
 from services.archive import ArchiveService
-from services.report import NotReadyToBuildReportYetError, ReportService
+from services.report import (
+    NotReadyToBuildReportYetError,
+    ReportService,
+    carryforward_whole_report,
+)
 from services.report import log as report_log
+from services.report.fingerprints import (
+    FILE_CHUNK_DIGESTS_HEADER_KEY,
+    FILE_FINGERPRINTS_HEADER_KEY,
+    compute_file_fingerprints,
+    get_chunk_digests,
+)
+from services.report.indexed_chunks import END_OF_HEADER
 from services.report.raw_upload_processor import (
     SessionAdjustmentResult,
     clear_carryforward_sessions,
@@ -3192,6 +3205,59 @@ class TestReportService(BaseTestCase):
         assert second_upload.upload_extras == {}
         assert second_upload.upload_type == "carriedforward"
 
+    def test_save_full_report_many_sessions(self, dbsession, mock_storage, mocker):
+        mocker.patch("services.report.SAVE_FULL_REPORT_BATCH_SIZE", 2)
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        existing_flag = RepositoryFlag(
+            repository_id=commit.repoid, flag_name="existing"
+        )
+        current_report_row = CommitReport(commit_id=commit.id_)
+        dbsession.add_all([existing_flag, current_report_row])
+        dbsession.flush()
+        # loads the (empty) collection, which has to be refreshed on save
+        assert current_report_row.uploads == []
+
+        report = Report()
+        for sessionid in range(5):
+            report.add_session(
+                Session(
+                    flags=["existing", "new"] if sessionid % 2 else ["new"],
+                    provider="circleci",
+                    session_type=SessionType.carriedforward,
+                    totals=(
+                        ReportTotals(files=1, lines=3, hits=1, coverage="33.33333")
+                        if sessionid != 4
+                        else None
+                    ),
+                )
+            )
+        report_service = ReportService({})
+        report_service.save_full_report(commit, report)
+
+        uploads = sorted(current_report_row.uploads, key=lambda u: u.order_number)
+        assert [upload.order_number for upload in uploads] == [0, 1, 2, 3, 4]
+        assert [sorted(upload.flag_names) for upload in uploads] == [
+            ["new"],
+            ["existing", "new"],
+            ["new"],
+            ["existing", "new"],
+            ["new"],
+        ]
+        assert all(upload.upload_type == "carriedforward" for upload in uploads)
+        assert all(upload.state == "complete" for upload in uploads)
+        assert len({upload.external_id for upload in uploads}) == 5
+        assert uploads[0].totals.lines == 3
+        assert uploads[0].totals.coverage == Decimal("33.33")
+        assert uploads[4].totals is None
+        assert (
+            dbsession.query(RepositoryFlag)
+            .filter_by(repository_id=commit.repoid)
+            .count()
+            == 2
+        )
+
     def test_save_report_empty_report(self, dbsession, mock_storage):
         report = Report()
         commit = CommitFactory.create()
@@ -3227,7 +3293,8 @@ class TestReportService(BaseTestCase):
         assert res["url"] in mock_storage.storage["archive"]
         assert (
             mock_storage.storage["archive"][res["url"]].decode()
-            == "{}\n<<<<< end_of_header >>>>>\n"
+            == '{"file_fingerprints":{},"file_chunk_digests":{}}'
+            "\n<<<<< end_of_header >>>>>\n"
         )
 
     def test_save_report(self, dbsession, mock_storage, sample_report):
@@ -3296,10 +3363,8 @@ class TestReportService(BaseTestCase):
             },
         }
         assert res["url"] in mock_storage.storage["archive"]
-        expected_content = "\n".join(
+        expected_body = "\n".join(
             [
-                "{}",
-                "<<<<< end_of_header >>>>>",
                 "{}",
                 "[1,null,[[0,1]],null,[10,2]]",
                 "[0,null,[[0,1]]]",
@@ -3366,6 +3431,15 @@ class TestReportService(BaseTestCase):
                 '["1/2","b",[[0,1]]]',
             ]
         )
+        expected_header = orjson.dumps(
+            {
+                FILE_FINGERPRINTS_HEADER_KEY: compute_file_fingerprints(sample_report),
+                FILE_CHUNK_DIGESTS_HEADER_KEY: get_chunk_digests(
+                    sample_report, expected_body
+                ),
+            }
+        ).decode()
+        expected_content = expected_header + END_OF_HEADER + expected_body
         assert mock_storage.storage["archive"][res["url"]].decode() == expected_content
 
     def test_save_report_file_needing_repack(
@@ -3448,10 +3522,8 @@ class TestReportService(BaseTestCase):
             },
         }
         assert res["url"] in mock_storage.storage["archive"]
-        expected_content = "\n".join(
+        expected_body = "\n".join(
             [
-                "{}",
-                "<<<<< end_of_header >>>>>",
                 "{}",
                 "[1,null,[[0,1]],null,[10,2]]",
                 "[0,null,[[0,1]]]",
@@ -3479,6 +3551,15 @@ class TestReportService(BaseTestCase):
                 "[1]",
             ]
         )
+        expected_header = orjson.dumps(
+            {
+                FILE_FINGERPRINTS_HEADER_KEY: compute_file_fingerprints(sample_report),
+                FILE_CHUNK_DIGESTS_HEADER_KEY: get_chunk_digests(
+                    sample_report, expected_body
+                ),
+            }
+        ).decode()
+        expected_content = expected_header + END_OF_HEADER + expected_body
         assert mock_storage.storage["archive"][res["url"]].decode() == expected_content
 
     def test_initialize_and_save_report_brand_new(self, dbsession, mock_storage):
@@ -4034,3 +4115,40 @@ class TestReportService(BaseTestCase):
             ReportService({})._possibly_shift_carryforward_report(
                 mock_report, parent_commit, commit
             )
+
+
+def test_carryforward_whole_report_same_as_generate_carryforward_report():
+    def build_report():
+        report = Report()
+        first_file = ReportFile("first.py")
+        first_file.append(1, ReportLine.create(coverage=1, sessions=[[0, 1]]))
+        first_file.append(2, ReportLine.create(coverage=0, sessions=[[1, 0]]))
+        second_file = ReportFile("second.py")
+        second_file.append(
+            1, ReportLine.create(coverage="1/2", sessions=[[1, "1/2"]])
+        )
+        report.append(first_file)
+        report.append(second_file)
+        report.add_session(Session(flags=["unit"]))
+        report.add_session(Session(flags=["unit", "integration"]))
+        totals, report_json = report.to_database()
+        report_json = orjson.loads(report_json)
+        return ReportService({}).build_report(
+            report.to_archive(),
+            report_json["files"],
+            report_json["sessions"],
+            totals,
+        )
+
+    session_extras = dict(carriedforward_from="parent")
+    expected = generate_carryforward_report(
+        build_report(), ["unit"], [], session_extras=session_extras
+    )
+    report = carryforward_whole_report(build_report(), session_extras)
+
+    assert report.to_archive() == expected.to_archive()
+    assert report.totals == expected.totals
+    for session in report.sessions.values():
+        assert session.session_type == SessionType.carriedforward
+        assert session.session_extras == session_extras
+
@@ -1,4 +1,9 @@
-from services.storage import get_appropriate_storage_service, get_storage_client
+from services.storage import (
+    file_exists,
+    files_exist,
+    get_appropriate_storage_service,
+    get_storage_client,
+)
 
 
 class TestStorage(object):
@@ -9,3 +14,20 @@ class TestStorage(object):
         another_one = get_appropriate_storage_service()
         assert id(first) != id(another_one)
         assert id(second) != id(another_one)
+
+    def test_files_exist(self, mock_storage, mock_configuration):
+        mock_configuration._params["setup"]["storage"] = {
+            "exists_check_concurrency": 2
+        }
+        mock_storage.write_file("bucket", "some/path.json", "content")
+        assert files_exist(
+            mock_storage, "bucket", ["some/path.json", "missing.json", "some/path.json"]
+        ) == [True, False, True]
+
+    def test_file_exists_does_not_download_from_minio(self, mocker):
+        storage = mocker.MagicMock()
+        assert file_exists(storage, "bucket", "some/path.json")
+        storage.minio_client.stat_object.assert_called_once_with(
+            "bucket", "some/path.json"
+        )
+        assert not storage.read_file.called
@@ -6,6 +6,8 @@ from shared.reports.resources import Report, ReportFile, ReportLine
 from shared.utils.sessions import Session
 from shared.yaml import UserYaml
 
+import services.timeseries
+from database.models.reports import RepositoryFlag
 from database.models.timeseries import Dataset, Measurement, MeasurementName
 from database.tests.factories import CommitFactory, RepositoryFactory
 from database.tests.factories.reports import RepositoryFlagFactory
@@ -14,9 +16,11 @@ from services.timeseries import (
     backfill_batch_size,
     delete_repository_data,
     delete_repository_measurements,
+    get_measured_paths,
     repository_commits_query,
     repository_datasets_query,
     save_commit_measurements,
+    save_commits_measurements,
 )
 
 
@@ -659,6 +663,167 @@ class TestTimeseriesService(object):
 
         assert dbsession.query(Measurement).count() == 0
 
+    def test_save_commits_measurements(
+        self, dbsession, sample_report, repository, mocker
+    ):
+        mocker.patch("services.timeseries.timeseries_enabled", return_value=True)
+        report = ReadOnlyReport.create_from_report(sample_report)
+        # reports are loaded concurrently, so the order of the calls is not known
+        get_existing_report = mocker.patch(
+            "services.report.ReportService.get_existing_report_for_commit",
+            side_effect=lambda c, **kwargs: report if c is commit else None,
+        )
+        get_repo_yaml = mocker.patch(
+            "services.timeseries.get_repo_yaml", return_value=UserYaml({})
+        )
+        upsert = mocker.spy(services.timeseries, "upsert_measurements")
+
+        commit = CommitFactory.create(branch="foo", repository=repository)
+        commit_without_report = CommitFactory.create(repository=repository)
+        dbsession.add(commit)
+        dbsession.add(commit_without_report)
+        dbsession.flush()
+
+        repository_flag1 = RepositoryFlagFactory(
+            repository=repository, flag_name="flag1"
+        )
+        dbsession.add(repository_flag1)
+        dbsession.flush()
+
+        res = save_commits_measurements(
+            repository,
+            [commit, commit_without_report],
+            [MeasurementName.coverage.value, MeasurementName.flag_coverage.value],
+        )
+        assert res == 1
+        assert get_existing_report.call_count == 2
+        get_repo_yaml.assert_called_once()
+        # everything is written with a single statement
+        upsert.assert_called_once()
+
+        measurements = {
+            (measurement.name, measurement.measurable_id): measurement.value
+            for measurement in dbsession.query(Measurement).filter_by(
+                commit_sha=commit.commitid
+            )
+        }
+        flag2 = (
+            dbsession.query(RepositoryFlag)
+            .filter_by(repository_id=repository.repoid, flag_name="flag2")
+            .one()
+        )
+        assert measurements == {
+            (MeasurementName.coverage.value, f"{repository.repoid}"): 60.0,
+            (MeasurementName.flag_coverage.value, f"{repository_flag1.id}"): 100.0,
+            (MeasurementName.flag_coverage.value, f"{flag2.id}"): 100.0,
+        }
+        assert (
+            dbsession.query(Measurement)
+            .filter_by(commit_sha=commit_without_report.commitid)
+            .count()
+            == 0
+        )
+
+    def test_save_commits_measurements_report_error(
+        self, dbsession, sample_report, repository, mocker
+    ):
+        mocker.patch("services.timeseries.timeseries_enabled", return_value=True)
+        mocker.patch(
+            "services.report.ReportService.get_existing_report_for_commit",
+            side_effect=[
+                Exception("broken"),
+                ReadOnlyReport.create_from_report(sample_report),
+            ],
+        )
+        mocker.patch(
+            "services.timeseries.backfill_report_concurrency", return_value=1
+        )
+
+        first_commit = CommitFactory.create(repository=repository)
+        second_commit = CommitFactory.create(repository=repository)
+        dbsession.add(first_commit)
+        dbsession.add(second_commit)
+        dbsession.flush()
+
+        res = save_commits_measurements(
+            repository,
+            [first_commit, second_commit],
+            [MeasurementName.coverage.value],
+        )
+        assert res == 1
+        assert [
+            measurement.commit_sha
+            for measurement in dbsession.query(Measurement).filter_by(
+                repo_id=repository.repoid
+            )
+        ] == [second_commit.commitid]
+
+    def test_get_measured_paths(self, dbsession, repository):
+        totals = [0, 1, 1, 0, 0, "100", 0, 0, 0, 0, 0, 0, 0]
+        commit = CommitFactory.create(
+            repository=repository,
+            _report_json={
+                "sessions": {},
+                "files": {
+                    "file_1.go": [0, totals, None],
+                    "file_2.py": [1, totals, None],
+                    "folder/file_3.py": [2, totals, None],
+                },
+            },
+        )
+        dbsession.add(commit)
+        dbsession.flush()
+
+        components = UserYaml(
+            {
+                "component_management": {
+                    "individual_components": [
+                        {"component_id": "go_files", "paths": [r".*\.go"]},
+                        {
+                            "component_id": "folder",
+                            "paths": [r"folder/.*"],
+                            "flag_regexes": [r"unit"],
+                        },
+                        {"component_id": "not_measured"},
+                    ]
+                }
+            }
+        ).get_components()
+
+        assert (
+            get_measured_paths(commit, [MeasurementName.coverage.value], None) == set()
+        )
+        assert get_measured_paths(
+            commit, [MeasurementName.component_coverage.value], components
+        ) == {"file_1.go", "folder/file_3.py"}
+        assert (
+            get_measured_paths(
+                commit,
+                [
+                    MeasurementName.component_coverage.value,
+                    MeasurementName.flag_coverage.value,
+                ],
+                components,
+            )
+            is None
+        )
+
+        flags_only = UserYaml(
+            {
+                "component_management": {
+                    "individual_components": [
+                        {"component_id": "unit", "flag_regexes": [r"unit"]}
+                    ]
+                }
+            }
+        ).get_components()
+        assert (
+            get_measured_paths(
+                commit, [MeasurementName.component_coverage.value], flags_only
+            )
+            is None
+        )
+
     def test_repository_commits_query(self, dbsession, repository, mocker):
         commit1 = CommitFactory.create(
             repository=repository,
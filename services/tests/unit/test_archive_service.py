@@ -1,9 +1,13 @@
+import gzip
 import json
 
+import orjson
+from shared.reports.types import ReportTotals
 from shared.storage import MinioStorageService
+from shared.utils.ReportEncoder import ReportEncoder
 
 from database.tests.factories import RepositoryFactory
-from services.archive import ArchiveService
+from services.archive import ArchiveService, dump_json, encoded_size, gzip_text
 from test_utils.base import BaseTestCase
 
 
@@ -74,7 +78,7 @@ class TestWriteJsonData(BaseTestCase):
         mock_write_file.assert_called_with(
             archive_service.root,
             path,
-            json.dumps(data),
+            orjson.dumps(data),
             is_already_gzipped=False,
             reduced_redundancy=False,
         )
@@ -116,7 +120,48 @@ class TestWriteJsonData(BaseTestCase):
         mock_write_file.assert_called_with(
             archive_service.root,
             path,
-            json.dumps(data),
+            orjson.dumps(data),
             is_already_gzipped=False,
             reduced_redundancy=False,
         )
+
+
+def test_gzip_text():
+    text = "some chunks ✓\n" * 1000
+    assert gzip.decompress(gzip_text(text, slice_size=7)) == text.encode()
+    assert gzip.decompress(gzip_text("")) == b""
+    assert gzip.decompress(gzip_text("header", "\n", text, slice_size=7)) == (
+        "header\n" + text
+    ).encode()
+
+
+def test_encoded_size():
+    assert encoded_size("some chunks\n" * 1000) == 12000
+    text = "some chunks ✓\n" * 1000
+    assert encoded_size(text, slice_size=7) == len(text.encode())
+    assert encoded_size("") == 0
+    assert encoded_size("header\n", text) == len(("header\n" + text).encode())
+
+
+def test_dump_json_matches_encoder():
+    data = {
+        "totals": ReportTotals(files=1, lines=10, hits=5),
+        1: ["a", None, 1.5],
+    }
+    assert orjson.loads(dump_json(data)) == json.loads(
+        json.dumps(data, cls=ReportEncoder)
+    )
+
+
+def test_write_chunks_compresses_text(mocker, dbsession):
+    repo = RepositoryFactory()
+    dbsession.add(repo)
+    dbsession.flush()
+    mock_write_file = mocker.patch.object(MinioStorageService, "write_file")
+    archive_service = ArchiveService(repository=repo)
+
+    path = archive_service.write_chunks("some-commit-sha", "some chunks")
+    _, args, kwargs = mock_write_file.mock_calls[0]
+    assert args[1] == path
+    assert gzip.decompress(args[2]) == b"some chunks"
+    assert kwargs["is_already_gzipped"] is True
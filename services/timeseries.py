@@ -1,6 +1,7 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Iterable, Mapping, Optional
+from typing import Any, Iterable, Mapping, Optional, Sequence
 
 from shared.components import Component
 from shared.reports.readonly import ReadOnlyReport
@@ -10,8 +11,14 @@ from sqlalchemy.orm import Session
 from database.models import Commit, Dataset, Measurement, MeasurementName
 from database.models.core import Repository
 from database.models.reports import RepositoryFlag
-from helpers.timeseries import backfill_max_batch_size, timeseries_enabled
+from helpers.match import Matcher
+from helpers.timeseries import (
+    backfill_max_batch_size,
+    backfill_report_concurrency,
+    timeseries_enabled,
+)
 from services.report import ReportService
+from services.report.component_totals import get_components_totals
 from services.yaml import get_repo_yaml
 
 log = logging.getLogger(__name__)
@@ -32,8 +39,13 @@ def save_commit_measurements(
 
     current_yaml = get_repo_yaml(commit.repository)
     report_service = ReportService(current_yaml)
+    components = None
+    if MeasurementName.component_coverage.value in dataset_names:
+        components = current_yaml.get_components()
     report = report_service.get_existing_report_for_commit(
-        commit, report_class=ReadOnlyReport
+        commit,
+        report_class=ReadOnlyReport,
+        paths=get_measured_paths(commit, dataset_names, components),
     )
 
     if report is None:
@@ -43,54 +55,157 @@ def save_commit_measurements(
 
     maybe_upsert_coverage_measurement(commit, dataset_names, db_session, report)
     maybe_upsert_components_measurements(
-        commit, current_yaml, dataset_names, db_session, report
+        commit, components, dataset_names, db_session, report
     )
     maybe_upsert_flag_measurements(commit, dataset_names, db_session, report)
 
 
+def save_commits_measurements(
+    repository: Repository,
+    commits: Sequence[Commit],
+    dataset_names: Iterable[str] = None,
+) -> int:
+    """
+    Saves the measurements of a batch of `commits`, all belonging to `repository`.
+
+    The yaml, datasets and flag ids of the repository are only fetched once,
+    the reports are downloaded concurrently, and all the measurements of the batch
+    are written with a single upsert.
+    Returns the number of commits that had a report to take measurements from.
+    """
+    if not timeseries_enabled():
+        return 0
+
+    if dataset_names is None:
+        dataset_names = [
+            dataset.name for dataset in repository_datasets_query(repository)
+        ]
+    if len(dataset_names) == 0 or len(commits) == 0:
+        return 0
+
+    current_yaml = get_repo_yaml(repository)
+    report_service = ReportService(current_yaml)
+    db_session = repository.get_db_session()
+
+    components = None
+    if MeasurementName.component_coverage.value in dataset_names:
+        components = current_yaml.get_components()
+    flag_ids = None
+    if MeasurementName.flag_coverage.value in dataset_names:
+        flag_ids = dict(repository_flag_ids(repository))
+
+    measurements = {}
+    measured_commits = 0
+    reports = load_commit_reports(report_service, commits, dataset_names, components)
+    for commit, report in zip(commits, reports):
+        if report is None:
+            continue
+        measured_commits += 1
+
+        commit_measurements = []
+        if MeasurementName.coverage.value in dataset_names:
+            commit_measurements += coverage_measurements(commit, report)
+        if components:
+            commit_measurements += component_measurements(commit, components, report)
+        if flag_ids is not None:
+            commit_measurements += flag_measurements(
+                commit, db_session, report, flag_ids
+            )
+
+        for measurement in commit_measurements:
+            # the upsert can't touch the same row twice
+            measurements[get_measurement_key(measurement)] = measurement
+
+    if len(measurements) > 0:
+        upsert_measurements(db_session, list(measurements.values()))
+        log.info(
+            "Upserted batch of commit measurements",
+            extra=dict(
+                repoid=repository.repoid,
+                commit_count=measured_commits,
+                count=len(measurements),
+            ),
+        )
+
+    return measured_commits
+
+
+def get_measured_paths(
+    commit: Commit,
+    dataset_names: Iterable[str],
+    components: Sequence[Component] | None,
+) -> set[str] | None:
+    """
+    Returns the files of the report of `commit` that its measurements in
+    `dataset_names` depend on, or `None` when they depend on all of them.
+
+    The coverage measurement only needs the totals of the whole report, and the
+    totals of a component only depend on the files matching its paths.
+    Flag measurements need all the files.
+    """
+    if MeasurementName.flag_coverage.value in dataset_names:
+        return None
+
+    matchers = []
+    for component in components or []:
+        if not (component.paths or component.flag_regexes):
+            # not measured
+            continue
+        if not component.paths:
+            return None
+        matchers.append(Matcher(component.paths))
+    return {
+        path
+        for path in commit.report_json.get("files", {})
+        if any(matcher.match(path) for matcher in matchers)
+    }
+
+
+def load_commit_reports(
+    report_service: ReportService,
+    commits: Sequence[Commit],
+    dataset_names: Iterable[str],
+    components: Sequence[Component] | None,
+) -> list[ReadOnlyReport | None]:
+    """
+    Downloads the reports of `commits` using a bounded pool of threads.
+
+    Only the files the measurements in `dataset_names` depend on are loaded.
+    A commit whose report fails to load gets `None`, same as one without a report.
+    """
+
+    def load_report(commit: Commit) -> ReadOnlyReport | None:
+        try:
+            return report_service.get_existing_report_for_commit(
+                commit,
+                report_class=ReadOnlyReport,
+                paths=get_measured_paths(commit, dataset_names, components),
+            )
+        except Exception:
+            log.exception(
+                "Failed to load report for commit measurements",
+                extra=dict(repoid=commit.repoid, commit=commit.commitid),
+            )
+            return None
+
+    concurrency = min(backfill_report_concurrency(), len(commits))
+    if concurrency <= 1:
+        return [load_report(commit) for commit in commits]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(load_report, commits))
+
+
 def maybe_upsert_coverage_measurement(commit, dataset_names, db_session, report):
     if MeasurementName.coverage.value in dataset_names:
-        if report.totals.coverage is not None:
-            measurements = [
-                create_measurement_dict(
-                    MeasurementName.coverage.value,
-                    commit,
-                    measurable_id=f"{commit.repoid}",
-                    value=float(report.totals.coverage),
-                )
-            ]
+        measurements = coverage_measurements(commit, report)
+        if len(measurements) > 0:
             upsert_measurements(db_session, measurements)
 
 
 def maybe_upsert_flag_measurements(commit, dataset_names, db_session, report):
     if MeasurementName.flag_coverage.value in dataset_names:
         flag_ids = repository_flag_ids(commit.repository)
-        measurements = []
-
-        for flag_name, flag in report.flags.items():
-            if flag.totals.coverage is not None:
-                flag_id = flag_ids.get(flag_name)
-                if not flag_id:
-                    log.warning(
-                        "Repository flag not found.  Created repository flag.",
-                        extra=dict(repoid=commit.repoid, flag_name=flag_name),
-                    )
-                    repo_flag = RepositoryFlag(
-                        repository_id=commit.repoid,
-                        flag_name=flag_name,
-                    )
-                    db_session.add(repo_flag)
-                    db_session.flush()
-                    flag_id = repo_flag.id
-
-                measurements.append(
-                    create_measurement_dict(
-                        MeasurementName.flag_coverage.value,
-                        commit,
-                        measurable_id=f"{flag_id}",
-                        value=float(flag.totals.coverage),
-                    )
-                )
+        measurements = flag_measurements(commit, db_session, report, flag_ids)
 
         if len(measurements) > 0:
             log.info(
@@ -105,55 +220,11 @@ def maybe_upsert_flag_measurements(commit, dataset_names, db_session, report):
 
 
 def maybe_upsert_components_measurements(
-    commit, current_yaml, dataset_names, db_session, report
+    commit, components, dataset_names, db_session, report
 ):
     if MeasurementName.component_coverage.value in dataset_names:
-        components = current_yaml.get_components()
         if components:
-            component_measurements = dict()
-
-            for component in components:
-                if component.paths or component.flag_regexes:
-                    report_and_component_matching_flags = component.get_matching_flags(
-                        report.flags.keys()
-                    )
-                    filtered_report = report.filter(
-                        flags=report_and_component_matching_flags, paths=component.paths
-                    )
-                    if filtered_report.totals.coverage is not None:
-                        # This measurement key is being used to check for measurement existence and log the warning.
-                        # TODO: see if we can remove this warning message as it's necessary to emit this warning.
-                        # We're currently not doing anything with this information.
-                        measurement_key = create_component_measurement_key(
-                            commit, component
-                        )
-                        if (
-                            existing_measurement := component_measurements.get(
-                                measurement_key
-                            )
-                        ) is not None:
-                            log.warning(
-                                "Duplicate measurement keys being added to measurements",
-                                extra=dict(
-                                    repoid=commit.repoid,
-                                    commit_id=commit.id_,
-                                    commitid=commit.commitid,
-                                    measurement_key=measurement_key,
-                                    existing_value=existing_measurement.get("value"),
-                                    new_value=float(filtered_report.totals.coverage),
-                                ),
-                            )
-
-                        component_measurements[measurement_key] = (
-                            create_measurement_dict(
-                                MeasurementName.component_coverage.value,
-                                commit,
-                                measurable_id=f"{component.component_id}",
-                                value=float(filtered_report.totals.coverage),
-                            )
-                        )
-
-            measurements = list(component_measurements.values())
+            measurements = component_measurements(commit, components, report)
             if len(measurements) > 0:
                 upsert_measurements(db_session, measurements)
                 log.info(
@@ -166,6 +237,97 @@ def maybe_upsert_components_measurements(
                 )
 
 
+def coverage_measurements(commit: Commit, report) -> list[dict[str, Any]]:
+    if report.totals.coverage is None:
+        return []
+    return [
+        create_measurement_dict(
+            MeasurementName.coverage.value,
+            commit,
+            measurable_id=f"{commit.repoid}",
+            value=float(report.totals.coverage),
+        )
+    ]
+
+
+def flag_measurements(
+    commit: Commit, db_session: Session, report, flag_ids: dict[str, int]
+) -> list[dict[str, Any]]:
+    """
+    Returns the flag coverage measurements of `report`.
+
+    Repository flags missing from `flag_ids` are created, and added to `flag_ids`
+    so that later commits of the same batch reuse them.
+    """
+    measurements = []
+    for flag_name, flag in report.flags.items():
+        if flag.totals.coverage is not None:
+            flag_id = flag_ids.get(flag_name)
+            if not flag_id:
+                log.warning(
+                    "Repository flag not found.  Created repository flag.",
+                    extra=dict(repoid=commit.repoid, flag_name=flag_name),
+                )
+                repo_flag = RepositoryFlag(
+                    repository_id=commit.repoid,
+                    flag_name=flag_name,
+                )
+                db_session.add(repo_flag)
+                db_session.flush()
+                flag_id = repo_flag.id
+                flag_ids[flag_name] = flag_id
+
+            measurements.append(
+                create_measurement_dict(
+                    MeasurementName.flag_coverage.value,
+                    commit,
+                    measurable_id=f"{flag_id}",
+                    value=float(flag.totals.coverage),
+                )
+            )
+    return measurements
+
+
+def component_measurements(
+    commit: Commit, components: Iterable[Component], report
+) -> list[dict[str, Any]]:
+    measurements = dict()
+
+    components = [
+        component
+        for component in components
+        if component.paths or component.flag_regexes
+    ]
+    components_totals = get_components_totals(report, components)
+    for component, totals in zip(components, components_totals):
+        if totals.coverage is not None:
+            # This measurement key is being used to check for measurement existence and log the warning.
+            # TODO: see if we can remove this warning message as it's necessary to emit this warning.
+            # We're currently not doing anything with this information.
+            measurement_key = create_component_measurement_key(commit, component)
+            if (existing_measurement := measurements.get(measurement_key)) is not None:
+                log.warning(
+                    "Duplicate measurement keys being added to measurements",
+                    extra=dict(
+                        repoid=commit.repoid,
+                        commit_id=commit.id_,
+                        commitid=commit.commitid,
+                        measurement_key=measurement_key,
+                        existing_value=existing_measurement.get("value"),
+                        new_value=float(totals.coverage),
+                    ),
+                )
+
+            measurements[measurement_key] = create_measurement_dict(
+                MeasurementName.component_coverage.value,
+                commit,
+                measurable_id=f"{component.component_id}",
+                value=float(totals.coverage),
+            )
+
+    return list(measurements.values())
+
+
 def create_measurement_dict(
     name: str, commit: Commit, measurable_id: str, value: float
 ) -> dict[str, Any]:
@@ -192,6 +354,20 @@ def create_component_measurement_key(commit: Commit, component: Component) -> tu
     )
 
 
+def get_measurement_key(measurement: dict[str, Any]) -> tuple:
+    """
+    The columns identifying a measurement row, as used by `upsert_measurements`.
+    """
+    return (
+        measurement["name"],
+        measurement["owner_id"],
+        measurement["repo_id"],
+        measurement["measurable_id"],
+        measurement["commit_sha"],
+        measurement["timestamp"],
+    )
+
+
 def upsert_measurements(
     db_session: Session, measurements: list[dict[str, Any]]
 ) -> None:
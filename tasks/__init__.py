@@ -41,6 +41,7 @@ from tasks.profiling_normalizer import profiling_normalizer_task
 from tasks.save_commit_measurements import save_commit_measurements_task
 from tasks.save_report_results import save_report_results_task
 from tasks.send_email import send_email
+from tasks.shadow_changes_comparison import shadow_changes_comparison_task
 from tasks.static_analysis_suite_check import static_analysis_suite_check_task
 from tasks.status_set_error import status_set_error_task
 from tasks.status_set_pending import status_set_pending_task
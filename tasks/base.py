@@ -1,4 +1,6 @@
 import logging
+import os
+from contextlib import nullcontext
 from datetime import datetime
 
 import sentry_sdk
@@ -20,8 +22,8 @@ from celery_task_router import _get_user_plan_from_task
 from database.engine import get_db_session
 from helpers.checkpoint_logger import from_kwargs as load_checkpoints_from_kwargs
 from helpers.checkpoint_logger.flows import TestResultsFlow, UploadFlow
-from helpers.log_context import LogContext, set_log_context
-from helpers.telemetry import TimeseriesTimer, log_simple_metric
+from helpers.log_context import LogContext, get_log_context, set_log_context
+from helpers.telemetry import TimeseriesTimer, log_simple_metric, telemetry_sink
 from helpers.timeseries import timeseries_enabled
 
 log = logging.getLogger("worker")
@@ -38,6 +40,17 @@ REQUEST_HARD_TIMEOUT_COUNTER = Counter(
 )
 
 
+_first_task_pending = True
+
+
+def _reset_first_task_after_fork() -> None:
+    global _first_task_pending
+    _first_task_pending = True
+
+
+os.register_at_fork(after_in_child=_reset_first_task_after_fork)
+
+
 class BaseCodecovRequest(Request):
     @property
     def metrics_prefix(self):
@@ -88,6 +101,12 @@ TASK_CORE_RUNTIME = Histogram(
     ["task"],
     buckets=[0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 180, 300, 600, 900],
 )
+TASK_FIRST_RUN_FULL_RUNTIME = Histogram(
+    "worker_task_timers_first_run_full_runtime_seconds",
+    "Total runtime in seconds of the first task run by each worker process, which also pays for any setup the warm start did not do",
+    ["task"],
+    buckets=[0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 180, 300, 600, 900],
+)
 TASK_TIME_IN_QUEUE = Histogram(
     "worker_tasks_timers_time_in_queue_seconds",
     "Time in {TODO} spent waiting in the queue before being run",
@@ -167,6 +186,10 @@ class BaseCodecovTask(celery_app.Task):
             **opt_headers,
             "created_timestamp": current_time.isoformat(),
         }
+        # Pass the log context resolved by the current task, so the child task
+        # doesn't need to query it again if it is about the same repo/commit
+        if log_context_header := get_log_context().as_task_header():
+            headers.setdefault("log_context", log_context_header)
         return super().apply_async(args=args, kwargs=kwargs, headers=headers, **options)
 
     def _commit_django(self):
@@ -263,7 +286,13 @@ class BaseCodecovTask(celery_app.Task):
             time_in_queue_timer.observe(delta.total_seconds())
 
     def run(self, *args, **kwargs):
-        with self.task_full_runtime.time():  # Timer isn't tested
+        global _first_task_pending
+        first_run_timer = nullcontext()
+        if _first_task_pending:
+            _first_task_pending = False
+            first_run_timer = TASK_FIRST_RUN_FULL_RUNTIME.labels(task=self.name).time()
+
+        with self.task_full_runtime.time(), first_run_timer:  # Timers aren't tested
             db_session = get_db_session()
 
             log_context = LogContext(
@@ -276,6 +305,9 @@ class BaseCodecovTask(celery_app.Task):
             if task and task.request:
                 log_context.task_name = task.name
                 log_context.task_id = task.request.id
+                log_context.populate_from_task_header(
+                    task.request.get("log_context", None)
+                )
 
             log_context.populate_from_sqlalchemy(db_session)
             set_log_context(log_context)
@@ -308,6 +340,7 @@ class BaseCodecovTask(celery_app.Task):
                     TestResultsFlow.log(TestResultsFlow.UNCAUGHT_RETRY_EXCEPTION)
             finally:
                 self.wrap_up_dbsession(db_session)
+                telemetry_sink.flush_if_due()
                 self._commit_django()
 
     def wrap_up_dbsession(self, db_session):
@@ -17,7 +17,14 @@ from database.models.reports import ReportLevelTotals, RepositoryFlag
 from helpers.comparison import minimal_totals
 from helpers.github_installation import get_installation_name_for_owner_for_task
 from services.archive import ArchiveService
-from services.comparison import ComparisonContext, ComparisonProxy, FilteredComparison
+from services.comparison import (
+    ComparisonContext,
+    ComparisonProxy,
+    FilteredComparison,
+    get_compared_report_versions,
+    record_stored_totals_versions,
+    should_reuse_stored_totals,
+)
 from services.comparison.types import Comparison, FullCommit
 from services.report import ReportService
 from services.yaml import get_current_yaml, get_repo_yaml
@@ -58,6 +65,12 @@ class ComputeComparisonTask(BaseCodecovTask, name=compute_comparison_task_name):
         comparison_proxy = self.get_comparison_proxy(
             comparison, current_yaml, installation_name_to_use
         )
+        report_versions = None
+        if should_reuse_stored_totals():
+            # the versions of the reports that the comparison is computed from
+            report_versions = get_compared_report_versions(
+                comparison.base_commit, comparison.compare_commit
+            )
         if not comparison_proxy.has_head_report():
             comparison.error = CompareCommitError.missing_head_report.value
             comparison.state = CompareCommitState.error.value
@@ -105,6 +118,9 @@ class ComputeComparisonTask(BaseCodecovTask, name=compute_comparison_task_name):
         db_session.commit()
         self.compute_component_comparisons(db_session, comparison, comparison_proxy)
         db_session.commit()
+        if report_versions is not None:
+            # recorded once all the totals are committed, for notifications to reuse
+            record_stored_totals_versions(comparison.id, report_versions)
 
         return {"successful": True}
 
@@ -1,8 +1,11 @@
 import logging
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from typing import Optional
 
 import sentry_sdk
+from celery.exceptions import SoftTimeLimitExceeded
+from shared.config import get_config
 
 from app import celery_app
 from database.engine import Session
@@ -35,6 +38,20 @@ from tasks.base import BaseCodecovTask
 log = logging.getLogger(__name__)
 
 
+def flush_max_retries() -> int:
+    # every attempt deletes at least a chunk of commits, so a repo with many
+    # commits can take many of them
+    return get_config("setup", "flush_repo", "max_retries", default=100)
+
+
+def flush_batch_size() -> int:
+    return get_config("setup", "flush_repo", "batch_size", default=1000)
+
+
+def archive_delete_concurrency() -> int:
+    return get_config("setup", "flush_repo", "archive_delete_concurrency", default=4)
+
+
 @dataclass
 class FlushRepoTaskReturnType(object):
     error: Optional[str] = None
@@ -44,16 +61,59 @@ class FlushRepoTaskReturnType(object):
     deleted_archives_count: int = 0
 
 
+@dataclass
+class FlushRepoCheckpoint(object):
+    """
+    The progress of a flush, passed on to the retries of the task so they
+    continue where the previous attempt stopped.
+
+    All the commits up to `last_commit_id` are deleted along with everything
+    depending on them, and all those deletions are committed.
+
+    Archive files that were deleted are not listed anymore, so the archive
+    deletion resumes by itself, and only its count is carried over.
+    """
+
+    last_commit_id: int = 0
+    deleted_commits_count: int = 0
+    deleted_archives_count: int = 0
+
+
 class FlushRepoTask(BaseCodecovTask, name="app.tasks.flush_repo.FlushRepo"):
-    @sentry_sdk.trace
-    def _delete_archive(self, repo: Repository) -> int:
+    """
+    Deletes all the contents of a repository, but not the repository itself.
+
+    Commits are deleted in chunks of `setup.flush_repo.batch_size`, in order of
+    their ids, together with everything depending on them, and each chunk is
+    committed on its own. This keeps the transactions (and locks) short, and lets
+    a task that ran out of time retry from its last committed chunk.
+
+    The archive files of the repository are listed and deleted in parallel to
+    that, in batches spread over `setup.flush_repo.archive_delete_concurrency`
+    threads.
+    """
+
+    def _delete_archives(
+        self,
+        pool: ThreadPoolExecutor,
+        repo: Repository,
+        batch_size: int,
+        futures: list[Future],
+    ) -> None:
+        """
+        Lists all the archive files of `repo`, and submits their deletion to `pool`
+        in batches of `batch_size` files, appending the submitted deletions to
+        `futures` as it goes.
+        """
         archive_service = ArchiveService(repo)
-        deleted_archives = archive_service.delete_repo_files()
-        log.info(
-            "Deleted archives from storage",
-            extra=dict(repoid=repo.repoid, deleted_archives_count=deleted_archives),
-        )
-        return deleted_archives
+        batch = []
+        for path in archive_service.list_repo_files():
+            batch.append(path)
+            if len(batch) >= batch_size:
+                futures.append(pool.submit(archive_service.delete_files, batch))
+                batch = []
+        if batch:
+            futures.append(pool.submit(archive_service.delete_files, batch))
 
     @sentry_sdk.trace
     def _delete_comparisons(self, db_session: Session, commit_ids, repoid: int) -> None:
@@ -64,13 +124,10 @@ class FlushRepoTask(BaseCodecovTask, name="app.tasks.flush_repo.FlushRepo"):
         db_session.query(CompareFlag).filter(
             CompareFlag.commit_comparison_id.in_(commit_comparison_ids)
         ).delete(synchronize_session=False)
-        db_session.commit()
         db_session.query(CompareCommit).filter(
             CompareCommit.base_commit_id.in_(commit_ids)
             | CompareCommit.compare_commit_id.in_(commit_ids)
         ).delete(synchronize_session=False)
-        db_session.commit()
-        log.info("Deleted comparisons", extra=dict(repoid=repoid))
 
     @sentry_sdk.trace
     def _delete_reports(self, db_session: Session, report_ids, repoid: int):
@@ -83,8 +140,6 @@ class FlushRepoTask(BaseCodecovTask, name="app.tasks.flush_repo.FlushRepo"):
         db_session.query(ReportResults).filter(
             ReportResults.report_id.in_(report_ids)
         ).delete(synchronize_session=False)
-        db_session.commit()
-        log.info("Deleted reports", extra=dict(repoid=repoid))
 
     @sentry_sdk.trace
     def _delete_uploads(self, db_session: Session, report_ids, repoid: int):
@@ -104,30 +159,33 @@ class FlushRepoTask(BaseCodecovTask, name="app.tasks.flush_repo.FlushRepo"):
         db_session.query(Upload).filter(Upload.report_id.in_(report_ids)).delete(
             synchronize_session=False
         )
-        db_session.commit()
-        log.info("Deleted uploads", extra=dict(repoid=repoid))
 
     @sentry_sdk.trace
     def _delete_commit_details(self, db_session: Session, commit_ids, repoid: int):
         db_session.query(CommitReport).filter(
             CommitReport.commit_id.in_(commit_ids)
         ).delete(synchronize_session=False)
-        db_session.query(RepositoryFlag).filter_by(repository_id=repoid).delete()
-        db_session.commit()
         db_session.query(CommitError).filter(
             CommitError.commit_id.in_(commit_ids)
         ).delete(synchronize_session=False)
         db_session.query(CommitNotification).filter(
             CommitNotification.commit_id.in_(commit_ids)
         ).delete(synchronize_session=False)
-        db_session.commit()
-        log.info("Deleted commit details", extra=dict(repoid=repoid))
 
     @sentry_sdk.trace
     def _delete_static_analysis(self, db_session: Session, commit_ids, repoid: int):
+        suite_ids = db_session.query(StaticAnalysisSuite.id_).filter(
+            StaticAnalysisSuite.commit_id.in_(commit_ids)
+        )
+        db_session.query(StaticAnalysisSuiteFilepath).filter(
+            StaticAnalysisSuiteFilepath.analysis_suite_id.in_(suite_ids)
+        ).delete(synchronize_session=False)
         db_session.query(StaticAnalysisSuite).filter(
             StaticAnalysisSuite.commit_id.in_(commit_ids)
         ).delete(synchronize_session=False)
+
+    @sentry_sdk.trace
+    def _delete_static_analysis_snapshots(self, db_session: Session, repoid: int):
         snapshot_ids = db_session.query(StaticAnalysisSingleFileSnapshot.id_).filter_by(
             repository_id=repoid
         )
@@ -150,18 +208,67 @@ class FlushRepoTask(BaseCodecovTask, name="app.tasks.flush_repo.FlushRepo"):
         log.info("Deleted label analysis info", extra=dict(repoid=repoid))
 
     @sentry_sdk.trace
-    def _delete_commits(self, db_session: Session, repoid: int) -> int:
-        delete_count = (
-            db_session.query(Commit)
-            .filter_by(repoid=repoid)
-            .delete(synchronize_session=False)
+    def _delete_commits_chunk(
+        self, db_session: Session, repoid: int, last_commit_id: int, batch_size: int
+    ) -> list[int]:
+        """
+        Deletes the next `batch_size` commits after `last_commit_id`, together
+        with everything depending on them, and commits that.
+
+        Returns the ids of the deleted commits.
+        """
+        commit_ids = [
+            commit_id
+            for (commit_id,) in db_session.query(Commit.id_)
+            .filter(Commit.repoid == repoid, Commit.id_ > last_commit_id)
+            .order_by(Commit.id_)
+            .limit(batch_size)
+        ]
+        if not commit_ids:
+            return commit_ids
+
+        self._delete_comparisons(db_session, commit_ids, repoid)
+
+        report_ids = db_session.query(CommitReport.id_).filter(
+            CommitReport.commit_id.in_(commit_ids)
+        )
+        self._delete_reports(db_session, report_ids, repoid)
+        self._delete_uploads(db_session, report_ids, repoid)
+
+        self._delete_commit_details(db_session, commit_ids, repoid)
+
+        # TODO: Component comparison
+
+        self._delete_static_analysis(db_session, commit_ids, repoid)
+
+        db_session.query(Commit).filter(Commit.id_.in_(commit_ids)).delete(
+            synchronize_session=False
         )
         db_session.commit()
+        return commit_ids
+
+    @sentry_sdk.trace
+    def _delete_commits(
+        self, db_session: Session, repoid: int, checkpoint: FlushRepoCheckpoint
+    ) -> int:
+        batch_size = flush_batch_size()
+        while commit_ids := self._delete_commits_chunk(
+            db_session, repoid, checkpoint.last_commit_id, batch_size
+        ):
+            checkpoint.last_commit_id = commit_ids[-1]
+            checkpoint.deleted_commits_count += len(commit_ids)
 
         log.info(
-            "Deleted commits", extra=dict(repoid=repoid, deleted_count=delete_count)
+            "Deleted commits",
+            extra=dict(repoid=repoid, deleted_count=checkpoint.deleted_commits_count),
         )
-        return delete_count
+        return checkpoint.deleted_commits_count
+
+    @sentry_sdk.trace
+    def _delete_repository_flags(self, db_session: Session, repoid: int) -> None:
+        db_session.query(RepositoryFlag).filter_by(repository_id=repoid).delete()
+        db_session.commit()
+        log.info("Deleted repository flags", extra=dict(repoid=repoid))
 
     @sentry_sdk.trace
     def _delete_branches(self, db_session: Session, repoid: int) -> int:
@@ -179,7 +286,12 @@ class FlushRepoTask(BaseCodecovTask, name="app.tasks.flush_repo.FlushRepo"):
 
     @sentry_sdk.trace
     def run_impl(
-        self, db_session: Session, *, repoid: int, **kwargs
+        self,
+        db_session: Session,
+        *,
+        repoid: int,
+        checkpoint: dict | None = None,
+        **kwargs,
     ) -> FlushRepoTaskReturnType:
         log.info("Deleting repo contents", extra=dict(repoid=repoid))
         repo = db_session.query(Repository).filter_by(repoid=repoid).first()
@@ -187,29 +299,63 @@ class FlushRepoTask(BaseCodecovTask, name="app.tasks.flush_repo.FlushRepo"):
             log.exception("Repo not found", extra=dict(repoid=repoid))
             return FlushRepoTaskReturnType(error="repo not found")
 
-        deleted_archives = self._delete_archive(repo)
-        commit_ids = db_session.query(Commit.id_).filter_by(repoid=repo.repoid)
-        self._delete_comparisons(db_session, commit_ids, repoid)
+        progress = FlushRepoCheckpoint(**(checkpoint or {}))
+        if checkpoint:
+            log.info(
+                "Resuming repo flush", extra=dict(repoid=repoid, checkpoint=checkpoint)
+            )
 
-        report_ids = db_session.query(CommitReport.id_).filter(
-            CommitReport.commit_id.in_(commit_ids)
-        )
-        self._delete_reports(db_session, report_ids, repoid)
-        self._delete_uploads(db_session, report_ids, repoid)
+        # the listing runs in the pool as well, submitting the deletions to it
+        pool = ThreadPoolExecutor(max_workers=archive_delete_concurrency() + 1)
+        archive_futures: list[Future] = []
+        counted_archive_futures = 0
+        try:
+            listing = pool.submit(
+                self._delete_archives, pool, repo, flush_batch_size(), archive_futures
+            )
+            self._delete_commits(db_session, repoid, progress)
+            self._delete_repository_flags(db_session, repoid)
+            self._delete_static_analysis_snapshots(db_session, repoid)
+            deleted_branches = self._delete_branches(db_session, repoid)
+            deleted_pulls = self._delete_pulls(db_session, repoid)
 
-        self._delete_commit_details(db_session, commit_ids, repoid)
-
-        # TODO: Component comparison
-
-        self._delete_static_analysis(db_session, commit_ids, repoid)
+            listing.result()
+            for future in archive_futures:
+                progress.deleted_archives_count += len(future.result())
+                counted_archive_futures += 1
+        except SoftTimeLimitExceeded:
+            db_session.rollback()
+            # the running deletions are waited for, as the files they delete won't
+            # be listed by the retry, and would otherwise never be counted
+            pool.shutdown(wait=True, cancel_futures=True)
+            progress.deleted_archives_count += sum(
+                len(future.result())
+                for future in archive_futures[counted_archive_futures:]
+                if future.done()
+                and not future.cancelled()
+                and future.exception() is None
+            )
+            log.warning(
+                "Ran out of time flushing repo, retrying from checkpoint",
+                extra=dict(repoid=repoid, checkpoint=asdict(progress)),
+            )
+            self.retry(
+                max_retries=flush_max_retries(),
+                kwargs={**kwargs, "repoid": repoid, "checkpoint": asdict(progress)},
+            )
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
-        deleted_commits = self._delete_commits(db_session, repoid)
-        deleted_branches = self._delete_branches(db_session, repoid)
-        deleted_pulls = self._delete_pulls(db_session, repoid)
+        log.info(
+            "Deleted archives from storage",
+            extra=dict(
+                repoid=repoid, deleted_archives_count=progress.deleted_archives_count
+            ),
+        )
         repo.yaml = None
         return FlushRepoTaskReturnType(
-            deleted_archives_count=deleted_archives,
-            deleted_commits_count=deleted_commits,
+            deleted_archives_count=progress.deleted_archives_count,
+            deleted_commits_count=progress.deleted_commits_count,
             delete_branches_count=deleted_branches,
             deleted_pulls_count=deleted_pulls,
         )
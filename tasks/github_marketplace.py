@@ -5,6 +5,7 @@ import requests
 from shared.celery_config import ghm_sync_plans_task_name
 
 from app import celery_app
+from celery_task_router import invalidate_owner_plan
 from database.models import Owner, Repository
 from services.billing import BillingPlan
 from services.github_marketplace import GitHubMarketplaceService
@@ -212,6 +213,10 @@ class SyncPlansTask(BaseCodecovTask, name=ghm_sync_plans_task_name):
                     prorate=True,
                 )
                 owner.stripe_subscription_id = None
+            # committed before invalidating, so that a concurrent lookup can't
+            # cache the old plan again
+            db_session.commit()
+            invalidate_owner_plan(owner.ownerid)
         else:
             # create the user
             user_data = ghm_service.get_user(service_id)
@@ -248,6 +253,8 @@ class SyncPlansTask(BaseCodecovTask, name=ghm_sync_plans_task_name):
             owner.plan_activated_users = None
 
             self.deactivate_repos(db_session, owner.ownerid)
+            db_session.commit()
+            invalidate_owner_plan(owner.ownerid)
         else:
             # create the user
             user_data = ghm_service.get_user(service_id)
@@ -17,7 +17,13 @@ from database.models.staticanalysis import StaticAnalysisSuite
 from helpers.labels import get_all_report_labels, get_labels_per_session
 from helpers.metrics import metrics
 from helpers.telemetry import log_simple_metric
+from services.archive import ArchiveService
 from services.report import Report, ReportService
+from services.report.labels_index import (
+    LabelsIndex,
+    labels_index_enabled,
+    read_labels_index,
+)
 from services.report.report_builder import SpecialLabelsEnum
 from services.repository import get_repo_provider_service
 from services.static_analysis import StaticAnalysisComparisonService
@@ -281,7 +287,9 @@ class LabelAnalysisRequestProcessingTask(
         metrics.incr("label_analysis_task.already_calculated.same_result")
         return {**larq.result, "success": True, "errors": []}
 
-    def _lookup_label_ids(self, report: Report, label_ids: Set[int]) -> Set[str]:
+    def _lookup_label_ids(
+        self, report: Union[Report, LabelsIndex], label_ids: Set[int]
+    ) -> Set[str]:
         labels: Set[str] = set()
         for label_id in label_ids:
             # This can raise shared.reports.exceptions.LabelNotFoundError
@@ -299,7 +307,9 @@ class LabelAnalysisRequestProcessingTask(
 
     @sentry_sdk.trace
     def _get_existing_labels(
-        self, report: Report, lines_relevant_to_diff: LinesRelevantToChange
+        self,
+        report: Union[Report, LabelsIndex],
+        lines_relevant_to_diff: LinesRelevantToChange,
     ) -> ExistingLabelSets:
         all_report_labels = self.get_all_report_labels(report)
         (
@@ -395,8 +405,17 @@ class LabelAnalysisRequestProcessingTask(
     @sentry_sdk.trace
     def _get_base_report(
         self, label_analysis_request: LabelAnalysisRequest
-    ) -> Optional[Report]:
+    ) -> Optional[Union[Report, LabelsIndex]]:
         base_commit = label_analysis_request.base_commit
+        if labels_index_enabled():
+            # The index has all we need from the report, without loading all of it
+            labels_index = read_labels_index(
+                ArchiveService(base_commit.repository), base_commit
+            )
+            if labels_index is not None:
+                metrics.incr("label_analysis_task.labels_index.hit")
+                return labels_index
+            metrics.incr("label_analysis_task.labels_index.miss")
         current_yaml = get_repo_yaml(base_commit.repository)
         report_service = ReportService(current_yaml)
         report: Report = report_service.get_existing_report_for_commit(base_commit)
@@ -532,7 +551,9 @@ class LabelAnalysisRequestProcessingTask(
 
     @sentry_sdk.trace
     def get_executable_lines_labels(
-        self, report: Report, executable_lines: LinesRelevantToChange
+        self,
+        report: Union[Report, LabelsIndex],
+        executable_lines: LinesRelevantToChange,
     ) -> Tuple[PossiblyEncodedLabelSet, PossiblyEncodedLabelSet]:
         if executable_lines["all"]:
             return (self.get_all_report_labels(report), set())
@@ -541,6 +562,17 @@ class LabelAnalysisRequestProcessingTask(
         global_level_labels = set()
         # Prime piece of code to be rust-ifyied
         for name, file_executable_lines in executable_lines["files"].items():
+            if isinstance(report, LabelsIndex):
+                if file_executable_lines:
+                    file_labels, file_full_sessions = report.get_lines_labels(
+                        name,
+                        None
+                        if file_executable_lines["all"]
+                        else file_executable_lines["lines"],
+                    )
+                    labels.update(file_labels)
+                    full_sessions.update(file_full_sessions)
+                continue
             rf = report.get(name)
             if rf and file_executable_lines:
                 if file_executable_lines["all"]:
@@ -577,10 +609,16 @@ class LabelAnalysisRequestProcessingTask(
             global_level_labels,
         )
 
-    def get_labels_per_session(self, report: Report, sess_id: int):
+    def get_labels_per_session(
+        self, report: Union[Report, LabelsIndex], sess_id: int
+    ):
+        if isinstance(report, LabelsIndex):
+            return report.get_labels_per_session(sess_id)
         return get_labels_per_session(report, sess_id)
 
-    def get_all_report_labels(self, report: Report) -> set:
+    def get_all_report_labels(self, report: Union[Report, LabelsIndex]) -> set:
+        if isinstance(report, LabelsIndex):
+            return report.get_all_labels()
         return get_all_report_labels(report)
 
 
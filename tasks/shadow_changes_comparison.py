@@ -0,0 +1,122 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from shared.reports.changes import get_changes_using_rust
+from shared.reports.readonly import ReadOnlyReport
+from shared.torngit.exceptions import TorngitError
+
+from app import celery_app
+from celery_config import shadow_changes_comparison_task_name
+from database.models import Commit
+from helpers.exceptions import RepositoryWithoutValidBotError
+from helpers.github_installation import get_installation_name_for_owner_for_task
+from services.comparison.metrics import (
+    COMPARISON_CHANGES_RUNTIME,
+    COMPARISON_CHANGES_SHADOW_RESULTS,
+)
+from services.report import ReportService
+from services.repository import get_repo_provider_service
+from tasks.base import BaseCodecovTask
+
+log = logging.getLogger(__name__)
+
+
+class ShadowChangesComparisonTask(
+    BaseCodecovTask, name=shadow_changes_comparison_task_name
+):
+    """
+    Compares the changes computed by the python engine during notifications
+    against the ones computed by the rust engine.
+
+    This is scheduled for a sample of the comparisons when the `shadow` changes
+    engine is configured, so that notifications don't pay for computing the changes twice.
+    """
+
+    def run_impl(
+        self,
+        db_session,
+        *,
+        repoid: int,
+        base_commitid: str,
+        head_commitid: str,
+        python_paths: list[str],
+        **kwargs,
+    ):
+        log_extra = dict(
+            repoid=repoid, base_commit=base_commitid, head_commit=head_commitid
+        )
+        commits = {
+            commit.commitid: commit
+            for commit in db_session.query(Commit).filter(
+                Commit.repoid == repoid,
+                Commit.commitid.in_([base_commitid, head_commitid]),
+            )
+        }
+        base_commit = commits.get(base_commitid)
+        head_commit = commits.get(head_commitid)
+        if base_commit is None or head_commit is None:
+            log.warning("Commits for shadow comparison not found", extra=log_extra)
+            return {"compared": False, "reason": "missing_commit"}
+
+        report_service = ReportService({})
+        base_report = report_service.get_existing_report_for_commit(
+            base_commit, report_class=ReadOnlyReport
+        )
+        head_report = report_service.get_existing_report_for_commit(
+            head_commit, report_class=ReadOnlyReport
+        )
+        if (
+            base_report is None
+            or head_report is None
+            or base_report.rust_report is None
+            or head_report.rust_report is None
+        ):
+            log.info("Reports for shadow comparison not available", extra=log_extra)
+            return {"compared": False, "reason": "missing_report"}
+
+        repository = head_commit.repository
+        try:
+            installation_name_to_use = get_installation_name_for_owner_for_task(
+                self.name, repository.owner
+            )
+            repository_service = get_repo_provider_service(
+                repository, installation_name_to_use=installation_name_to_use
+            )
+            diff = async_to_sync(repository_service.get_compare)(
+                base_commitid, head_commitid, with_commits=False
+            )["diff"]
+        except (RepositoryWithoutValidBotError, TorngitError):
+            log.warning(
+                "Unable to fetch diff for shadow comparison",
+                extra=log_extra,
+                exc_info=True,
+            )
+            return {"compared": False, "reason": "missing_diff"}
+
+        with COMPARISON_CHANGES_RUNTIME.labels(engine="rust").time():
+            rust_changes = get_changes_using_rust(base_report, head_report, diff)
+
+        original_paths = set(python_paths)
+        new_paths = set(c.path for c in rust_changes or [])
+        if original_paths != new_paths:
+            COMPARISON_CHANGES_SHADOW_RESULTS.labels(result="mismatch").inc()
+            log.info(
+                "There are differences between python changes and rust changes",
+                extra=dict(
+                    only_on_new=sorted(new_paths - original_paths)[:100],
+                    only_on_original=sorted(original_paths - new_paths)[:100],
+                    **log_extra,
+                ),
+            )
+            return {"compared": True, "matching": False}
+
+        COMPARISON_CHANGES_SHADOW_RESULTS.labels(result="match").inc()
+        return {"compared": True, "matching": True}
+
+
+RegisteredShadowChangesComparisonTask = celery_app.register_task(
+    ShadowChangesComparisonTask()
+)
+shadow_changes_comparison_task = celery_app.tasks[
+    RegisteredShadowChangesComparisonTask.name
+]
@@ -3,7 +3,6 @@ from typing import Optional
 
 from shared.celery_config import static_analysis_task_name
 from shared.staticanalysis import StaticAnalysisSingleFileSnapshotState
-from shared.storage.exceptions import FileNotInStorageError
 
 from app import celery_app
 from database.models.staticanalysis import (
@@ -35,7 +34,7 @@ class StaticAnalysisSuiteCheckTask(BaseCodecovTask, name=static_analysis_task_na
         log.info("Checking static analysis suite", extra=dict(suite_id=suite_id))
         query = (
             db_session.query(
-                StaticAnalysisSingleFileSnapshot,
+                StaticAnalysisSingleFileSnapshot.id_,
                 StaticAnalysisSingleFileSnapshot.content_location,
             )
             .join(
@@ -49,21 +48,34 @@ class StaticAnalysisSuiteCheckTask(BaseCodecovTask, name=static_analysis_task_na
                 == StaticAnalysisSingleFileSnapshotState.CREATED.db_id,
             )
         )
+        snapshots = query.all()
         archive_service = ArchiveService(suite.commit.repository)
-        # purposefully iteration when an update would suffice,
-        # because we actually want to validate different stuff
-        changed_count = 0
-        for elem, content_location in query:
-            try:
-                _ = archive_service.read_file(content_location)
-                elem.state_id = StaticAnalysisSingleFileSnapshotState.VALID.db_id
-                changed_count += 1
-            except FileNotInStorageError:
+        # only the existence of the files is validated, so they are not downloaded
+        uploaded = archive_service.files_exist(
+            [content_location for _, content_location in snapshots]
+        )
+        valid_ids = []
+        for (snapshot_id, _), exists in zip(snapshots, uploaded):
+            if exists:
+                valid_ids.append(snapshot_id)
+            else:
                 log.warning(
                     "File not found to be analyzed",
-                    extra=dict(filepath_id=elem.id, suite_id=suite_id),
+                    extra=dict(filepath_id=snapshot_id, suite_id=suite_id),
                 )
 
+        if valid_ids:
+            db_session.query(StaticAnalysisSingleFileSnapshot).filter(
+                StaticAnalysisSingleFileSnapshot.id_.in_(valid_ids)
+            ).update(
+                {
+                    StaticAnalysisSingleFileSnapshot.state_id: (
+                        StaticAnalysisSingleFileSnapshotState.VALID.db_id
+                    )
+                },
+                synchronize_session=False,
+            )
+        changed_count = len(valid_ids)
         db_session.commit()
         log_simple_metric("static_analysis.data_sent_for_commit", float(True))
         log_simple_metric("static_analysis.files_changed", changed_count)
@@ -20,6 +20,7 @@ from sqlalchemy.exc import (
 )
 
 from database.tests.factories.core import OwnerFactory, RepositoryFactory
+from helpers.log_context import LogContext, set_log_context
 from tasks.base import BaseCodecovRequest, BaseCodecovTask
 from tasks.base import celery_app as base_celery_app
 
@@ -503,6 +504,29 @@ class TestBaseCodecovTaskApplyAsyncOverride(object):
             user_plan=mock_celery_task_router(),
         )
 
+    @pytest.mark.freeze_time("2023-06-13T10:01:01.000123")
+    def test_apply_async_passes_log_context(self, mocker):
+        mocker.patch("tasks.base.get_db_session")
+        mocker.patch("tasks.base._get_user_plan_from_task")
+        mocker.patch(
+            "tasks.base.route_tasks_based_on_user_plan",
+            return_value=dict(queue="some_queue", extra_config={}),
+        )
+        set_log_context(
+            LogContext(repo_id=2, repo_name="example-python", commit_sha="abc")
+        )
+
+        task = BaseCodecovTask()
+        task.name = "app.tasks.upload.FakeTask"
+        mocked_apply_async = mocker.patch.object(base_celery_app.Task, "apply_async")
+
+        task.apply_async(kwargs=dict(repoid=2, commitid="abc"))
+        _, kwargs = mocked_apply_async.call_args
+        assert kwargs["headers"] == dict(
+            created_timestamp="2023-06-13T10:01:01.000123",
+            log_context=dict(repo_id=2, repo_name="example-python", commit_sha="abc"),
+        )
+
     @pytest.mark.freeze_time("2023-06-13T10:01:01.000123")
     def test_apply_async_override_with_chain(self, mocker):
         mock_get_db_session = mocker.patch("tasks.base.get_db_session")
@@ -23,11 +23,13 @@ class TestStaticAnalysisCheckTask(object):
         dbsession.add(obj)
         dbsession.flush()
         task = StaticAnalysisSuiteCheckTask()
+        obj_filepaths = []
         for i in range(8):
             fp_obj = StaticAnalysisSuiteFilepathFactory.create(
                 analysis_suite=obj,
                 file_snapshot__state_id=StaticAnalysisSingleFileSnapshotState.CREATED.db_id,
             )
+            obj_filepaths.append(fp_obj)
             mock_storage.write_file(
                 mock_configuration.params["services"]["minio"]["bucket"],
                 fp_obj.file_snapshot.content_location,
@@ -47,6 +49,13 @@ class TestStaticAnalysisCheckTask(object):
         )
         mock_log_simple_metric.assert_any_call("static_analysis.files_changed", 8)
         assert res == {"changed_count": 8, "successful": True}
+        dbsession.expire_all()
+        assert fp_obj.file_snapshot.state_id == (
+            StaticAnalysisSingleFileSnapshotState.CREATED.db_id
+        )
+        assert [fp.file_snapshot.state_id for fp in obj_filepaths] == [
+            StaticAnalysisSingleFileSnapshotState.VALID.db_id
+        ] * 8
 
     def test_simple_call_with_suite_mix_from_other(
         self, dbsession, mock_storage, mock_configuration, mocker
@@ -9,6 +9,11 @@ from shared.yaml import UserYaml
 from database.enums import CompareCommitError, CompareCommitState
 from database.models import CompareComponent, CompareFlag, RepositoryFlag
 from database.tests.factories import CompareCommitFactory
+from services.comparison import (
+    get_compared_report_versions,
+    stored_totals_versions_key,
+)
+from services.redis import get_redis_connection
 from services.report import ReportService
 from tasks.compute_comparison import ComputeComparisonTask
 
@@ -69,6 +74,35 @@ class TestComputeComparisonTask(object):
             },
         }
 
+    def test_records_stored_totals_versions(
+        self, dbsession, mocker, mock_repo_provider, mock_storage, mock_configuration
+    ):
+        mock_configuration._params["setup"]["comparison"] = {
+            "reuse_stored_totals": True
+        }
+        comparison = CompareCommitFactory.create()
+        dbsession.add(comparison)
+        dbsession.flush()
+        mocker.patch.object(
+            ReadOnlyReport, "should_load_rust_version", return_value=True
+        )
+        mocker.patch.object(
+            ReportService,
+            "get_existing_report_for_commit",
+            return_value=ReadOnlyReport.create_from_report(Report()),
+        )
+        mock_repo_provider.get_compare.return_value = {"diff": {"files": {}}}
+        get_current_yaml = mocker.patch("tasks.compute_comparison.get_current_yaml")
+        get_current_yaml.return_value = UserYaml({"coverage": {"status": None}})
+
+        ComputeComparisonTask().run_impl(dbsession, comparison.id)
+        stored_versions = get_redis_connection().get(
+            stored_totals_versions_key(comparison.id)
+        )
+        assert stored_versions.decode() == get_compared_report_versions(
+            comparison.base_commit, comparison.compare_commit
+        )
+
     def test_set_state_to_processed_non_empty_report_with_flag_comparisons(
         self,
         dbsession,
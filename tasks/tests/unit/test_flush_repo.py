@@ -1,9 +1,15 @@
+import pytest
+from celery.exceptions import Retry, SoftTimeLimitExceeded
+
+from database.models import Commit, CommitReport, Upload
 from database.tests.factories import (
     BranchFactory,
     CommitFactory,
     CompareCommitFactory,
     PullFactory,
+    ReportFactory,
     RepositoryFactory,
+    UploadFactory,
 )
 from database.tests.factories.reports import CompareFlagFactory, RepositoryFlagFactory
 from services.archive import ArchiveService
@@ -116,3 +122,100 @@ class TestFlushRepo(object):
         dbsession.refresh(repo)
         # Those assertions are almost tautological. If they start being a
         # problem, don't hesitate to delete them
+
+    def _create_commits(self, dbsession, repo, count):
+        flag = RepositoryFlagFactory.create(repository=repo)
+        dbsession.add(flag)
+        commits = []
+        for i in range(count):
+            commit = CommitFactory.create(repository=repo)
+            report = ReportFactory.create(commit=commit)
+            upload = UploadFactory.create(report=report, flags=[flag])
+            dbsession.add_all([commit, report, upload])
+            if commits:
+                comparison = CompareCommitFactory.create(
+                    base_commit=commits[-1], compare_commit=commit
+                )
+                dbsession.add(comparison)
+                dbsession.add(
+                    CompareFlagFactory.create(
+                        commit_comparison=comparison, repositoryflag=flag
+                    )
+                )
+            commits.append(commit)
+        dbsession.flush()
+        return commits
+
+    def test_flush_repo_in_chunks(self, dbsession, mock_storage, mock_configuration):
+        mock_configuration._params["setup"]["flush_repo"] = {"batch_size": 7}
+        repo = RepositoryFactory.create()
+        other_repo = RepositoryFactory.create()
+        dbsession.add_all([repo, other_repo])
+        dbsession.flush()
+        self._create_commits(dbsession, repo, 50)
+        self._create_commits(dbsession, other_repo, 3)
+        archive_service = ArchiveService(repo)
+        for i in range(17):
+            archive_service.write_chunks(f"commit_sha{i}", f"data{i}")
+
+        task = FlushRepoTask()
+        res = task.run_impl(dbsession, repoid=repo.repoid)
+        assert res == FlushRepoTaskReturnType(
+            deleted_commits_count=50, deleted_archives_count=17
+        )
+        assert dbsession.query(Commit).filter_by(repoid=repo.repoid).count() == 0
+        assert dbsession.query(Commit).filter_by(repoid=other_repo.repoid).count() == 3
+        assert (
+            dbsession.query(Upload)
+            .join(CommitReport, Upload.report_id == CommitReport.id_)
+            .join(Commit, CommitReport.commit_id == Commit.id_)
+            .filter(Commit.repoid == other_repo.repoid)
+            .count()
+            == 3
+        )
+        assert list(archive_service.list_repo_files()) == []
+
+    def test_flush_repo_resumes_from_checkpoint(
+        self, dbsession, mock_storage, mock_configuration, mocker
+    ):
+        mock_configuration._params["setup"]["flush_repo"] = {
+            "batch_size": 4,
+            "max_retries": 20,
+        }
+        repo = RepositoryFactory.create()
+        dbsession.add(repo)
+        dbsession.flush()
+        commits = self._create_commits(dbsession, repo, 10)
+        archive_service = ArchiveService(repo)
+        for i in range(6):
+            archive_service.write_chunks(f"commit_sha{i}", f"data{i}")
+
+        task = FlushRepoTask()
+        delete_commits_chunk = task._delete_commits_chunk
+        calls = 0
+
+        def run_out_of_time(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            if calls > 2:
+                raise SoftTimeLimitExceeded()
+            return delete_commits_chunk(*args, **kwargs)
+
+        mocker.patch.object(task, "_delete_commits_chunk", side_effect=run_out_of_time)
+        retry = mocker.patch.object(task, "retry", side_effect=Retry())
+        with pytest.raises(Retry):
+            task.run_impl(dbsession, repoid=repo.repoid)
+
+        assert retry.call_args.kwargs["max_retries"] == 20
+        checkpoint = retry.call_args.kwargs["kwargs"]["checkpoint"]
+        assert checkpoint["last_commit_id"] == sorted(c.id_ for c in commits)[7]
+        assert checkpoint["deleted_commits_count"] == 8
+        assert dbsession.query(Commit).filter_by(repoid=repo.repoid).count() == 2
+
+        mocker.patch.object(task, "_delete_commits_chunk", delete_commits_chunk)
+        res = task.run_impl(dbsession, repoid=repo.repoid, checkpoint=checkpoint)
+        assert res.deleted_commits_count == 10
+        # archives deleted by either attempt are counted once
+        assert res.deleted_archives_count == 6
+        assert dbsession.query(Commit).filter_by(repoid=repo.repoid).count() == 0
+        assert list(archive_service.list_repo_files()) == []
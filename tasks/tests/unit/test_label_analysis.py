@@ -14,6 +14,7 @@ from database.tests.factories.staticanalysis import (
     StaticAnalysisSuiteFilepathFactory,
 )
 from services.report import ReportService
+from services.report.labels_index import LabelsIndex, build_labels_index
 from services.static_analysis import StaticAnalysisComparisonService
 from tasks.label_analysis import (
     LabelAnalysisRequestProcessingTask,
@@ -760,6 +761,53 @@ def test_get_all_labels_one_session(sample_report_with_labels):
     }
 
 
+@pytest.mark.parametrize(
+    "executable_lines",
+    [
+        {"all": True},
+        {"all": False, "files": {"source.py": {"all": True}}},
+        {"all": False, "files": {"source.py": {"all": False, "lines": {5, 6}}}},
+        {"all": False, "files": {"source.py": {"all": False, "lines": {6, 8}}}},
+        {
+            "all": False,
+            "files": {
+                "source.py": {"all": False, "lines": {5, 6}},
+                "path/from/randomfile_no_static_analysis.html": None,
+            },
+        },
+    ],
+)
+def test_get_executable_lines_labels_from_labels_index(
+    sample_report_with_labels, executable_lines
+):
+    labels_index = LabelsIndex(build_labels_index(sample_report_with_labels, None))
+    task = LabelAnalysisRequestProcessingTask()
+    assert task.get_executable_lines_labels(
+        labels_index, executable_lines
+    ) == task.get_executable_lines_labels(sample_report_with_labels, executable_lines)
+
+
+def test_get_base_report_from_labels_index(
+    dbsession, mock_storage, mock_configuration, sample_report_with_labels, mocker
+):
+    mock_configuration._params["setup"]["labels_index"] = {"enabled": True}
+    larf = LabelAnalysisRequestFactory.create()
+    dbsession.add(larf)
+    dbsession.flush()
+    ReportService({}).save_report(larf.base_commit, sample_report_with_labels)
+    get_existing_report = mocker.patch.object(
+        ReportService, "get_existing_report_for_commit"
+    )
+
+    task = LabelAnalysisRequestProcessingTask()
+    base_report = task._get_base_report(larf)
+    assert isinstance(base_report, LabelsIndex)
+    assert not get_existing_report.called
+    assert task.get_all_report_labels(base_report) == task.get_all_report_labels(
+        sample_report_with_labels
+    )
+
+
 def test_get_relevant_executable_lines_nothing_found(dbsession, mocker):
     repository = RepositoryFactory.create()
     dbsession.add(repository)
@@ -0,0 +1,91 @@
+from shared.reports.readonly import ReadOnlyReport
+from shared.reports.resources import Report
+from shared.reports.types import Change
+
+from database.tests.factories import CommitFactory
+from services.report import ReportService
+from tasks.shadow_changes_comparison import ShadowChangesComparisonTask
+
+
+def _create_commits(dbsession):
+    head_commit = CommitFactory.create()
+    base_commit = CommitFactory.create(repository=head_commit.repository)
+    dbsession.add(head_commit)
+    dbsession.add(base_commit)
+    dbsession.flush()
+    return base_commit, head_commit
+
+
+def _mock_reports(mocker):
+    mocker.patch.object(ReadOnlyReport, "should_load_rust_version", return_value=True)
+    mocker.patch.object(
+        ReportService,
+        "get_existing_report_for_commit",
+        return_value=ReadOnlyReport.create_from_report(Report()),
+    )
+
+
+class TestShadowChangesComparisonTask(object):
+    def test_matching_changes(self, dbsession, mocker, mock_repo_provider):
+        base_commit, head_commit = _create_commits(dbsession)
+        _mock_reports(mocker)
+        mock_repo_provider.get_compare.return_value = {"diff": {"files": {}}}
+        rust_changes = mocker.patch(
+            "tasks.shadow_changes_comparison.get_changes_using_rust",
+            return_value=[Change(path="apple"), Change(path="pear")],
+        )
+
+        res = ShadowChangesComparisonTask().run_impl(
+            dbsession,
+            repoid=head_commit.repoid,
+            base_commitid=base_commit.commitid,
+            head_commitid=head_commit.commitid,
+            python_paths=["apple", "pear"],
+        )
+        assert res == {"compared": True, "matching": True}
+        rust_changes.assert_called_once()
+
+    def test_mismatching_changes(self, dbsession, mocker, mock_repo_provider):
+        base_commit, head_commit = _create_commits(dbsession)
+        _mock_reports(mocker)
+        mock_repo_provider.get_compare.return_value = {"diff": {"files": {}}}
+        mocker.patch(
+            "tasks.shadow_changes_comparison.get_changes_using_rust",
+            return_value=[Change(path="banana")],
+        )
+
+        res = ShadowChangesComparisonTask().run_impl(
+            dbsession,
+            repoid=head_commit.repoid,
+            base_commitid=base_commit.commitid,
+            head_commitid=head_commit.commitid,
+            python_paths=["apple"],
+        )
+        assert res == {"compared": True, "matching": False}
+
+    def test_missing_commit(self, dbsession, mocker):
+        _, head_commit = _create_commits(dbsession)
+
+        res = ShadowChangesComparisonTask().run_impl(
+            dbsession,
+            repoid=head_commit.repoid,
+            base_commitid="0" * 40,
+            head_commitid=head_commit.commitid,
+            python_paths=[],
+        )
+        assert res == {"compared": False, "reason": "missing_commit"}
+
+    def test_missing_report(self, dbsession, mocker):
+        base_commit, head_commit = _create_commits(dbsession)
+        mocker.patch.object(
+            ReportService, "get_existing_report_for_commit", return_value=None
+        )
+
+        res = ShadowChangesComparisonTask().run_impl(
+            dbsession,
+            repoid=head_commit.repoid,
+            base_commitid=base_commit.commitid,
+            head_commitid=head_commit.commitid,
+            python_paths=[],
+        )
+        assert res == {"compared": False, "reason": "missing_report"}
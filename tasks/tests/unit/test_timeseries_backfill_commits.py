@@ -1,5 +1,3 @@
-from shared.celery_config import timeseries_save_commit_measurements_task_name
-
 from database.models import MeasurementName
 from database.tests.factories import RepositoryFactory
 from database.tests.factories.core import CommitFactory
@@ -9,12 +7,8 @@ from tasks.timeseries_backfill import TimeseriesBackfillCommitsTask
 
 def test_backfill_commits_run_impl(dbsession, mocker):
     mocker.patch("tasks.timeseries_backfill.timeseries_enabled", return_value=True)
-    mocked_app = mocker.patch.object(
-        TimeseriesBackfillCommitsTask,
-        "app",
-        tasks={
-            timeseries_save_commit_measurements_task_name: mocker.MagicMock(),
-        },
+    save_commits_measurements = mocker.patch(
+        "tasks.timeseries_backfill.save_commits_measurements", return_value=2
     )
 
     repository = RepositoryFactory.create()
@@ -41,24 +35,12 @@ def test_backfill_commits_run_impl(dbsession, mocker):
     )
     assert res == {"successful": True}
 
-    mocked_app.tasks[
-        timeseries_save_commit_measurements_task_name
-    ].apply_async.assert_any_call(
-        kwargs={
-            "commitid": commit1.commitid,
-            "repoid": commit1.repoid,
-            "dataset_names": [dataset.name],
-        }
-    )
-    mocked_app.tasks[
-        timeseries_save_commit_measurements_task_name
-    ].apply_async.assert_any_call(
-        kwargs={
-            "commitid": commit2.commitid,
-            "repoid": commit2.repoid,
-            "dataset_names": [dataset.name],
-        }
-    )
+    # the whole batch is processed in-process, with a single call per repository
+    save_commits_measurements.assert_called_once()
+    args = save_commits_measurements.call_args.args
+    assert args[0] == repository
+    assert set(args[1]) == {commit1, commit2}
+    assert args[2] == [dataset.name]
 
 
 def test_backfill_commits_run_impl_timeseries_not_enabled(dbsession, mocker):
@@ -5,6 +5,21 @@ from tasks.trial_expiration import TrialExpirationTask
 
 
 class TestTrialExpiration(object):
+    def test_trial_expiration_task_invalidates_plan_cache(self, dbsession, mocker):
+        commit = mocker.spy(dbsession, "commit")
+        # the plan change has to be committed by the time the cache is invalidated
+        invalidate_owner_plan = mocker.patch(
+            "tasks.trial_expiration.invalidate_owner_plan",
+            side_effect=lambda _ownerid: commit.assert_called_once(),
+        )
+        owner = OwnerFactory.create()
+        dbsession.add(owner)
+        dbsession.flush()
+
+        task = TrialExpirationTask()
+        assert task.run_impl(dbsession, owner.ownerid) == {"successful": True}
+        invalidate_owner_plan.assert_called_once_with(owner.ownerid)
+
     def test_trial_expiration_task_with_pretrial_users_count(self, dbsession, mocker):
         owner = OwnerFactory.create(pretrial_users_count=5)
         dbsession.add(owner)
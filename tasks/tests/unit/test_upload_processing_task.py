@@ -13,6 +13,7 @@ from database.models import CommitReport
 from database.tests.factories import CommitFactory, UploadFactory
 from helpers.exceptions import ReportEmptyError, ReportExpiredException
 from services.archive import ArchiveService
+from services.processing.intermediate import load_intermediate_reports
 from services.processing.processing import process_upload
 from services.report import ProcessingError, RawReportInfo, ReportService
 from services.report.parser.legacy import LegacyReportParser
@@ -185,6 +186,110 @@ class TestUploadProcessorTask(object):
         parsed = LegacyReportParser().parse_raw_report_from_bytes(content)
         assert data == parsed.content().getvalue()
 
+    @pytest.mark.django_db
+    def test_upload_processor_dedups_identical_uploads(
+        self, mocker, dbsession, mock_configuration, mock_storage
+    ):
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        current_report_row = CommitReport(commit_id=commit.id_)
+        dbsession.add(current_report_row)
+        dbsession.flush()
+        with open(
+            here.parent.parent / "samples" / "sample_uploaded_report_1.txt", "rb"
+        ) as f:
+            content = f.read()
+        uploads = []
+        for job in ("first", "second", "third"):
+            url = f"v4/raw/{commit.commitid}/{job}.txt"
+            mock_storage.write_file("archive", url, content)
+            upload = UploadFactory.create(
+                report=current_report_row,
+                state="started",
+                storage_path=url,
+                job_code=job,
+            )
+            dbsession.add(upload)
+            dbsession.flush()
+            uploads.append(upload)
+        parse_raw_report = mocker.spy(ReportService, "parse_raw_report_from_storage")
+        commit_yaml = UserYaml({"codecov": {"max_report_age": False}})
+
+        def process(upload):
+            result = process_upload(
+                lambda _e: None,
+                db_session=dbsession,
+                repo_id=commit.repoid,
+                commit_sha=commit.commitid,
+                commit_yaml=commit_yaml,
+                arguments={"upload_id": upload.id_},
+            )
+            assert result["successful"]
+
+        mock_configuration._params["setup"]["upload_dedup"] = {"enabled": True}
+        process(uploads[0])
+        process(uploads[1])
+        assert parse_raw_report.call_count == 1
+
+        mock_configuration._params["setup"]["upload_dedup"] = {"enabled": False}
+        process(uploads[2])
+        assert parse_raw_report.call_count == 2
+
+        _, deduplicated, processed = load_intermediate_reports(
+            [upload.id_ for upload in uploads]
+        )
+        assert deduplicated.report.to_archive() == processed.report.to_archive()
+        assert deduplicated.report.totals == processed.report.totals
+        [deduplicated_session] = deduplicated.report.sessions.values()
+        [processed_session] = processed.report.sessions.values()
+        assert deduplicated_session.job == "second"
+        assert processed_session.job == "third"
+        assert deduplicated_session.id == processed_session.id
+        assert deduplicated_session.totals == processed_session.totals
+        assert deduplicated_session.env == processed_session.env
+
+    @pytest.mark.django_db
+    def test_upload_processor_parses_upload_when_dedup_lookup_fails(
+        self, mocker, dbsession, mock_configuration, mock_storage
+    ):
+        commit = CommitFactory.create()
+        dbsession.add(commit)
+        dbsession.flush()
+        current_report_row = CommitReport(commit_id=commit.id_)
+        dbsession.add(current_report_row)
+        dbsession.flush()
+        with open(
+            here.parent.parent / "samples" / "sample_uploaded_report_1.txt", "rb"
+        ) as f:
+            content = f.read()
+        url = f"v4/raw/{commit.commitid}/upload.txt"
+        mock_storage.write_file("archive", url, content)
+        upload = UploadFactory.create(
+            report=current_report_row, state="started", storage_path=url
+        )
+        dbsession.add(upload)
+        dbsession.flush()
+        mocker.patch(
+            "services.report.find_duplicate_report",
+            side_effect=ConnectionError("redis is down"),
+        )
+        parse_raw_report = mocker.spy(ReportService, "parse_raw_report_from_storage")
+
+        mock_configuration._params["setup"]["upload_dedup"] = {"enabled": True}
+        result = process_upload(
+            lambda _e: None,
+            db_session=dbsession,
+            repo_id=commit.repoid,
+            commit_sha=commit.commitid,
+            commit_yaml=UserYaml({"codecov": {"max_report_age": False}}),
+            arguments={"upload_id": upload.id_},
+        )
+        assert result["successful"]
+        assert parse_raw_report.call_count == 1
+        [intermediate_report] = load_intermediate_reports([upload.id_])
+        assert intermediate_report.report.totals.lines > 0
+
     @pytest.mark.django_db(databases={"default"})
     def test_upload_task_call_exception_within_individual_upload(
         self,
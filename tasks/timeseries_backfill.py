@@ -1,4 +1,6 @@
 import logging
+import time
+from collections import defaultdict
 from datetime import datetime
 from typing import Iterable, Optional
 
@@ -7,19 +9,28 @@ from celery.canvas import Signature
 from shared.celery_config import (
     timeseries_backfill_commits_task_name,
     timeseries_backfill_dataset_task_name,
-    timeseries_save_commit_measurements_task_name,
 )
+from shared.metrics import Counter
 from sqlalchemy.orm.session import Session
 
 from app import celery_app
 from database.models import Commit, Repository
 from database.models.timeseries import Dataset
 from helpers.timeseries import timeseries_enabled
-from services.timeseries import backfill_batch_size, repository_commits_query
+from services.timeseries import (
+    backfill_batch_size,
+    repository_commits_query,
+    save_commits_measurements,
+)
 from tasks.base import BaseCodecovTask
 
 log = logging.getLogger(__name__)
 
+TIMESERIES_BACKFILL_COMMITS = Counter(
+    "worker_timeseries_backfill_commits",
+    "Number of commits processed by timeseries backfill batches. Its rate is the backfill throughput in commits per second.",
+)
+
 
 class TimeseriesBackfillCommitsTask(
     BaseCodecovTask, name=timeseries_backfill_commits_task_name
@@ -36,15 +47,32 @@ class TimeseriesBackfillCommitsTask(
             log.warning("Timeseries not enabled")
             return {"successful": False}
 
-        commits = db_session.query(Commit).filter(Commit.id_.in_(commit_ids))
+        start = time.monotonic()
+        commits = (
+            db_session.query(Commit).filter(Commit.id_.in_(commit_ids)).all()
+        )
+        # batches are made of commits of a single repository, but nothing enforces it
+        commits_by_repository = defaultdict(list)
         for commit in commits:
-            self.app.tasks[timeseries_save_commit_measurements_task_name].apply_async(
-                kwargs=dict(
-                    commitid=commit.commitid,
-                    repoid=commit.repoid,
-                    dataset_names=dataset_names,
-                )
+            commits_by_repository[commit.repository].append(commit)
+
+        measured_commits = 0
+        for repository, repository_commits in commits_by_repository.items():
+            measured_commits += save_commits_measurements(
+                repository, repository_commits, dataset_names
             )
+
+        TIMESERIES_BACKFILL_COMMITS.inc(len(commits))
+        elapsed = time.monotonic() - start
+        log.info(
+            "Backfilled batch of commit measurements",
+            extra=dict(
+                commit_count=len(commits),
+                measured_commit_count=measured_commits,
+                dataset_names=dataset_names,
+                commits_per_second=len(commits) / elapsed if elapsed > 0 else None,
+            ),
+        )
         return {"successful": True}
 
 
@@ -12,6 +12,8 @@ from celery_task_router import (
     _get_user_plan_from_repoid,
     _get_user_plan_from_suite_id,
     _get_user_plan_from_task,
+    invalidate_owner_plan,
+    owner_plan_cache,
     route_task,
 )
 from database.tests.factories.core import (
@@ -368,3 +370,72 @@ def test_route_task(mocker, dbsession, fake_repos):
     mock_route_tasks_shared.assert_called_with(
         shared_celery_config.upload_task_name, BillingPlan.pr_monthly.db_name
     )
+
+
+@pytest.fixture
+def plan_cache(mock_configuration):
+    mock_configuration.params["setup"]["task_router"] = {
+        "plan_cache": {"ttl": 60, "local_ttl": 60}
+    }
+    owner_plan_cache.clear()
+    yield owner_plan_cache
+    owner_plan_cache.clear()
+
+
+def test_get_user_plan_from_task_cached(dbsession, fake_repos, plan_cache, mocker):
+    (repo, _) = fake_repos
+    task_kwargs = dict(repoid=repo.repoid, commitid=0, debug=False, rebuild=False)
+    assert (
+        _get_user_plan_from_task(
+            dbsession, shared_celery_config.upload_task_name, task_kwargs
+        )
+        == BillingPlan.pr_monthly.db_name
+    )
+
+    repo.owner.plan = BillingPlan.enterprise_cloud_yearly.db_name
+    dbsession.flush()
+    query = mocker.spy(dbsession, "query")
+    # the plan is served from the cache, without hitting the database
+    assert (
+        _get_user_plan_from_task(
+            dbsession, shared_celery_config.upload_task_name, task_kwargs
+        )
+        == BillingPlan.pr_monthly.db_name
+    )
+    assert (
+        _get_user_plan_from_task(
+            dbsession,
+            shared_celery_config.delete_owner_task_name,
+            dict(ownerid=repo.ownerid),
+        )
+        == BillingPlan.pr_monthly.db_name
+    )
+    assert query.call_count == 0
+
+    # the plan changed, only the owner plan needs to be looked up again
+    invalidate_owner_plan(repo.ownerid)
+    assert (
+        _get_user_plan_from_task(
+            dbsession, shared_celery_config.upload_task_name, task_kwargs
+        )
+        == BillingPlan.enterprise_cloud_yearly.db_name
+    )
+    assert query.call_count == 1
+
+    invalidate_owner_plan(repo.ownerid)
+    plan_cache.invalidate(f"repo_owner/{repo.repoid}")
+
+
+def test_get_user_plan_from_task_cache_disabled(
+    dbsession, fake_repos, mock_configuration, mocker
+):
+    (repo, _) = fake_repos
+    cache_get = mocker.spy(owner_plan_cache, "get")
+    task_kwargs = dict(repoid=repo.repoid, commitid=0, debug=False, rebuild=False)
+    assert (
+        _get_user_plan_from_task(
+            dbsession, shared_celery_config.upload_task_name, task_kwargs
+        )
+        == BillingPlan.pr_monthly.db_name
+    )
+    assert cache_get.call_count == 0